@@ -0,0 +1,36 @@
+"""Add content-addressed storage_blobs and documents.content_hash.
+
+Revision ID: 003_storage_blobs
+Revises: 002_new_tables
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "003_storage_blobs"
+down_revision = "002_new_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "storage_blobs",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("digest", sa.String(64), nullable=False, unique=True),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("storage_path", sa.String(1000), nullable=False),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.add_column("documents", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.create_index("ix_documents_content_hash", "documents", ["content_hash"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_documents_content_hash", table_name="documents")
+    op.drop_column("documents", "content_hash")
+    op.drop_table("storage_blobs")
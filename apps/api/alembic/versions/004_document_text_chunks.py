@@ -0,0 +1,44 @@
+"""Add document_text_chunks with a Spanish full-text index.
+
+Revision ID: 004_document_text_chunks
+Revises: 003_storage_blobs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "004_document_text_chunks"
+down_revision = "003_storage_blobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "document_text_chunks",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("organization_id", sa.Integer(), sa.ForeignKey("organizations.id"), nullable=False, index=True),
+        sa.Column(
+            "document_id", sa.Integer(), sa.ForeignKey("documents.id", ondelete="CASCADE"),
+            nullable=False, index=True,
+        ),
+        sa.Column("content_hash", sa.String(64), nullable=False, index=True),
+        sa.Column("chunk_index", sa.Integer(), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute(
+        "CREATE INDEX ix_document_text_chunks_fts ON document_text_chunks "
+        "USING gin (to_tsvector('spanish', text))"
+    )
+    op.add_column("documents", sa.Column("text_indexed_hash", sa.String(64), nullable=True))
+    op.add_column("documents", sa.Column("text_index_error", sa.String(500), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("documents", "text_index_error")
+    op.drop_column("documents", "text_indexed_hash")
+    op.drop_index("ix_document_text_chunks_fts", table_name="document_text_chunks")
+    op.drop_table("document_text_chunks")
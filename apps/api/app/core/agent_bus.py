@@ -100,6 +100,7 @@ class AgentBus:
                 "role": target.role if isinstance(target.role, str) else target.role.value,
             },
             "task_id": result.get("task_id"),
+            "tool_memo": result.get("tool_memo"),
         }
 
     def broadcast(
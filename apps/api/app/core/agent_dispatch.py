@@ -6,10 +6,11 @@ Falls back to the old AI provider if agents are not configured.
 """
 
 import logging
-from typing import Optional
+from typing import Any, Mapping, Optional
 
 from sqlalchemy.orm import Session
 
+from app.core import draft_cache
 from app.db.models import AIAgent
 
 logger = logging.getLogger(__name__)
@@ -22,12 +23,23 @@ def agent_draft(
     prompt: str,
     fallback: str,
     task_type: str = "scheduled_task",
+    fill: Optional[Mapping[str, Any]] = None,
+    cache: bool = False,
 ) -> str:
     """
     Execute an agent to generate text, with graceful fallback.
 
     This is the agent-aware replacement for _ai_draft() in Celery tasks.
+
+    With ``fill`` the prompt is a template: the agent writes the text once
+    with ``{name}`` markers kept, and the values are filled in afterwards.
+    Agent completions for template drafts (or ``cache=True``) go through
+    ``app.core.draft_cache``, so identical requests reuse the first one.
     """
+    use_cache = cache or fill is not None
+    values = fill or {}
+    llm_prompt = draft_cache.placeholder_prompt(prompt) if fill is not None else prompt
+
     try:
         agent = db.query(AIAgent).filter(
             AIAgent.organization_id == org_id,
@@ -37,25 +49,35 @@ def agent_draft(
 
         if not agent:
             logger.debug("No active agent for role %s, using legacy AI", agent_role)
-            return _legacy_ai_draft(prompt, fallback)
+            return draft_cache.fill_placeholders(_legacy_ai_draft(llm_prompt, fallback), values)
+
+        key = None
+        if use_cache:
+            key = draft_cache.cache_key(agent.id, agent.model_name, prompt, {"task_type": task_type})
+            cached = draft_cache.get(key)
+            if cached is not None:
+                return draft_cache.fill_placeholders(cached, values)
 
         from app.core.agent_runtime import AgentRuntime
         runtime = AgentRuntime(db, org_id)
         result = runtime.execute(
             agent=agent,
-            task_input={"message": prompt, "task_type": task_type},
+            task_input={"message": llm_prompt, "task_type": task_type},
             trigger_type="scheduled",
         )
 
-        if result.get("status") == "completed" and result.get("response"):
-            return result["response"]
+        if result.get("status") != "completed" or not result.get("response"):
+            logger.warning("Agent %s returned status=%s, using fallback", agent_role, result.get("status"))
+            return fallback
+        text = result["response"]
 
-        logger.warning("Agent %s returned status=%s, using fallback", agent_role, result.get("status"))
-        return fallback
+        if key is not None:
+            draft_cache.put(key, text)  # only real completions, never fallbacks
+        return draft_cache.fill_placeholders(text, values)
 
     except Exception as exc:
         logger.warning("Agent dispatch failed for %s, using fallback: %s", agent_role, exc)
-        return _legacy_ai_draft(prompt, fallback)
+        return draft_cache.fill_placeholders(_legacy_ai_draft(llm_prompt, fallback), values)
 
 
 def get_agent_id(db: Session, org_id: int, agent_role: str) -> Optional[int]:
@@ -12,18 +12,20 @@ Orchestrates the full agent execution loop:
 8. Escalate when needed (non-autonomous skills, errors, external actions)
 """
 
-import json
 import logging
 import time
 import uuid
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
-from app.core.anthropic_client import AnthropicClient, MessageResult, get_anthropic_client
+from app.core.anthropic_client import AIServiceError, AnthropicClient, MessageResult, get_anthropic_client
 from app.core.config import settings
 from app.core.escalation import EscalationManager, ALWAYS_ESCALATE_ACTIONS
+from app.core import token_budget, tool_memo, tool_results
+from app.core.tool_memo import ToolMemo
 from app.db.enums import AgentTaskStatusEnum, AgentTaskTriggerEnum, AgentMessageRoleEnum
 from app.db.models import AIAgent, AIAgentConversation, AIAgentTask
 
@@ -49,6 +51,9 @@ class AgentRuntime:
         self.organization_id = organization_id
         self.client = client or get_anthropic_client()
         self.escalation = EscalationManager(db, organization_id)
+        self._tool_memo = ToolMemo()
+        self._result_pager = tool_results.ResultPager()
+        self._pending_messages: list[dict] = []
 
     def execute(
         self,
@@ -82,6 +87,16 @@ class AgentRuntime:
                 "thread_id": thread_id or str(uuid.uuid4()),
             }
 
+        if not self.escalation.is_available(agent.id):
+            return {
+                "response": (
+                    f"Agente '{agent.display_name}' suspendido temporalmente por fallas "
+                    "consecutivas. Intente más tarde."
+                ),
+                "status": "unavailable",
+                "thread_id": thread_id or str(uuid.uuid4()),
+            }
+
         thread_id = thread_id or str(uuid.uuid4())
         max_iter = max_iterations or settings.AGENT_MAX_TOOL_ITERATIONS
         user_message = task_input.get("message", "")
@@ -102,6 +117,12 @@ class AgentRuntime:
 
         timeout_at = time.monotonic() + settings.AGENT_RUNTIME_TIMEOUT
 
+        # Read-only tool results are shared with the enclosing workflow, if any
+        self._tool_memo = tool_memo.current() or ToolMemo()
+        memo_start = (self._tool_memo.hits, self._tool_memo.misses)
+        self._result_pager = tool_results.ResultPager()
+        self._pending_messages = []
+
         try:
             result = self._run_loop(
                 agent=agent,
@@ -113,16 +134,21 @@ class AgentRuntime:
                 from_user_id=from_user_id,
                 from_agent_id=from_agent_id,
                 timeout_at=timeout_at,
+                # Hedge only interactive chat; scheduled work can wait
+                hedge=trigger_type == "manual" and task_input.get("task_type", "chat") == "chat",
             )
 
             # Mark task completed
             task.status = AgentTaskStatusEnum.COMPLETED.value
+            memo_stats = self._memo_stats(*memo_start)
             task.output_data = {
                 "response": result["response"],
                 "tokens": result.get("tokens", {}),
+                "tool_memo": memo_stats,
             }
             task.completed_at = datetime.now(timezone.utc)
             self.escalation.clear_errors(agent.id)
+            self._flush_messages()
             self.db.commit()
 
             return {
@@ -132,6 +158,7 @@ class AgentRuntime:
                 "status": "completed",
                 "tokens": result.get("tokens", {}),
                 "latency_ms": result.get("latency_ms", 0),
+                "tool_memo": memo_stats,
             }
 
         except EscalationRequired as exc:
@@ -143,6 +170,7 @@ class AgentRuntime:
                 task_id=task.id,
                 context={"input": task_input, "thread_id": thread_id},
             )
+            self._flush_messages()  # the conversation up to the escalated tool call
             self.db.commit()
             return {
                 "response": f"Acción escalada al Gerente Legal: {exc}",
@@ -172,6 +200,7 @@ class AgentRuntime:
                     context={"error": str(exc), "input": task_input},
                 )
 
+            self._flush_messages()
             self.db.commit()
             logger.exception("Agent %s execution failed", agent.display_name)
             return {
@@ -180,6 +209,8 @@ class AgentRuntime:
                 "task_id": task.id,
                 "status": "failed",
                 "error": str(exc),
+                "error_code": getattr(exc, "code", None) if isinstance(exc, AIServiceError) else None,
+                "retry_after": getattr(exc, "retry_after", None),
             }
 
     def _run_loop(
@@ -193,6 +224,7 @@ class AgentRuntime:
         from_user_id: Optional[int],
         from_agent_id: Optional[int],
         timeout_at: float = 0,
+        hedge: bool = False,
     ) -> dict:
         """
         The core tool-use loop.
@@ -224,7 +256,7 @@ class AgentRuntime:
 
         # Get available tools for this agent
         tools = self._get_agent_tools(agent)
-        tools_schema = [t["schema"] for t in tools] if tools else None
+        tools_schema = [t["schema"] for t in tools] + [tool_results.FETCH_MORE_SCHEMA] if tools else None
 
         total_input_tokens = 0
         total_output_tokens = 0
@@ -240,8 +272,17 @@ class AgentRuntime:
                     "latency_ms": total_latency,
                 }
 
-            # Trim history if token estimate is too high (rough estimate: 4 chars ≈ 1 token)
-            self._trim_history_if_needed(history, max_context_tokens=80000)
+            # Trim history to what fits the model's window / cost budget
+            self._trim_history_if_needed(
+                history,
+                max_context_tokens=token_budget.history_budget(
+                    agent.model_name, system_prompt, tools_schema, agent.max_tokens,
+                ),
+                model=agent.model_name,
+            )
+            estimated_input = token_budget.estimate_raw(system_prompt) + token_budget.estimate_raw(history) + (
+                token_budget.estimate_raw(tools_schema) if tools_schema else 0
+            )
 
             # Call Anthropic
             try:
@@ -252,10 +293,12 @@ class AgentRuntime:
                     tools=tools_schema,
                     max_tokens=agent.max_tokens,
                     temperature=agent.temperature,
+                    hedge=hedge,
                 )
             except Exception as api_exc:
                 raise self._categorize_api_error(api_exc) from api_exc
 
+            token_budget.observe(result.model_used, estimated_input, result.input_tokens)
             total_input_tokens += result.input_tokens
             total_output_tokens += result.output_tokens
             total_latency += result.latency_ms
@@ -295,13 +338,14 @@ class AgentRuntime:
                 })
             history.append({"role": "assistant", "content": assistant_content})
 
-            # Persist assistant message with tool calls
+            # Persist assistant message with tool calls; results are added below
+            calls = [dict(tc) for tc in result.tool_calls]
             self._persist_message(
                 thread_id=thread_id,
                 role=AgentMessageRoleEnum.ASSISTANT.value,
                 content=result.content or f"[Tool calls: {', '.join(tc['name'] for tc in result.tool_calls)}]",
                 from_agent_id=agent.id,
-                tool_calls=result.tool_calls,
+                tool_calls=calls,
                 model_used=result.model_used,
                 input_tokens=result.input_tokens,
                 output_tokens=result.output_tokens,
@@ -309,30 +353,36 @@ class AgentRuntime:
             )
 
             # Execute each tool call
-            tool_results = []
-            for tc in result.tool_calls:
+            result_blocks = []
+            for tc in calls:
                 tool_result = self._execute_tool(
                     agent=agent,
                     tool_name=tc["name"],
                     tool_input=tc["input"],
                     tools=tools,
                 )
-                tool_result_str = self._validate_tool_result(tool_result)
-                tool_results.append({
+                tc["result"] = tool_result
+                tool_result_str = self._validate_tool_result(
+                    tool_result,
+                    model=agent.model_name,
+                    fields=next((t.get("result_fields", ()) for t in tools if t["schema"]["name"] == tc["name"]), ()),
+                )
+                result_blocks.append({
                     "type": "tool_result",
                     "tool_use_id": tc["id"],
                     "content": tool_result_str,
                 })
 
-                # Persist tool result
+                # Persist tool result (input and raw result live on the assistant row)
                 self._persist_message(
                     thread_id=thread_id,
                     role=AgentMessageRoleEnum.TOOL.value,
                     content=tool_result_str[:4000],
-                    tool_calls=[{"tool_use_id": tc["id"], "name": tc["name"], "result": tool_result}],
+                    tool_calls=[{"tool_use_id": tc["id"], "name": tc["name"]}],
                 )
 
-            history.append({"role": "user", "content": tool_results})
+            history.append({"role": "user", "content": result_blocks})
+            self._flush_messages()
 
         # Max iterations reached
         return {
@@ -349,7 +399,7 @@ class AgentRuntime:
                 AIAgentConversation.thread_id == thread_id,
                 AIAgentConversation.organization_id == self.organization_id,
             )
-            .order_by(AIAgentConversation.created_at)
+            .order_by(AIAgentConversation.created_at, AIAgentConversation.id)
             .limit(50)  # Keep context manageable
             .all()
         )
@@ -380,23 +430,33 @@ class AgentRuntime:
         output_tokens: Optional[int] = None,
         latency_ms: Optional[int] = None,
     ):
-        """Persist a conversation message to DB."""
-        msg = AIAgentConversation(
-            organization_id=self.organization_id,
-            from_agent_id=from_agent_id,
-            to_agent_id=to_agent_id,
-            from_user_id=from_user_id,
-            thread_id=thread_id,
-            message_role=role,
-            content=content[:10000],  # Truncate very long content
-            tool_calls=tool_calls,
-            model_used=model_used,
-            token_count_input=input_tokens,
-            token_count_output=output_tokens,
-            latency_ms=latency_ms,
-        )
-        self.db.add(msg)
-        self.db.flush()
+        """
+        Buffer a conversation message; ``_flush_messages`` writes the buffer
+        in one bulk INSERT per iteration. ``created_at`` is taken now so the
+        thread keeps its order (ties are broken by id, i.e. buffer order).
+        """
+        self._pending_messages.append({
+            "organization_id": self.organization_id,
+            "from_agent_id": from_agent_id,
+            "to_agent_id": to_agent_id,
+            "from_user_id": from_user_id,
+            "thread_id": thread_id,
+            "message_role": role,
+            "content": content[:10000],  # Truncate very long content
+            "tool_calls": tool_calls,
+            "model_used": model_used,
+            "token_count_input": input_tokens,
+            "token_count_output": output_tokens,
+            "latency_ms": latency_ms,
+            "created_at": datetime.now(timezone.utc),
+        })
+
+    def _flush_messages(self) -> None:
+        """Insert the buffered conversation messages in one statement."""
+        rows, self._pending_messages = self._pending_messages, []
+        if rows:
+            # Core insert: ORM bulk inserts split rows by which columns are None
+            self.db.execute(insert(AIAgentConversation.__table__), rows)
 
     def _get_agent_tools(self, agent: AIAgent) -> list[dict]:
         """
@@ -421,6 +481,9 @@ class AgentRuntime:
         """
         Execute a tool call, checking escalation rules first.
         """
+        if tool_name == tool_results.FETCH_MORE_TOOL:
+            return self._result_pager.fetch(tool_input.get("cursor"))
+
         # Check if this tool requires escalation
         should_esc, reason = self.escalation.should_escalate(
             agent, tool_name=tool_name,
@@ -431,9 +494,17 @@ class AgentRuntime:
         # Find the tool handler
         for tool in tools:
             if tool["schema"]["name"] == tool_name:
+                read_only = tool.get("read_only", False)
+                if read_only:
+                    cached = self._tool_memo.get(tool_name, tool_input)
+                    if cached is not tool_memo.MISSING:
+                        return cached
+                else:
+                    self._tool_memo.invalidate()  # a write may change any read
+
                 handler = tool["handler"]
                 try:
-                    return handler(
+                    result = handler(
                         db=self.db,
                         params=tool_input,
                         org_id=self.organization_id,
@@ -445,37 +516,45 @@ class AgentRuntime:
                     )
                     return {"error": str(exc)}
 
-        return {"error": f"Tool '{tool_name}' not found"}
+                if read_only and not (isinstance(result, dict) and "error" in result):
+                    self._tool_memo.put(tool_name, tool_input, result)
+                return result
 
-    def _validate_tool_result(self, result: Any) -> str:
-        """Validate and truncate tool results to prevent token overflow."""
-        if result is None:
-            return '{"status": "ok"}'
-        result_str = str(result)
-        max_chars = settings.AGENT_MAX_TOOL_RESULT_CHARS
-        if len(result_str) > max_chars:
-            return result_str[:max_chars] + "... [truncado]"
-        return result_str
+        return {"error": f"Tool '{tool_name}' not found"}
 
-    def _trim_history_if_needed(self, history: list[dict], max_context_tokens: int = 80000) -> None:
-        """Trim old messages if estimated token count exceeds threshold.
+    def _memo_stats(self, hits_before: int, misses_before: int) -> dict:
+        """Tool memo hits/misses for this task (the memo may be workflow-wide)."""
+        hits = self._tool_memo.hits - hits_before
+        misses = self._tool_memo.misses - misses_before
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+        }
 
-        Keeps the first message (user's original) and the last 10 messages.
-        """
-        estimated_tokens = sum(
-            len(json.dumps(msg, default=str)) // 4 for msg in history
+    def _validate_tool_result(self, result: Any, model: Optional[str] = None, fields: tuple = ()) -> str:
+        """Compact, paginate and truncate tool results to prevent token overflow."""
+        return tool_results.serialize(
+            result,
+            fields=fields,
+            pager=self._result_pager,
+            max_tokens=settings.AGENT_MAX_TOOL_RESULT_TOKENS,
+            model=model,
         )
-        if estimated_tokens <= max_context_tokens or len(history) <= 12:
-            return
-        # Keep first message + last 10
-        trimmed = [history[0]] + history[-10:]
-        history.clear()
-        history.extend(trimmed)
-        logger.info("Trimmed conversation history from %d estimated tokens", estimated_tokens)
+
+    def _trim_history_if_needed(
+        self, history: list[dict], max_context_tokens: int = 80000, model: Optional[str] = None,
+    ) -> None:
+        """Drop the oldest messages (keeping the first) until history fits the budget."""
+        dropped = token_budget.trim_history(history, max_context_tokens, model)
+        if dropped:
+            logger.info("Trimmed %d message(s) from conversation history (budget %d tokens)", dropped, max_context_tokens)
 
     @staticmethod
     def _categorize_api_error(exc: Exception) -> Exception:
         """Translate Anthropic API errors into user-friendly messages."""
+        if isinstance(exc, AIServiceError):
+            return exc  # already structured, message in Spanish
         exc_type = type(exc).__name__
         exc_msg = str(exc)
         if "AuthenticationError" in exc_type or "authentication" in exc_msg.lower():
@@ -19,6 +19,8 @@ class ToolDefinition:
     handler: Callable
     requires_approval: bool = False
     skill_key: str = ""
+    read_only: bool = False  # No side effects: results may be memoized per task/workflow
+    result_fields: tuple[str, ...] = ()  # Projection of list records sent to the model (empty: all)
 
 
 # ── Registry ──────────────────────────────────────────────────────────────────
@@ -41,7 +43,8 @@ def get_tools_for_agent(agent: AIAgent) -> list[dict]:
     """
     Get tool definitions available to an agent based on its enabled skills.
 
-    Returns list of dicts with keys: name, schema, handler, requires_approval, skill_key
+    Returns list of dicts with keys: name, schema, handler, requires_approval, skill_key,
+    read_only, result_fields
     """
     enabled_skills = {s.skill_key for s in agent.skills if s.is_enabled}
 
@@ -67,6 +70,8 @@ def get_tools_for_agent(agent: AIAgent) -> list[dict]:
                 "handler": tool.handler,
                 "requires_approval": tool.requires_approval,
                 "skill_key": tool.skill_key,
+                "read_only": tool.read_only,
+                "result_fields": tool.result_fields,
             })
     return result
 
@@ -75,7 +80,7 @@ def get_tools_for_agent(agent: AIAgent) -> list[dict]:
 
 def _load_all():
     from app.core.agent_tools import legal, financial, communication, document
-    from app.core.agent_tools import judicial, notarial, system
+    from app.core.agent_tools import judicial, notarial, system, knowledge
 
     _register_tools(legal.TOOLS)
     _register_tools(financial.TOOLS)
@@ -84,6 +89,7 @@ def _load_all():
     _register_tools(judicial.TOOLS)
     _register_tools(notarial.TOOLS)
     _register_tools(system.TOOLS)
+    _register_tools(knowledge.TOOLS)
 
 
 # Auto-load on import
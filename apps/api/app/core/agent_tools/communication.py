@@ -224,6 +224,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_email_tickets,
+        read_only=True,
         skill_key="email_management",
     ),
     ToolDefinition(
@@ -238,6 +239,9 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_communications_history,
+        read_only=True,
+        # Addresses live on the entity; the model only needs what happened when
+        result_fields=("id", "channel", "direction", "subject", "status", "created_at"),
         skill_key="comunicaciones",
     ),
 ]
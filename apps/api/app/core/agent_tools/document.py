@@ -3,14 +3,14 @@
 import logging
 
 from sqlalchemy.orm import Session
-from jinja2.sandbox import SandboxedEnvironment, SecurityError
+from jinja2.sandbox import SecurityError
 
 from app.core.agent_tools import ToolDefinition
+from app.core.template_engine import get_compiled
 from app.db.models import Document, Template
 from app.db.enums import DocumentTypeEnum, DocumentStatusEnum, TemplateTypeEnum
 
 logger = logging.getLogger(__name__)
-_sandbox_env = SandboxedEnvironment(autoescape=True)
 
 
 def list_documents(db: Session, params: dict, org_id: int) -> dict:
@@ -91,8 +91,7 @@ def render_template(db: Session, params: dict, org_id: int) -> dict:
     content = template.content_text
     variables = params.get("variables", {})
     try:
-        jinja_tmpl = _sandbox_env.from_string(content)
-        rendered = jinja_tmpl.render(**{str(k): str(v) for k, v in variables.items()})
+        rendered = get_compiled(template).render(**{str(k): str(v) for k, v in variables.items()})
     except SecurityError as e:
         return {"error": f"Operación no permitida en plantilla: {e}"}
     except Exception as e:
@@ -138,6 +137,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=list_documents,
+        read_only=True,
         skill_key="gestion_documental",
     ),
     ToolDefinition(
@@ -151,6 +151,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_template,
+        read_only=True,
         skill_key="gestion_documental",
     ),
     ToolDefinition(
@@ -161,6 +162,7 @@ TOOLS: list[ToolDefinition] = [
             "properties": {},
         },
         handler=list_templates,
+        read_only=True,
         skill_key="gestion_documental",
     ),
     ToolDefinition(
@@ -175,6 +177,7 @@ TOOLS: list[ToolDefinition] = [
             "required": ["template_id"],
         },
         handler=render_template,
+        read_only=True,
         skill_key="gestion_documental",
     ),
     ToolDefinition(
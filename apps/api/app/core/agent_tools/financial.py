@@ -174,6 +174,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_overdue_invoices,
+        read_only=True,
         skill_key="cobranza",
     ),
     ToolDefinition(
@@ -187,6 +188,7 @@ TOOLS: list[ToolDefinition] = [
             "required": ["invoice_id"],
         },
         handler=get_invoice_details,
+        read_only=True,
         skill_key="facturacion",
     ),
     ToolDefinition(
@@ -211,6 +213,7 @@ TOOLS: list[ToolDefinition] = [
             "properties": {},
         },
         handler=generate_financial_report,
+        read_only=True,
         skill_key="reportes_financieros",
     ),
     ToolDefinition(
@@ -224,6 +227,7 @@ TOOLS: list[ToolDefinition] = [
             "required": ["client_id"],
         },
         handler=get_client_balance,
+        read_only=True,
         skill_key="analisis_rentabilidad",
     ),
 ]
@@ -137,6 +137,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_court_actions,
+        read_only=True,
         skill_key="gestiones_tribunales",
     ),
     ToolDefinition(
@@ -169,6 +170,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_deadlines,
+        read_only=True,
         skill_key="seguimiento_judicial",
     ),
     ToolDefinition(
@@ -0,0 +1,62 @@
+"""Knowledge tools — BM25 retrieval over the firm's documents, matters and communications."""
+
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core import knowledge_index
+from app.core.agent_tools import ToolDefinition
+
+logger = logging.getLogger(__name__)
+
+
+def search_firm_knowledge(db: Session, params: dict, org_id: int) -> dict:
+    """Return the top-k passages relevant to a free-text query."""
+    query = (params.get("query") or "").strip()
+    if not query:
+        return {"error": "Debe indicar una consulta"}
+    try:
+        top_k = max(1, min(int(params.get("top_k") or 5), knowledge_index.MAX_TOP_K))
+    except (TypeError, ValueError):
+        return {"error": f"top_k debe ser un entero entre 1 y {knowledge_index.MAX_TOP_K}"}
+    source_types = [s for s in params.get("source_types") or [] if s in knowledge_index.SOURCE_TYPES]
+
+    knowledge_index.ensure_fresh(db, org_id)
+    passages = knowledge_index.search(
+        org_id,
+        query,
+        top_k=top_k,
+        source_types=source_types or None,
+        matter_id=params.get("matter_id"),
+    )
+    return {"query": query, "count": len(passages), "passages": passages}
+
+
+TOOLS = [
+    ToolDefinition(
+        name="search_firm_knowledge",
+        description=(
+            "Buscar en el conocimiento del estudio (texto de documentos, descripciones de causas y "
+            "comunicaciones) y obtener solo los pasajes más relevantes, ordenados por relevancia."
+        ),
+        input_schema={
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "Consulta en lenguaje natural o palabras clave"},
+                "top_k": {
+                    "type": "integer",
+                    "description": f"Pasajes a devolver (máx. {knowledge_index.MAX_TOP_K}, por defecto 5)",
+                },
+                "source_types": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(knowledge_index.SOURCE_TYPES)},
+                    "description": "Limitar a document, matter y/o communication",
+                },
+                "matter_id": {"type": "integer", "description": "Limitar a una causa"},
+            },
+            "required": ["query"],
+        },
+        handler=search_firm_knowledge,
+        read_only=True,
+    ),
+]
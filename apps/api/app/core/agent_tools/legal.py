@@ -141,6 +141,7 @@ TOOLS: list[ToolDefinition] = [
             "required": ["matter_id"],
         },
         handler=get_matter_details,
+        read_only=True,
         skill_key="analisis_casos",
     ),
     ToolDefinition(
@@ -156,6 +157,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=search_matters,
+        read_only=True,
         skill_key="analisis_casos",
     ),
     ToolDefinition(
@@ -187,6 +189,7 @@ TOOLS: list[ToolDefinition] = [
             "required": ["matter_id"],
         },
         handler=analyze_case_law,
+        read_only=True,
         skill_key="jurisprudencia",
     ),
     ToolDefinition(
@@ -200,6 +203,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_leads,
+        read_only=True,
         skill_key="investigacion_legal",
     ),
     ToolDefinition(
@@ -213,6 +217,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_contracts,
+        read_only=True,
         skill_key="revision_contratos",
     ),
 ]
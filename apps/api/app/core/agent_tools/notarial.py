@@ -142,6 +142,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_notary_documents,
+        read_only=True,
         skill_key="tramites_notariales",
     ),
     ToolDefinition(
@@ -183,6 +184,7 @@ TOOLS: list[ToolDefinition] = [
             "properties": {},
         },
         handler=get_pending_notary_actions,
+        read_only=True,
         skill_key="tramites_notariales",
     ),
 ]
@@ -181,6 +181,7 @@ TOOLS: list[ToolDefinition] = [
             "properties": {},
         },
         handler=get_system_health,
+        read_only=True,
         skill_key="monitoreo_sistema",
     ),
     ToolDefinition(
@@ -196,6 +197,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_audit_trail,
+        read_only=True,
         skill_key="logs_analysis",
     ),
     ToolDefinition(
@@ -243,6 +245,7 @@ TOOLS: list[ToolDefinition] = [
             },
         },
         handler=get_tasks,
+        read_only=True,
         skill_key="apoyo_general",
     ),
     ToolDefinition(
@@ -3,18 +3,32 @@ Anthropic API client with tool_use support, streaming, and model fallback.
 
 Wraps the Anthropic SDK to provide:
 - Synchronous and streaming message sending with tool_use
+- Retries with exponential backoff and full jitter, honoring ``retry-after``
 - Automatic fallback from Opus → Sonnet on 429/overloaded
+- A per-model circuit breaker (shared through Redis) so a model that keeps
+  failing is skipped for a cool-down instead of being hammered
+- Optional hedged requests for latency-sensitive chat: if the first
+  attempt hasn't answered after ``ANTHROPIC_HEDGE_DELAY_MS`` a duplicate
+  is sent and the first response wins
+- Structured ``AIServiceError`` subclasses (Spanish, user-facing messages)
+  the runtime can act on
 - Token/latency tracking for cost analytics
+
+The ``anthropic`` SDK is imported lazily (it adds ~1.5 s to cold import),
+so routers that reference the runtime don't pay for it until first use.
 """
 
 import logging
+import random
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, AsyncGenerator, Optional
-
-import anthropic
+from typing import Any, AsyncGenerator, Callable, Optional
 
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.metrics import observe_anthropic_call
+from app.core.timing import record_timing
 
 logger = logging.getLogger(__name__)
 
@@ -31,19 +45,161 @@ class MessageResult:
     model_used: str = ""
 
 
+# ── Structured errors ────────────────────────────────────────────────────────
+
+class AIServiceError(RuntimeError):
+    """
+    A failed call to the AI provider. ``str(exc)`` is safe to show users;
+    ``code`` / ``retryable`` / ``retry_after`` are for the caller.
+    """
+
+    code = "ai_error"
+    retryable = False
+    default_message = "Error interno del servicio de IA."
+
+    def __init__(
+        self,
+        message: Optional[str] = None,
+        *,
+        model: str = "",
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message or self.default_message)
+        self.model = model
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AIAuthenticationError(AIServiceError):
+    code = "auth"
+    default_message = "Error de configuración: clave API inválida. Contacte al administrador."
+
+
+class AIBadRequestError(AIServiceError):
+    code = "bad_request"
+    default_message = "La solicitud al servicio de IA no es válida."
+
+
+class AIRateLimitError(AIServiceError):
+    code = "rate_limited"
+    retryable = True
+    default_message = "Servicio de IA saturado. Intente de nuevo en unos minutos."
+
+
+class AIOverloadedError(AIServiceError):
+    code = "overloaded"
+    retryable = True
+    default_message = "Servicio de IA saturado. Intente de nuevo en unos minutos."
+
+
+class AIServerError(AIServiceError):
+    code = "server_error"
+    retryable = True
+
+
+class AIConnectionError(AIServiceError):
+    code = "connection"
+    retryable = True
+    default_message = "Sin conexión al servicio de IA. Verifique la conectividad."
+
+
+class AITimeoutError(AIServiceError):
+    code = "timeout"
+    retryable = True
+    default_message = "El servicio de IA no respondió a tiempo. Intente de nuevo."
+
+
+class AICircuitOpenError(AIServiceError):
+    code = "circuit_open"
+    default_message = "Servicio de IA temporalmente deshabilitado por fallas repetidas. Intente más tarde."
+
+
+def _retry_after(headers) -> Optional[float]:
+    if not headers:
+        return None
+    for name in ("retry-after-ms", "retry-after"):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        return seconds / 1000 if name == "retry-after-ms" else seconds
+    return None
+
+
+def classify_error(exc: Exception, model: str = "") -> AIServiceError:
+    """Map an SDK/transport exception onto an ``AIServiceError`` subclass."""
+    if isinstance(exc, AIServiceError):
+        return exc
+
+    import anthropic
+
+    if isinstance(exc, anthropic.APITimeoutError):
+        return AITimeoutError(model=model)
+    if isinstance(exc, anthropic.APIConnectionError):
+        return AIConnectionError(model=model)
+    if isinstance(exc, anthropic.APIStatusError):
+        status = exc.status_code
+        retry_after = _retry_after(getattr(exc.response, "headers", None))
+        kwargs = {"model": model, "status_code": status, "retry_after": retry_after}
+        if status in (401, 403):
+            return AIAuthenticationError(**kwargs)
+        if status == 429:
+            return AIRateLimitError(**kwargs)
+        if status == 529:
+            return AIOverloadedError(**kwargs)
+        if status >= 500:
+            return AIServerError(f"Error interno del servicio de IA ({status}).", **kwargs)
+        return AIBadRequestError(f"La solicitud al servicio de IA no es válida ({status}).", **kwargs)
+    return AIServiceError(f"Error interno del servicio de IA: {str(exc)[:200]}", model=model)
+
+
+# Per-model breaker: one cool-down shared by every worker
+model_breaker = CircuitBreaker(
+    "anthropic_model",
+    failure_threshold=lambda: settings.ANTHROPIC_CIRCUIT_FAILURE_THRESHOLD,
+    cooldown_seconds=lambda: settings.ANTHROPIC_CIRCUIT_COOLDOWN_SECONDS,
+)
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        _hedge_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="anthropic-hedge")
+    return _hedge_pool
+
+
 class AnthropicClient:
     """
     Wrapper around Anthropic SDK with tool_use, streaming, and fallback.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
         self.api_key = api_key or settings.ANTHROPIC_API_KEY
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY is required for AnthropicClient")
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        import anthropic
+        # Retries are ours (jitter, breaker, fallback) — the SDK's are off
+        self.client = anthropic.Anthropic(
+            api_key=self.api_key,
+            base_url=base_url or settings.ANTHROPIC_BASE_URL or None,
+            timeout=settings.ANTHROPIC_TIMEOUT_SECONDS,
+            max_retries=0,
+        )
         self._fallback_map = {
             settings.ANTHROPIC_OPUS_MODEL: settings.ANTHROPIC_SONNET_MODEL,
         }
+        self._sleep = sleep
 
     def send_message(
         self,
@@ -53,10 +209,16 @@ class AnthropicClient:
         tools: Optional[list[dict]] = None,
         max_tokens: int = 4096,
         temperature: float = 0.3,
+        hedge: bool = False,
     ) -> MessageResult:
         """
         Send a message to Anthropic with optional tool_use definitions.
-        Falls back to a lighter model on 429/overloaded errors.
+
+        Retryable failures (429, overloaded, 5xx, connection, timeout) are
+        retried up to ``AGENT_MAX_RETRIES`` times with jittered backoff;
+        429/overloaded switch to the lighter fallback model. ``hedge=True``
+        sends a duplicate request if the first is slow (chat only — it can
+        double the token cost of that turn). Raises ``AIServiceError``.
         """
         start = time.monotonic()
         kwargs: dict[str, Any] = {
@@ -69,22 +231,94 @@ class AnthropicClient:
         if tools:
             kwargs["tools"] = tools
 
-        try:
-            response = self.client.messages.create(**kwargs)
-        except (anthropic.RateLimitError, anthropic.InternalServerError) as exc:
-            fallback = self._fallback_map.get(model)
-            if fallback:
-                logger.warning(
-                    "Anthropic %s failed (%s), falling back to %s",
-                    model, type(exc).__name__, fallback,
-                )
-                kwargs["model"] = fallback
-                response = self.client.messages.create(**kwargs)
-            else:
-                raise
+        response = self._send_with_retries(kwargs, hedge=hedge)
 
         elapsed_ms = int((time.monotonic() - start) * 1000)
-        return self._parse_response(response, elapsed_ms)
+        record_timing("ai", elapsed_ms)
+        result = self._parse_response(response, elapsed_ms)
+        observe_anthropic_call(result.model_used, elapsed_ms / 1000, result.input_tokens, result.output_tokens)
+        return result
+
+    def _candidates(self, model: str) -> list[str]:
+        chain = [model]
+        fallback = self._fallback_map.get(model)
+        if fallback and fallback != model:
+            chain.append(fallback)
+        return chain
+
+    def _send_with_retries(self, kwargs: dict, hedge: bool = False):
+        models = self._candidates(kwargs["model"])
+        attempts = settings.AGENT_MAX_RETRIES + 1
+        last_error: Optional[AIServiceError] = None
+
+        for attempt in range(attempts):
+            model = next((m for m in models if model_breaker.allow(m)), None)
+            if model is None:
+                raise last_error or AICircuitOpenError(model=kwargs["model"])
+
+            try:
+                response = self._create({**kwargs, "model": model}, hedge=hedge)
+            except Exception as exc:
+                error = classify_error(exc, model)
+                if not error.retryable:
+                    # Says nothing about the model's health: leave its
+                    # failure streak alone, just free a probe slot
+                    model_breaker.release_probe(model)
+                    raise error from exc
+                model_breaker.record_failure(model)
+                last_error = error
+                if isinstance(error, (AIRateLimitError, AIOverloadedError)) and model in models[:-1]:
+                    logger.warning(
+                        "Anthropic %s failed (%s), falling back to %s",
+                        model, error.code, models[models.index(model) + 1],
+                    )
+                    models = models[models.index(model) + 1:]
+                    continue  # the fallback is a different quota: no wait
+                if attempt + 1 < attempts:
+                    delay = self._backoff(attempt, error.retry_after)
+                    logger.warning(
+                        "Anthropic %s failed (%s), retry %d/%d in %.2fs",
+                        model, error.code, attempt + 1, attempts - 1, delay,
+                    )
+                    self._sleep(delay)
+                continue
+
+            model_breaker.record_success(model)
+            return response
+
+        raise last_error
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff; never earlier than ``retry-after``."""
+        cap = settings.ANTHROPIC_RETRY_MAX_DELAY
+        delay = random.uniform(0, min(cap, settings.ANTHROPIC_RETRY_BASE_DELAY * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, cap))
+        return delay
+
+    def _create(self, kwargs: dict, hedge: bool = False):
+        """One attempt; with ``hedge`` a duplicate races the slow first request."""
+        hedge_delay = settings.ANTHROPIC_HEDGE_DELAY_MS / 1000
+        if not hedge or hedge_delay <= 0:
+            return self.client.messages.create(**kwargs)
+
+        pool = _get_hedge_pool()
+        pending = {pool.submit(self.client.messages.create, **kwargs)}
+        done, pending = wait(pending, timeout=hedge_delay)
+        if not done:
+            logger.info("Anthropic %s slower than %.1fs, sending hedged request", kwargs["model"], hedge_delay)
+            pending.add(pool.submit(self.client.messages.create, **kwargs))
+
+        error: Optional[BaseException] = None
+        while True:
+            for future in done:
+                if future.exception() is None:
+                    return future.result()  # the loser finishes in the background
+                error = future.exception()
+            if not pending:
+                raise error
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
 
     def send_message_stream(
         self,
@@ -119,47 +353,61 @@ class AnthropicClient:
         output_tokens = 0
         stop_reason = ""
 
-        with self.client.messages.stream(**kwargs) as stream:
-            for event in stream:
-                if event.type == "content_block_delta":
-                    if hasattr(event.delta, "text"):
-                        full_text += event.delta.text
-                        yield ("text", event.delta.text)
-                elif event.type == "content_block_start":
-                    if event.content_block.type == "tool_use":
-                        tool_calls.append({
-                            "id": event.content_block.id,
-                            "name": event.content_block.name,
-                            "input": {},
-                        })
-                elif event.type == "content_block_delta":
-                    if hasattr(event.delta, "partial_json") and tool_calls:
-                        pass  # JSON accumulates; final parse below
-                elif event.type == "message_delta":
-                    stop_reason = getattr(event.delta, "stop_reason", "") or ""
-                    output_tokens = getattr(event.usage, "output_tokens", 0) if hasattr(event, "usage") else 0
-                elif event.type == "message_start":
-                    if hasattr(event.message, "usage"):
-                        input_tokens = event.message.usage.input_tokens
-
-            # Get final message for complete tool_calls
-            final = stream.get_final_message()
-            if final:
-                tool_calls = []
-                for block in final.content:
-                    if block.type == "tool_use":
-                        tool_calls.append({
-                            "id": block.id,
-                            "name": block.name,
-                            "input": block.input,
-                        })
-                        yield ("tool_use", tool_calls[-1])
-                if final.usage:
-                    input_tokens = final.usage.input_tokens
-                    output_tokens = final.usage.output_tokens
-                stop_reason = final.stop_reason or ""
+        # No retries once text has been streamed to the caller; the breaker
+        # and error mapping still apply.
+        if not model_breaker.allow(model):
+            raise AICircuitOpenError(model=model)
+        try:
+            with self.client.messages.stream(**kwargs) as stream:
+                for event in stream:
+                    if event.type == "content_block_delta":
+                        if hasattr(event.delta, "text"):
+                            full_text += event.delta.text
+                            yield ("text", event.delta.text)
+                    elif event.type == "content_block_start":
+                        if event.content_block.type == "tool_use":
+                            tool_calls.append({
+                                "id": event.content_block.id,
+                                "name": event.content_block.name,
+                                "input": {},
+                            })
+                    elif event.type == "content_block_delta":
+                        if hasattr(event.delta, "partial_json") and tool_calls:
+                            pass  # JSON accumulates; final parse below
+                    elif event.type == "message_delta":
+                        stop_reason = getattr(event.delta, "stop_reason", "") or ""
+                        output_tokens = getattr(event.usage, "output_tokens", 0) if hasattr(event, "usage") else 0
+                    elif event.type == "message_start":
+                        if hasattr(event.message, "usage"):
+                            input_tokens = event.message.usage.input_tokens
+
+                # Get final message for complete tool_calls
+                final = stream.get_final_message()
+                if final:
+                    tool_calls = []
+                    for block in final.content:
+                        if block.type == "tool_use":
+                            tool_calls.append({
+                                "id": block.id,
+                                "name": block.name,
+                                "input": block.input,
+                            })
+                            yield ("tool_use", tool_calls[-1])
+                    if final.usage:
+                        input_tokens = final.usage.input_tokens
+                        output_tokens = final.usage.output_tokens
+                    stop_reason = final.stop_reason or ""
+        except Exception as exc:
+            error = classify_error(exc, model)
+            if error.retryable:
+                model_breaker.record_failure(model)
+            else:
+                model_breaker.release_probe(model)
+            raise error from exc
+        model_breaker.record_success(model)
 
         elapsed_ms = int((time.monotonic() - start) * 1000)
+        record_timing("ai", elapsed_ms)
         result = MessageResult(
             content=full_text,
             tool_calls=tool_calls,
@@ -169,6 +417,7 @@ class AnthropicClient:
             latency_ms=elapsed_ms,
             model_used=model,
         )
+        observe_anthropic_call(model, elapsed_ms / 1000, input_tokens, output_tokens)
         yield ("result", result)
 
     def _parse_response(self, response, elapsed_ms: int) -> MessageResult:
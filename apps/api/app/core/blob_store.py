@@ -0,0 +1,152 @@
+"""
+Content-addressed, deduplicating blob store for Logan Virtual documents.
+
+Uploads are hashed (SHA-256) in a single streamed pass and stored once
+under ``blobs/<aa>/<bb>/<digest>``. A ``StorageBlob`` row tracks each
+unique object and how many documents reference it, so uploading the same
+court resolution or notary scan again only bumps a counter.
+
+Releasing a reference never deletes bytes directly: blobs that drop to
+zero references are removed by ``purge_unreferenced_blobs`` (daily Celery
+task), which deletes the object while holding the row lock so a
+concurrent re-upload of the same content cannot lose its bytes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.storage import CHUNK_SIZE, StorageBackend, get_storage
+from app.db.models.storage_blob import StorageBlob
+
+logger = logging.getLogger(__name__)
+
+BLOB_PREFIX = "blobs"
+
+# Non-seekable streams are spooled while hashing; kept in memory up to this size
+_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def blob_path(digest: str) -> str:
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def hash_stream(stream: BinaryIO) -> tuple[BinaryIO, str, int]:
+    """
+    Hash ``stream`` chunk by chunk.
+
+    Returns a stream positioned at the original start (the same object when
+    it is seekable, otherwise a spooled copy), the hex digest and the size.
+    """
+    sha = hashlib.sha256()
+    size = 0
+    seekable = stream.seekable()
+    start = stream.tell() if seekable else 0
+    spool = None if seekable else tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY)
+
+    while chunk := stream.read(CHUNK_SIZE):
+        sha.update(chunk)
+        size += len(chunk)
+        if spool is not None:
+            spool.write(chunk)
+
+    if spool is None:
+        stream.seek(start)
+        return stream, sha.hexdigest(), size
+    spool.seek(0)
+    return spool, sha.hexdigest(), size
+
+
+def _add_reference(db: Session, blob: StorageBlob) -> bool:
+    """Atomically increment the reference count; False if the row vanished."""
+    updated = (
+        db.query(StorageBlob)
+        .filter(StorageBlob.id == blob.id)
+        .update({StorageBlob.ref_count: StorageBlob.ref_count + 1}, synchronize_session=False)
+    )
+    db.expire(blob, ["ref_count"])
+    return updated == 1
+
+
+def store_blob(
+    db: Session,
+    stream: BinaryIO,
+    storage: Optional[StorageBackend] = None,
+    digest: Optional[str] = None,
+    size: Optional[int] = None,
+) -> StorageBlob:
+    """
+    Store ``stream`` content-addressed and add one reference to its blob.
+
+    Bytes are only written when no blob with the same digest exists. The
+    reference is part of the caller's transaction; commit it together with
+    the ``Document`` that points at ``blob.storage_path``.
+
+    Pass ``digest``/``size`` when the stream was already hashed (e.g. by
+    ``validate_upload_stream``) and is positioned at its start.
+    """
+    storage = storage or get_storage()
+    if digest is None or size is None:
+        stream, digest, size = hash_stream(stream)
+
+    for _ in range(3):
+        blob = db.query(StorageBlob).filter(StorageBlob.digest == digest).first()
+        if blob is not None:
+            if blob.ref_count <= 0 and not storage.exists(blob.storage_path):
+                # Unreferenced blob already purged from storage — restore its bytes
+                storage.put_stream(blob.storage_path, stream)
+                stream.seek(0)
+            if _add_reference(db, blob):
+                logger.info("Blob dedup hit: %s (%d bytes)", digest[:12], size)
+                return blob
+            continue  # purged concurrently; store it again
+
+        path = blob_path(digest)
+        storage.put_stream(path, stream)  # idempotent: same digest, same bytes
+        stream.seek(0)
+        try:
+            with db.begin_nested():
+                blob = StorageBlob(digest=digest, size_bytes=size, storage_path=path, ref_count=1)
+                db.add(blob)
+            return blob
+        except IntegrityError:
+            continue  # concurrent upload of the same content won the insert
+
+    raise RuntimeError(f"No se pudo registrar el blob {digest}")
+
+
+def release_blob(db: Session, digest: str) -> None:
+    """Drop one reference to a blob (bytes are purged later)."""
+    db.query(StorageBlob).filter(
+        StorageBlob.digest == digest, StorageBlob.ref_count > 0
+    ).update({StorageBlob.ref_count: StorageBlob.ref_count - 1}, synchronize_session=False)
+
+
+def purge_unreferenced_blobs(
+    db: Session,
+    storage: Optional[StorageBackend] = None,
+    grace: timedelta = timedelta(hours=1),
+) -> int:
+    """Delete blobs with no references that have been idle for ``grace``."""
+    storage = storage or get_storage()
+    cutoff = datetime.now(timezone.utc) - grace
+    blobs = (
+        db.query(StorageBlob)
+        .filter(StorageBlob.ref_count <= 0, StorageBlob.updated_at < cutoff)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    for blob in blobs:
+        storage.delete(blob.storage_path)
+        db.delete(blob)
+    db.commit()
+    if blobs:
+        logger.info("Purged %d unreferenced blobs", len(blobs))
+    return len(blobs)
@@ -0,0 +1,211 @@
+"""
+Shared circuit breakers for Logan Virtual.
+
+Consecutive-failure counters and breaker state live in Redis, so every
+API worker and Celery process sees the same numbers. Without Redis they
+fall back to a per-process table, which still spans instances within the
+process.
+
+States per key:
+
+- **closed**: calls go through; each failure increments the counter and
+  a success clears it.
+- **open**: ``failure_threshold`` consecutive failures trip the breaker;
+  ``allow()`` is False for ``cooldown_seconds``.
+- **half-open**: after the cool-down (or when a health check calls
+  ``half_open()``) exactly one caller is let through as a probe. Success
+  closes the breaker; failure re-opens it for another cool-down.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from app.core import redis_client
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_TTL_SECONDS = 24 * 3600  # forget stale failure streaks
+PROBE_TTL_SECONDS = 120  # a probe that never reports back frees the slot
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int | Callable[[], int],
+        cooldown_seconds: float | Callable[[], float],
+    ):
+        self.name = name
+        self._threshold = failure_threshold
+        self._cooldown = cooldown_seconds
+        self._local: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    # Thresholds may be callables so tests and settings changes apply live
+    @property
+    def failure_threshold(self) -> int:
+        return self._threshold() if callable(self._threshold) else self._threshold
+
+    @property
+    def cooldown_seconds(self) -> float:
+        return self._cooldown() if callable(self._cooldown) else self._cooldown
+
+    def _keys(self, key) -> tuple[str, str, str]:
+        base = f"breaker:{self.name}:{key}"
+        return f"{base}:failures", f"{base}:open", f"{base}:probe"
+
+    # ── Public API ───────────────────────────────────────────────────────
+
+    def allow(self, key) -> bool:
+        """Whether a call for ``key`` may proceed (takes the probe slot when half-open)."""
+        r = redis_client.get_redis()
+        if r is not None:
+            failures_key, open_key, probe_key = self._keys(key)
+            try:
+                failures, is_open = r.pipeline(transaction=False).get(failures_key).exists(open_key).execute()
+                if is_open:
+                    return False
+                if int(failures or 0) < self.failure_threshold:
+                    return True
+                return bool(r.set(probe_key, 1, nx=True, ex=PROBE_TTL_SECONDS))
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(str(key))
+            if entry is None or entry["failures"] < self.failure_threshold:
+                return True
+            if now < entry["open_until"] or now < entry["probe_until"]:
+                return False
+            entry["probe_until"] = now + PROBE_TTL_SECONDS
+            return True
+
+    def record_failure(self, key) -> int:
+        """Count a consecutive failure; trips the breaker at the threshold."""
+        threshold, cooldown = self.failure_threshold, self.cooldown_seconds
+        r = redis_client.get_redis()
+        if r is not None:
+            failures_key, open_key, probe_key = self._keys(key)
+            try:
+                count, _ = r.pipeline(transaction=False).incr(failures_key).expire(
+                    failures_key, FAILURE_TTL_SECONDS,
+                ).execute()
+                if count >= threshold:
+                    r.pipeline(transaction=False).set(open_key, 1, ex=max(int(cooldown), 1)).delete(probe_key).execute()
+                    self._log_open(key, count)
+                return int(count)
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.setdefault(str(key), {"failures": 0, "open_until": 0.0, "probe_until": 0.0})
+            entry["failures"] += 1
+            count = entry["failures"]
+            if count >= threshold:
+                entry["open_until"] = now + cooldown
+                entry["probe_until"] = 0.0
+        if count >= threshold:
+            self._log_open(key, count)
+        return count
+
+    def record_success(self, key) -> None:
+        """Clear the failure streak and close the breaker."""
+        r = redis_client.get_redis()
+        if r is not None:
+            try:
+                r.delete(*self._keys(key))
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+        with self._lock:
+            self._local.pop(str(key), None)
+
+    def release_probe(self, key) -> None:
+        """Free the probe slot without counting the call either way."""
+        r = redis_client.get_redis()
+        if r is not None:
+            try:
+                r.delete(self._keys(key)[2])
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+        with self._lock:
+            entry = self._local.get(str(key))
+            if entry is not None:
+                entry["probe_until"] = 0.0
+
+    def half_open(self, key) -> None:
+        """End the cool-down early; the next call becomes the probe."""
+        r = redis_client.get_redis()
+        if r is not None:
+            try:
+                _, open_key, probe_key = self._keys(key)
+                r.delete(open_key, probe_key)
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+        with self._lock:
+            entry = self._local.get(str(key))
+            if entry is not None:
+                entry["open_until"] = entry["probe_until"] = 0.0
+
+    def open_remaining(self, key) -> float:
+        """Seconds left in the cool-down of an open breaker (0 when not open)."""
+        r = redis_client.get_redis()
+        if r is not None:
+            try:
+                ttl = r.ttl(self._keys(key)[1])
+                return float(max(ttl, 0))
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+        with self._lock:
+            entry = self._local.get(str(key))
+            if entry is None or entry["failures"] < self.failure_threshold:
+                return 0.0
+            return max(entry["open_until"] - time.monotonic(), 0.0)
+
+    def state(self, key) -> str:
+        r = redis_client.get_redis()
+        if r is not None:
+            failures_key, open_key, _ = self._keys(key)
+            try:
+                failures, is_open = r.pipeline(transaction=False).get(failures_key).exists(open_key).execute()
+                if is_open:
+                    return OPEN
+                return HALF_OPEN if int(failures or 0) >= self.failure_threshold else CLOSED
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+
+        with self._lock:
+            entry = self._local.get(str(key))
+            if entry is None or entry["failures"] < self.failure_threshold:
+                return CLOSED
+            return OPEN if time.monotonic() < entry["open_until"] else HALF_OPEN
+
+    def failures(self, key) -> int:
+        r = redis_client.get_redis()
+        if r is not None:
+            try:
+                return int(r.get(self._keys(key)[0]) or 0)
+            except Exception as exc:
+                redis_client.mark_redis_down(exc)
+        with self._lock:
+            return self._local.get(str(key), {}).get("failures", 0)
+
+    def reset_local(self) -> None:
+        """Forget the in-process fallback state (tests)."""
+        with self._lock:
+            self._local.clear()
+
+    def _log_open(self, key, count: int) -> None:
+        logger.warning(
+            "Circuit %s:%s open after %d consecutive failures (cool-down %.0fs)",
+            self.name, key, count, self.cooldown_seconds,
+        )
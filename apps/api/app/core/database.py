@@ -1,16 +1,35 @@
 import logging
+import threading
 import time
-from typing import Generator
+from typing import Generator, Optional
 
-from sqlalchemy import create_engine, inspect, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_QUERIES
+from app.core.query_profiler import record_query
+from app.core.timing import record_timing
 
 log = logging.getLogger("logan.database")
 
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long callers wait to check out a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
     pool_pre_ping=True,
     pool_size=10,
     max_overflow=20,
@@ -27,6 +46,147 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+# ── Read replica ─────────────────────────────────────────────────────────────
+# Optional streaming replica for heavy read-only work (reports, dashboards,
+# search, exports). Endpoints opt in with ``Depends(get_read_db)``; when no
+# replica is configured, it lags more than DATABASE_REPLICA_MAX_LAG_SECONDS
+# or it is unreachable, sessions fall back to the primary.
+
+replica_engine: Optional[Engine] = (
+    create_engine(
+        settings.DATABASE_REPLICA_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+ReplicaSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    if replica_engine is not None
+    else None
+)
+
+_REPLICA_STATUS_SQL = text(
+    "SELECT pg_is_in_recovery(),"
+    " pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn(),"
+    " EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming'),"
+    " EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+)
+
+
+def _lag_from_status(
+    in_recovery: bool, caught_up: Optional[bool], streaming: bool, replay_age: Optional[float]
+) -> Optional[float]:
+    """
+    Lag is 0 when the replica is not in recovery, or when it is streaming
+    from the primary and has replayed everything received (an idle primary
+    would otherwise look stale). A replica whose WAL receiver is down only
+    knows how old its last replayed transaction is.
+    """
+    if not in_recovery:
+        return 0.0
+    if caught_up and streaming:
+        return 0.0
+    return float(replay_age) if replay_age is not None else None
+
+
+def replica_lag_seconds() -> Optional[float]:
+    """Replication lag of the replica in seconds (None if unknown)."""
+    if replica_engine is None:
+        return None
+    with replica_engine.connect() as conn:
+        if conn.dialect.name != "postgresql":
+            return 0.0
+        status = conn.execute(_REPLICA_STATUS_SQL).one()
+    return _lag_from_status(*status)
+
+
+class _ReplicaHealth:
+    """Caches the replica staleness check for DATABASE_REPLICA_CHECK_INTERVAL seconds."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked_at = 0.0
+        self.usable = False
+
+    def reset(self) -> None:
+        self.checked_at = 0.0
+        self.usable = False
+
+    def is_usable(self) -> bool:
+        if replica_engine is None:
+            return False
+        if time.monotonic() - self.checked_at < settings.DATABASE_REPLICA_CHECK_INTERVAL:
+            return self.usable
+        with self._lock:
+            if time.monotonic() - self.checked_at >= settings.DATABASE_REPLICA_CHECK_INTERVAL:
+                self.usable = self._check()
+                self.checked_at = time.monotonic()
+        return self.usable
+
+    @staticmethod
+    def _check() -> bool:
+        try:
+            lag = replica_lag_seconds()
+        except Exception as exc:
+            log.warning("Read replica unreachable, using primary: %s", str(exc)[:120])
+            return False
+        if lag is None or lag > settings.DATABASE_REPLICA_MAX_LAG_SECONDS:
+            log.warning("Read replica lagging (%s s), using primary", lag)
+            return False
+        return True
+
+
+replica_health = _ReplicaHealth()
+
+
+def get_read_session() -> Session:
+    """Session for read-only work: replica when healthy, primary otherwise."""
+    if ReplicaSessionLocal is not None and replica_health.is_usable():
+        return ReplicaSessionLocal()
+    return SessionLocal()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    db = get_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ── Query instrumentation ────────────────────────────────────────────────────
+# Registered on the Engine class so every engine (including test engines)
+# reports its cursor time to the active request's Server-Timing collector
+# and query profiler.
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    duration_ms = (time.perf_counter() - start_times.pop()) * 1000
+    record_timing("db", duration_ms)
+    record_query(statement, duration_ms)
+    DB_QUERIES.inc()
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_cursor_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
 def _wait_for_db(max_retries: int = 10, delay: float = 2.0) -> bool:
     """Wait until PostgreSQL is ready, with retries."""
     for attempt in range(1, max_retries + 1):
@@ -46,10 +206,12 @@ def _wait_for_db(max_retries: int = 10, delay: float = 2.0) -> bool:
 
 
 def ensure_tables():
-    """Create all tables if they don't exist and seed if empty.
+    """Create missing tables and seed an empty database.
 
-    Includes retry logic to handle race conditions during container startup
-    or restarts where PostgreSQL may not be ready yet.
+    Called from the application startup hook (never at import time) unless
+    DB_AUTO_CREATE_TABLES is disabled, in which case the schema is managed
+    only by Alembic. Includes retry logic to handle race conditions during
+    container startup or restarts where PostgreSQL may not be ready yet.
     """
     if not _wait_for_db():
         log.error("❌ Skipping table creation — database unreachable.")
@@ -59,30 +221,19 @@ def ensure_tables():
         from app.db.base import Base
         import app.db.models  # noqa: F401 — register all models with Base
 
-        inspector = inspect(engine)
-        existing = inspector.get_table_names()
-
-        if "users" not in existing:
-            log.warning("⚠️  Tables missing (%d found). Running create_all...", len(existing))
-            Base.metadata.create_all(bind=engine)
-            log.info("✅ Created %d tables.", len(Base.metadata.tables))
-
-            # Seed if empty
-            db = SessionLocal()
-            try:
-                from app.db.models import User
-                if db.query(User).count() == 0:
-                    log.info("Empty database — running seed...")
-                    from app.db.seed import seed
-                    seed()
-                    log.info("✅ Seed completed.")
-            finally:
-                db.close()
-        else:
-            log.info("✅ Database OK (%d tables).", len(existing))
+        Base.metadata.create_all(bind=engine)
+        log.info("✅ Database tables ensured (%d tables).", len(Base.metadata.tables))
+
+        # Seed only when database is empty (first run)
+        db = SessionLocal()
+        try:
+            from app.db.models import User
+            if db.query(User).count() == 0:
+                log.info("Empty database — running seed...")
+                from app.db.seed import seed
+                seed()
+                log.info("✅ Seed completed.")
+        finally:
+            db.close()
     except Exception as exc:
         log.error("❌ ensure_tables() failed: %s", exc, exc_info=True)
-
-
-# Auto-run on import — guarantees tables exist before any request
-ensure_tables()
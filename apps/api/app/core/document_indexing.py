@@ -0,0 +1,170 @@
+"""
+Document text indexing for Logan Virtual.
+
+Extracts text from uploaded documents and stores it chunked in
+``document_text_chunks`` (full-text indexed on PostgreSQL), so global
+search and agents can match document contents.
+
+- Incremental: only documents whose ``content_hash`` differs from
+  ``text_indexed_hash`` are processed, i.e. each new version once.
+- Idempotent by content hash: identical bytes are extracted once; other
+  documents pointing at the same blob reuse the stored chunks.
+- CPU-bound extraction runs on the shared process pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from collections import defaultdict
+from typing import Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core import process_pool
+from app.core.storage import StorageBackend, get_storage
+from app.core.text_extraction import SUPPORTED_EXTENSIONS, chunk_text, extract_text
+from app.db.models.document import Document
+from app.db.models.document_text import DocumentTextChunk
+
+logger = logging.getLogger(__name__)
+
+UNSUPPORTED_ERROR = "unsupported"
+
+
+def pending_documents(db: Session, limit: int = 100) -> list[Document]:
+    """Documents whose current content has not been indexed yet."""
+    return (
+        db.query(Document)
+        .filter(
+            Document.content_hash.isnot(None),
+            or_(
+                Document.text_indexed_hash.is_(None),
+                Document.text_indexed_hash != Document.content_hash,
+            ),
+        )
+        .order_by(Document.id)
+        .limit(limit)
+        .all()
+    )
+
+
+def _existing_chunks(db: Session, content_hash: str) -> Optional[list[str]]:
+    """Chunks already extracted for identical bytes (any document), if any."""
+    source = (
+        db.query(DocumentTextChunk.document_id)
+        .filter(DocumentTextChunk.content_hash == content_hash)
+        .first()
+    )
+    if source is None:
+        return None
+    rows = (
+        db.query(DocumentTextChunk.text)
+        .filter(
+            DocumentTextChunk.document_id == source.document_id,
+            DocumentTextChunk.content_hash == content_hash,
+        )
+        .order_by(DocumentTextChunk.chunk_index)
+        .all()
+    )
+    return [r.text for r in rows]
+
+
+def _local_copy(storage: StorageBackend, doc: Document, workdir: str) -> str:
+    """Filesystem path for the document (materialized for remote backends)."""
+    local_path = getattr(storage, "local_path", None)
+    if local_path is not None:
+        return str(local_path(doc.storage_path))
+    target = os.path.join(workdir, doc.content_hash)
+    if not os.path.exists(target):
+        with open(target, "wb") as out:
+            for chunk in storage.iter_chunks(doc.storage_path):
+                out.write(chunk)
+    return target
+
+
+def _write_chunks(db: Session, doc: Document, chunks: list[str], error: Optional[str] = None) -> None:
+    db.query(DocumentTextChunk).filter(DocumentTextChunk.document_id == doc.id).delete(
+        synchronize_session=False
+    )
+    db.add_all(
+        DocumentTextChunk(
+            organization_id=doc.organization_id,
+            document_id=doc.id,
+            content_hash=doc.content_hash,
+            chunk_index=i,
+            text=chunk,
+        )
+        for i, chunk in enumerate(chunks)
+    )
+    doc.text_indexed_hash = doc.content_hash
+    doc.text_index_error = error[:500] if error else None
+
+
+def index_documents(
+    db: Session, documents: list[Document], storage: Optional[StorageBackend] = None
+) -> dict:
+    """Extract, chunk and store text for ``documents``; commits once."""
+    storage = storage or get_storage()
+    stats = {"indexed": 0, "reused": 0, "failed": 0, "unsupported": 0}
+
+    by_hash: dict[str, list[Document]] = defaultdict(list)
+    for doc in documents:
+        ext = os.path.splitext(doc.file_name)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            _write_chunks(db, doc, [], UNSUPPORTED_ERROR)
+            stats["unsupported"] += 1
+            continue
+        by_hash[doc.content_hash].append(doc)
+
+    jobs = []
+    for content_hash, docs in by_hash.items():
+        chunks = _existing_chunks(db, content_hash)
+        if chunks is not None:
+            for doc in docs:
+                _write_chunks(db, doc, chunks)
+            stats["reused"] += len(docs)
+        else:
+            jobs.append(content_hash)
+
+    with tempfile.TemporaryDirectory(prefix="logan-index-") as workdir:
+        items = []
+        for content_hash in jobs:
+            doc = by_hash[content_hash][0]
+            try:
+                items.append((_local_copy(storage, doc, workdir), doc.file_name, content_hash))
+            except FileNotFoundError as exc:
+                for d in by_hash[content_hash]:
+                    _write_chunks(db, d, [], f"missing: {exc}")
+                stats["failed"] += len(by_hash[content_hash])
+
+        results = process_pool.submit_all(
+            extract_text, [(path, file_name) for path, file_name, _ in items]
+        )
+        for (_path, file_name, content_hash), (_, future) in zip(items, results, strict=True):
+            docs = by_hash[content_hash]
+            exc = future.exception()
+            if exc is not None:
+                logger.warning("Text extraction failed for %s: %s", file_name, exc)
+                for doc in docs:
+                    _write_chunks(db, doc, [], f"{type(exc).__name__}: {exc}")
+                stats["failed"] += len(docs)
+                continue
+            chunks = chunk_text(future.result())
+            for doc in docs:
+                _write_chunks(db, doc, chunks)
+            stats["indexed"] += len(docs)
+
+    db.commit()
+    return stats
+
+
+def index_pending(db: Session, limit: int = 100, storage: Optional[StorageBackend] = None) -> dict:
+    documents = pending_documents(db, limit)
+    if not documents:
+        return {"indexed": 0, "reused": 0, "failed": 0, "unsupported": 0}
+    stats = index_documents(db, documents, storage)
+    logger.info("Document text indexing: %s", stats)
+    return stats
@@ -0,0 +1,198 @@
+"""
+Streamed file downloads for Logan Virtual.
+
+Builds responses for files held in a storage backend without loading
+them into memory: local files go through ``FileResponse``, other backends
+are produced chunk by chunk from ``StorageBackend.iter_chunks``. Single-range
+``Range: bytes=`` requests are answered with ``206 Partial Content``
+(resumable downloads, PDF viewers seeking through large scanned documents)
+and content-hash ETags let unchanged files revalidate with ``304``.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import re
+import zipfile
+from typing import Iterable, Iterator, Mapping, Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+from app.core.storage import StorageBackend
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Types browsers may render on our origin; anything else (SVG, HTML …) could
+# run script there, so it is always sent as an attachment
+INLINE_MEDIA_TYPES = frozenset({"application/pdf", "image/png", "image/jpeg", "image/gif", "image/webp"})
+
+# Starlette >= 0.39 answers Range / If-Range requests in FileResponse itself
+_FILE_RESPONSE_HANDLES_RANGES = hasattr(FileResponse, "_handle_single_range")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a ``Range`` header into an inclusive ``(start, end)`` byte span.
+
+    Returns ``None`` when the whole file should be sent (no header, a
+    multi-range request or a unit other than bytes). Raises 416 when the
+    range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise _unsatisfiable(size)
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise _unsatisfiable(size)
+    return start, min(end, size - 1)
+
+
+def _unsatisfiable(size: int) -> HTTPException:
+    return HTTPException(
+        status_code=416,
+        detail="Rango solicitado no válido",
+        headers={"Content-Range": f"bytes */{size}"},
+    )
+
+
+def content_disposition(file_name: str, disposition: str = "attachment") -> str:
+    """``Content-Disposition`` value that survives non-ASCII names (RFC 6266)."""
+    ascii_name = file_name.encode("ascii", "replace").decode("ascii").replace('"', "")
+    return f"{disposition}; filename=\"{ascii_name}\"; filename*=UTF-8''{quote(file_name)}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def storage_file_response(
+    storage: StorageBackend,
+    path: str,
+    file_name: str,
+    request_headers: Optional[Mapping[str, str]] = None,
+    content_hash: Optional[str] = None,
+    inline: bool = False,
+) -> Response:
+    """
+    Serve ``path`` from ``storage`` with ETag revalidation and Range support.
+
+    ``content_hash`` (the blob digest) becomes a strong ETag, so unchanged
+    documents revalidate with ``304 Not Modified``. Local files are handed to
+    ``FileResponse`` (``http.response.pathsend`` where the server supports
+    it, otherwise chunked reads off the event loop); other backends stream
+    chunks from ``iter_chunks``. ``inline`` lets browsers preview the file
+    when its type is in ``INLINE_MEDIA_TYPES``.
+    """
+    request_headers = request_headers or {}
+    etag = f'"{content_hash}"' if content_hash else None
+    guessed = mimetypes.guess_type(file_name)[0]
+    inline = inline and guessed in INLINE_MEDIA_TYPES
+    media_type = guessed if inline else "application/octet-stream"
+
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": content_disposition(file_name, "inline" if inline else "attachment"),
+        "Cache-Control": "private, no-cache",
+    }
+    if etag:
+        headers["ETag"] = etag
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
+
+    local_path = getattr(storage, "local_path", None)
+    if local_path is not None and _FILE_RESPONSE_HANDLES_RANGES:
+        try:
+            file_path = local_path(path)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Archivo no encontrado en el almacenamiento")
+        # FileResponse evaluates Range / If-Range itself against our ETag
+        return FileResponse(file_path, media_type=media_type, headers=headers)
+
+    try:
+        size = storage.size(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado en el almacenamiento")
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if if_range is not None and if_range != etag:
+        range_header = None  # representation changed (or unknown): send it whole
+    byte_range = parse_range(range_header, size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(
+            storage.iter_chunks(path), media_type=media_type, headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Length"] = str(end - start + 1)
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_chunks(path, start=start, end=end),
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+class _DrainBuffer:
+    """Write-only sink for ``zipfile``; ``drain()`` hands back what was written."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def write(self, data: bytes) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def zip_stream(entries: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+    """
+    Produce a ZIP archive incrementally from ``(name, data)`` pairs.
+
+    Each entry is compressed and yielded as soon as it is produced, so an
+    archive of thousands of generated files never sits in memory whole
+    (the sink is not seekable, so sizes go into data descriptors).
+    """
+    sink = _DrainBuffer()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, data in entries:
+            archive.writestr(name, data)
+            yield sink.drain()
+    yield sink.drain()  # central directory
@@ -0,0 +1,101 @@
+"""
+Response cache for scheduled agent drafts.
+
+Nightly jobs ask the same agent for the same text over and over (an SLA
+apology per breached ticket, a collection reminder per invoice with only
+the amount changing). Callers pass the prompt as a template with
+``{placeholder}`` markers plus the entity values; the agent writes the
+text once with the markers intact, the result is cached under
+(agent, model, normalized template, key params) and every later call
+only fills the markers in.
+
+Storage is Redis: one string per entry with a TTL, plus a sorted set of
+last-access times that caps the cache at ``AGENT_DRAFT_CACHE_MAX_ENTRIES``
+by evicting the least recently used entries. Without Redis every call is
+a miss.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Mapping, Optional
+
+from app.core import redis_client
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "agent_draft:"
+LRU_KEY = "agent_draft:lru"
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_template(template: str) -> str:
+    return _WHITESPACE.sub(" ", template).strip().casefold()
+
+
+def cache_key(agent_id: int, model: str, template: str, params: Optional[Mapping[str, Any]] = None) -> str:
+    raw = json.dumps(
+        [agent_id, model, normalize_template(template), sorted((params or {}).items())],
+        default=str, ensure_ascii=False,
+    )
+    return KEY_PREFIX + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def placeholder_prompt(template: str) -> str:
+    """Ask the model to keep the template's markers verbatim."""
+    markers = sorted(set(_PLACEHOLDER.findall(template)))
+    if not markers:
+        return template
+    listed = ", ".join("{" + m + "}" for m in markers)
+    return (
+        f"{template}\n\n"
+        f"Escribe los marcadores {listed} tal cual (con llaves) donde corresponda; "
+        f"se reemplazarán después por los datos reales."
+    )
+
+
+def fill_placeholders(text: str, values: Mapping[str, Any]) -> str:
+    """Replace ``{name}`` markers present in ``values``; leave others untouched."""
+    return _PLACEHOLDER.sub(lambda m: str(values[m.group(1)]) if m.group(1) in values else m.group(0), text)
+
+
+def get(key: str) -> Optional[str]:
+    r = redis_client.get_redis()
+    if r is None:
+        return None
+    try:
+        text = r.get(key)
+        if text is not None:
+            r.zadd(LRU_KEY, {key: time.time()})
+        return text
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
+        return None
+
+
+def put(key: str, text: str) -> None:
+    r = redis_client.get_redis()
+    if r is None:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        pipe.set(key, text, ex=settings.AGENT_DRAFT_CACHE_TTL_SECONDS)
+        pipe.zadd(LRU_KEY, {key: time.time()})
+        pipe.zcard(LRU_KEY)
+        size = pipe.execute()[-1]
+
+        overflow = size - settings.AGENT_DRAFT_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [k for k, _ in r.zpopmin(LRU_KEY, overflow)]
+            if evicted:
+                r.delete(*evicted)
+        # Expired entries leave stale LRU members; they age out via zpopmin
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
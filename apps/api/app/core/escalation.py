@@ -6,6 +6,11 @@ Escalation triggers:
 2. Error count >= threshold → automatic escalation
 3. External actions (send email, file court document) → always escalate
 4. Agent explicitly requests escalation via tool
+
+Consecutive errors are tracked per agent in ``agent_breaker`` (shared
+through Redis across workers), which also short-circuits calls to an
+agent that keeps failing until its cool-down ends or a health check
+half-opens it.
 """
 
 import logging
@@ -14,8 +19,10 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
-from app.db.models import AIAgent, Notification, AuditLog
+from app.core.metrics import AGENT_ESCALATIONS
+from app.db.models import AIAgent, AuditLog
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +37,12 @@ ALWAYS_ESCALATE_ACTIONS = {
     "publish_document",
 }
 
+agent_breaker = CircuitBreaker(
+    "agent",
+    failure_threshold=lambda: settings.AGENT_CIRCUIT_FAILURE_THRESHOLD,
+    cooldown_seconds=lambda: settings.AGENT_CIRCUIT_COOLDOWN_SECONDS,
+)
+
 
 class EscalationManager:
     """Manages escalation of agent actions to the Gerente Legal."""
@@ -37,7 +50,6 @@ class EscalationManager:
     def __init__(self, db: Session, organization_id: int):
         self.db = db
         self.organization_id = organization_id
-        self._error_counts: dict[int, int] = {}  # agent_id -> consecutive errors
 
     def should_escalate(
         self,
@@ -83,27 +95,29 @@ class EscalationManager:
 
         Returns the notification ID.
         """
-        # Find Gerente Legal user
+        # Notify every active Gerente Legal (one batched INSERT)
         from app.db.models import User
         from app.db.enums import RoleEnum
+        from app.modules.notifications.service import create_notifications_bulk
 
-        gerente = self.db.query(User).filter(
+        gerentes = self.db.query(User).filter(
             User.organization_id == self.organization_id,
             User.role == RoleEnum.GERENTE_LEGAL.value,
             User.active.is_(True),
-        ).first()
-
-        # Create notification
-        notification = Notification(
-            organization_id=self.organization_id,
-            user_id=gerente.id if gerente else 1,
+        ).all()
+        gerente = gerentes[0] if gerentes else None
+
+        notification_ids = create_notifications_bulk(
+            self.db,
+            self.organization_id,
+            [g.id for g in gerentes] or [1],
+            type_="agent_escalation",
             title=f"Escalación: {agent.display_name}",
             message=reason,
-            type="agent_escalation",
             entity_type="ai_agent_task",
             entity_id=task_id,
+            commit=False,
         )
-        self.db.add(notification)
 
         # Create audit log
         audit = AuditLog(
@@ -122,17 +136,23 @@ class EscalationManager:
         self.db.add(audit)
         self.db.flush()
 
+        role = agent.role if isinstance(agent.role, str) else getattr(agent.role, "value", "unknown")
+        AGENT_ESCALATIONS.labels(agent=str(role)).inc()
+
         logger.info(
             "Escalation created: agent=%s reason=%s task_id=%s notification_id=%s",
-            agent.display_name, reason, task_id, notification.id,
+            agent.display_name, reason, task_id, notification_ids[0],
         )
-        return notification.id
+        return notification_ids[0]
+
+    def is_available(self, agent_id: int) -> bool:
+        """False while the agent's circuit is open (too many consecutive errors)."""
+        return agent_breaker.allow(agent_id)
 
     def record_error(self, agent_id: int) -> int:
         """Record a consecutive error for an agent. Returns new error count."""
-        self._error_counts[agent_id] = self._error_counts.get(agent_id, 0) + 1
-        return self._error_counts[agent_id]
+        return agent_breaker.record_failure(agent_id)
 
     def clear_errors(self, agent_id: int):
         """Clear consecutive error count after successful execution."""
-        self._error_counts[agent_id] = 0
+        agent_breaker.record_success(agent_id)
@@ -3,17 +3,28 @@ File upload validation for Logan Virtual.
 
 Validates file type (by extension + magic bytes), size, and sanitizes filenames.
 Prevents path traversal, malicious uploads, and oversized files.
+
+Validation streams the upload once: it aborts as soon as the magic bytes
+or the size limit fail and hashes the content on the way, so storage
+can reuse the digest instead of reading the file again.
 """
 
 from __future__ import annotations
 
+import hashlib
 import logging
 import os
 import re
+import tempfile
 import uuid
+from dataclasses import dataclass
 from pathlib import Path
+from typing import BinaryIO
 
 from fastapi import HTTPException, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+
+from app.core.storage import CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +62,12 @@ MAGIC_BYTES: dict[str, list[bytes]] = {
     ".webp": [b"RIFF"],
 }
 
+# Bytes sniffed from the start of the stream for the magic check
+MAGIC_SNIFF_BYTES = max(len(sig) for sigs in MAGIC_BYTES.values() for sig in sigs)
+
+# Non-seekable uploads are spooled to disk beyond this size
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
 # Dangerous extensions that should ALWAYS be blocked
 BLOCKED_EXTENSIONS = {
     ".exe", ".bat", ".cmd", ".com", ".msi", ".scr", ".pif",
@@ -100,35 +117,31 @@ def get_file_category(extension: str) -> str:
     return "default"
 
 
-async def validate_upload(
-    file: UploadFile,
-    allowed: set[str] | None = None,
-    max_size: int | None = None,
-    check_magic: bool = True,
-) -> tuple[str, bytes]:
-    """
-    Validate an uploaded file and return (safe_filename, content).
+@dataclass
+class ValidatedUpload:
+    """An upload that passed validation, ready to hand to storage."""
+    filename: str            # sanitized, uuid-prefixed
+    original_filename: str
+    extension: str
+    size: int
+    sha256: str
+    file: BinaryIO           # positioned at the start of the content
 
-    Args:
-        file: FastAPI UploadFile
-        allowed: Set of allowed extensions (default: ALL_ALLOWED)
-        max_size: Max file size in bytes (default: based on file category)
-        check_magic: Whether to verify magic bytes
+    def read(self) -> bytes:
+        self.file.seek(0)
+        content = self.file.read()
+        self.file.seek(0)
+        return content
 
-    Returns:
-        Tuple of (sanitized_filename, file_content)
 
-    Raises:
-        HTTPException 400 for invalid files
-    """
-    if not file.filename:
+def _check_extension(filename: str | None, allowed: set[str] | None) -> str:
+    if not filename:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Nombre de archivo requerido",
         )
 
-    # 1. Check extension
-    _, ext = os.path.splitext(file.filename)
+    _, ext = os.path.splitext(filename)
     ext = ext.lower()
 
     if ext in BLOCKED_EXTENSIONS:
@@ -143,45 +156,134 @@ async def validate_upload(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Tipo de archivo no permitido: {ext}. Permitidos: {', '.join(sorted(allowed_set))}",
         )
+    return ext
 
-    # 2. Read content
-    content = await file.read()
-    await file.seek(0)  # Reset for potential re-reads
-
-    # 3. Check file size
-    category = get_file_category(ext)
-    size_limit = max_size or MAX_FILE_SIZES.get(category, MAX_FILE_SIZES["default"])
 
-    if len(content) > size_limit:
-        max_mb = size_limit / (1024 * 1024)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Archivo demasiado grande. Máximo: {max_mb:.0f}MB",
+def _check_magic(filename: str, ext: str, head: bytes) -> None:
+    expected_signatures = MAGIC_BYTES[ext]
+    if not any(head.startswith(sig) for sig in expected_signatures):
+        logger.warning(
+            "Magic bytes mismatch for %s (claimed ext: %s, first bytes: %s)",
+            filename,
+            ext,
+            head[:8].hex(),
         )
-
-    if len(content) == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Archivo vacío",
+            detail="El contenido del archivo no coincide con su extensión",
         )
 
-    # 4. Verify magic bytes (if applicable)
-    if check_magic and ext in MAGIC_BYTES:
-        expected_signatures = MAGIC_BYTES[ext]
-        if not any(content.startswith(sig) for sig in expected_signatures):
-            logger.warning(
-                "Magic bytes mismatch for %s (claimed ext: %s, first bytes: %s)",
-                file.filename,
-                ext,
-                content[:8].hex(),
-            )
+
+def validate_upload_stream(
+    stream: BinaryIO,
+    filename: str | None,
+    allowed: set[str] | None = None,
+    max_size: int | None = None,
+    check_magic: bool = True,
+) -> ValidatedUpload:
+    """
+    Validate an upload in a single streamed pass.
+
+    Magic bytes are sniffed from the first chunk and the size limit is
+    enforced as chunks arrive, so disguised or oversized files are rejected
+    without reading the rest. The same pass computes the SHA-256 used by
+    the content-addressed blob store. Seekable sources (Starlette's spooled
+    ``UploadFile.file``) are rewound and returned as-is; anything else is
+    copied into a ``SpooledTemporaryFile`` on the way through.
+
+    Raises:
+        HTTPException 400 for invalid files
+    """
+    ext = _check_extension(filename, allowed)
+    category = get_file_category(ext)
+    size_limit = max_size or MAX_FILE_SIZES.get(category, MAX_FILE_SIZES["default"])
+    sniff = check_magic and ext in MAGIC_BYTES
+
+    seekable = stream.seekable()
+    start = stream.tell() if seekable else 0
+    spool = None if seekable else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    sha = hashlib.sha256()
+    head = b""
+    size = 0
+
+    try:
+        while chunk := stream.read(CHUNK_SIZE):
+            if sniff and len(head) < MAGIC_SNIFF_BYTES:
+                head += chunk[: MAGIC_SNIFF_BYTES - len(head)]
+                if len(head) >= MAGIC_SNIFF_BYTES:
+                    _check_magic(filename, ext, head)
+                    sniff = False
+
+            size += len(chunk)
+            if size > size_limit:
+                max_mb = size_limit / (1024 * 1024)
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Archivo demasiado grande. Máximo: {max_mb:.0f}MB",
+                )
+
+            sha.update(chunk)
+            if spool is not None:
+                spool.write(chunk)
+
+        if size == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="El contenido del archivo no coincide con su extensión",
+                detail="Archivo vacío",
             )
+        if sniff:  # shorter than the sniff window
+            _check_magic(filename, ext, head)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+
+    if spool is None:
+        stream.seek(start)
+        content_stream = stream
+    else:
+        spool.seek(0)
+        content_stream = spool
+
+    safe_name = sanitize_filename(filename)
+    logger.info("File validated: %s → %s (%d bytes)", filename, safe_name, size)
+    return ValidatedUpload(
+        filename=safe_name,
+        original_filename=filename,
+        extension=ext,
+        size=size,
+        sha256=sha.hexdigest(),
+        file=content_stream,
+    )
 
-    # 5. Sanitize filename
-    safe_name = sanitize_filename(file.filename)
 
-    logger.info("File validated: %s → %s (%d bytes)", file.filename, safe_name, len(content))
-    return safe_name, content
+async def validate_upload(
+    file: UploadFile,
+    allowed: set[str] | None = None,
+    max_size: int | None = None,
+    check_magic: bool = True,
+) -> tuple[str, bytes]:
+    """
+    Validate an uploaded file and return (safe_filename, content).
+
+    Prefer ``validate_upload_stream`` for new code: it avoids materialising
+    the content as bytes.
+
+    Args:
+        file: FastAPI UploadFile
+        allowed: Set of allowed extensions (default: ALL_ALLOWED)
+        max_size: Max file size in bytes (default: based on file category)
+        check_magic: Whether to verify magic bytes
+
+    Returns:
+        Tuple of (sanitized_filename, file_content)
+
+    Raises:
+        HTTPException 400 for invalid files
+    """
+    upload = await run_in_threadpool(
+        validate_upload_stream, file.file, file.filename, allowed, max_size, check_magic
+    )
+    content = await run_in_threadpool(upload.read)
+    await file.seek(0)  # Reset for potential re-reads
+    return upload.filename, content
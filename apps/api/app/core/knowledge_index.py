@@ -0,0 +1,285 @@
+"""
+Firm knowledge index for Logan Virtual — local BM25 retrieval.
+
+An on-disk inverted index over extracted document text, matter
+descriptions and communications, so agents can pull the top-k relevant
+passages instead of whole records. Pure Python + stdlib ``sqlite3``:
+CPU-only, no external search service.
+
+- Sharded per organization: one SQLite file per org under
+  KNOWLEDGE_INDEX_PATH, so tenants never share postings or statistics.
+- Incremental: each indexed source stores a version (the document's
+  ``text_indexed_hash``, ``updated_at`` for matters and communications);
+  a sync re-tokenizes only sources whose version changed and drops those
+  that no longer exist.
+- Synced by a Celery beat task; a search syncs first only when the shard
+  is older than KNOWLEDGE_INDEX_SYNC_INTERVAL (longer than the beat
+  period), i.e. when the beat task has not kept it fresh.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import math
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import Counter
+from contextlib import closing
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.text_extraction import chunk_text
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters (Robertson/Spärck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_TOP_K = 20
+SOURCE_TYPES = ("document", "matter", "communication")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a al ante con contra de del desde e el en entre es esta este esto ha hay la las "
+    "le les lo los mas me mi no o para pero por que se si sin sobre su sus te tu un "
+    "una unas uno unos y ya".split()
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_type TEXT NOT NULL,
+    source_id INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    PRIMARY KEY (source_type, source_id)
+);
+CREATE TABLE IF NOT EXISTS passages (
+    id INTEGER PRIMARY KEY,
+    source_type TEXT NOT NULL,
+    source_id INTEGER NOT NULL,
+    matter_id INTEGER,
+    title TEXT NOT NULL,
+    text TEXT NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_passages_source ON passages (source_type, source_id);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    passage_id INTEGER NOT NULL,
+    tf INTEGER NOT NULL,
+    PRIMARY KEY (term, passage_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_postings_passage ON postings (passage_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, accent-folded word tokens without Spanish stopwords."""
+    folded = unicodedata.normalize("NFKD", text.lower())
+    folded = "".join(c for c in folded if not unicodedata.combining(c))
+    return [t for t in _TOKEN_RE.findall(folded) if len(t) > 1 and t not in _STOPWORDS]
+
+
+def shard_path(org_id: int) -> str:
+    return os.path.join(settings.KNOWLEDGE_INDEX_PATH, f"org_{int(org_id)}.sqlite3")
+
+
+def _connect(org_id: int) -> sqlite3.Connection:
+    os.makedirs(settings.KNOWLEDGE_INDEX_PATH, exist_ok=True)
+    conn = sqlite3.connect(shard_path(org_id), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+
+def _versions(db: Session, org_id: int, source_type: str) -> dict[int, str]:
+    """Current version of every indexable source of one type."""
+    from app.db.models import Communication, Document, Matter
+
+    if source_type == "document":
+        rows = db.query(Document.id, Document.text_indexed_hash).filter(
+            Document.organization_id == org_id,
+            Document.text_indexed_hash.isnot(None),
+            Document.text_index_error.is_(None),
+        )
+    elif source_type == "matter":
+        rows = db.query(Matter.id, Matter.updated_at).filter(Matter.organization_id == org_id)
+    else:
+        rows = db.query(Communication.id, Communication.updated_at).filter(
+            Communication.organization_id == org_id
+        )
+    return {row[0]: str(row[1]) for row in rows.all()}
+
+
+def _passages(db: Session, source_type: str, ids: list[int]) -> Iterable[tuple]:
+    """Yield ``(source_id, matter_id, title, text)`` passages for ``ids``."""
+    from app.db.models import Communication, Document, DocumentTextChunk, Matter
+
+    if source_type == "document":
+        docs = {d.id: d for d in db.query(Document).filter(Document.id.in_(ids)).all()}
+        chunks = (
+            db.query(DocumentTextChunk)
+            .filter(DocumentTextChunk.document_id.in_(ids))
+            .order_by(DocumentTextChunk.document_id, DocumentTextChunk.chunk_index)
+            .all()
+        )
+        for chunk in chunks:
+            doc = docs[chunk.document_id]
+            matter_id = doc.entity_id if doc.entity_type == "matter" else None
+            yield doc.id, matter_id, doc.file_name, chunk.text
+    elif source_type == "matter":
+        for matter in db.query(Matter).filter(Matter.id.in_(ids)).all():
+            body = "\n\n".join(p for p in (matter.title, matter.rol_number, matter.court_name, matter.description) if p)
+            for text in chunk_text(body):
+                yield matter.id, matter.id, matter.title, text
+    else:
+        for comm in db.query(Communication).filter(Communication.id.in_(ids)).all():
+            matter_id = comm.entity_id if comm.entity_type == "matter" else None
+            title = comm.subject or f"{comm.channel} {comm.direction}"
+            body = "\n\n".join(p for p in (comm.subject, comm.body_text) if p)
+            for text in chunk_text(body):
+                yield comm.id, matter_id, title, text
+
+
+# ── Indexing ─────────────────────────────────────────────────────────────────
+
+def _remove(conn: sqlite3.Connection, source_type: str, ids: list[int]) -> None:
+    for source_id in ids:
+        conn.execute(
+            "DELETE FROM postings WHERE passage_id IN "
+            "(SELECT id FROM passages WHERE source_type = ? AND source_id = ?)",
+            (source_type, source_id),
+        )
+        conn.execute("DELETE FROM passages WHERE source_type = ? AND source_id = ?", (source_type, source_id))
+        conn.execute("DELETE FROM sources WHERE source_type = ? AND source_id = ?", (source_type, source_id))
+
+
+def _add(conn: sqlite3.Connection, source_type: str, passages: Iterable[tuple]) -> None:
+    for source_id, matter_id, title, text in passages:
+        terms = Counter(tokenize(f"{title} {text}"))
+        cur = conn.execute(
+            "INSERT INTO passages (source_type, source_id, matter_id, title, text, length) VALUES (?, ?, ?, ?, ?, ?)",
+            (source_type, source_id, matter_id, title, text, sum(terms.values())),
+        )
+        conn.executemany(
+            "INSERT INTO postings (term, passage_id, tf) VALUES (?, ?, ?)",
+            ((term, cur.lastrowid, tf) for term, tf in terms.items()),
+        )
+
+
+def sync_organization(db: Session, org_id: int, batch_size: int = 200) -> dict:
+    """Bring the organization's shard up to date; returns per-type changes."""
+    stats = {}
+    with closing(_connect(org_id)) as conn:
+        for source_type in SOURCE_TYPES:
+            current = _versions(db, org_id, source_type)
+            indexed = dict(
+                conn.execute("SELECT source_id, version FROM sources WHERE source_type = ?", (source_type,))
+            )
+            removed = [sid for sid in indexed if sid not in current]
+            changed = [sid for sid, version in current.items() if indexed.get(sid) != version]
+
+            with conn:
+                _remove(conn, source_type, removed)
+            for start in range(0, len(changed), batch_size):
+                batch = changed[start:start + batch_size]
+                with conn:  # one transaction per batch
+                    _remove(conn, source_type, batch)
+                    _add(conn, source_type, _passages(db, source_type, batch))
+                    conn.executemany(
+                        "INSERT INTO sources (source_type, source_id, version) VALUES (?, ?, ?)",
+                        ((source_type, sid, current[sid]) for sid in batch),
+                    )
+            stats[source_type] = {"updated": len(changed), "removed": len(removed)}
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('synced_at', ?)", (str(time.time()),))
+    return stats
+
+
+def ensure_fresh(db: Session, org_id: int) -> None:
+    """Sync the shard if it was last synced more than the configured interval ago."""
+    with closing(_connect(org_id)) as conn:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'synced_at'").fetchone()
+    if row is None or time.time() - float(row[0]) > settings.KNOWLEDGE_INDEX_SYNC_INTERVAL:
+        sync_organization(db, org_id)
+
+
+# ── Retrieval ────────────────────────────────────────────────────────────────
+
+def search(
+    org_id: int,
+    query: str,
+    top_k: int = 5,
+    source_types: Optional[list[str]] = None,
+    matter_id: Optional[int] = None,
+) -> list[dict]:
+    """Top-k passages of the organization's shard ranked by BM25."""
+    terms = sorted(set(tokenize(query)))
+    if not terms:
+        return []
+    top_k = max(1, min(top_k, MAX_TOP_K))
+
+    with closing(_connect(org_id)) as conn:
+        n_passages, avg_length = conn.execute("SELECT COUNT(*), AVG(length) FROM passages").fetchone()
+        if not n_passages:
+            return []
+        avg_length = avg_length or 1.0
+
+        marks = ",".join("?" * len(terms))
+        idf = {
+            term: math.log(1 + (n_passages - df + 0.5) / (df + 0.5))
+            for term, df in conn.execute(
+                f"SELECT term, COUNT(*) FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+            )
+        }
+
+        sql = (
+            "SELECT po.term, po.passage_id, po.tf, pa.length FROM postings po "
+            f"JOIN passages pa ON pa.id = po.passage_id WHERE po.term IN ({marks})"
+        )
+        args: list = list(terms)
+        if source_types:
+            sql += f" AND pa.source_type IN ({','.join('?' * len(source_types))})"
+            args.extend(source_types)
+        if matter_id is not None:
+            sql += " AND pa.matter_id = ?"
+            args.append(matter_id)
+
+        scores: dict[int, float] = {}
+        for term, passage_id, tf, length in conn.execute(sql, args):
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+            scores[passage_id] = scores.get(passage_id, 0.0) + idf[term] * tf * (BM25_K1 + 1) / norm
+
+        best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        if not best:
+            return []
+        rows = {
+            row[0]: row
+            for row in conn.execute(
+                "SELECT id, source_type, source_id, matter_id, title, text FROM passages "
+                f"WHERE id IN ({','.join('?' * len(best))})",
+                [pid for pid, _ in best],
+            )
+        }
+
+    return [
+        {
+            "source_type": rows[pid][1],
+            "source_id": rows[pid][2],
+            "matter_id": rows[pid][3],
+            "title": rows[pid][4],
+            "score": round(score, 3),
+            "text": rows[pid][5],
+        }
+        for pid, score in best
+    ]
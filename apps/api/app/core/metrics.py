@@ -0,0 +1,164 @@
+"""
+Prometheus metrics for Logan Virtual.
+
+Covers the API (route latency, DB pool and query counts), Celery tasks,
+the Anthropic client, agent escalations and WebSocket connections.
+
+Multiprocess mode: when ``PROMETHEUS_MULTIPROC_DIR`` is set (required for
+Celery prefork workers and multi-worker uvicorn), prometheus_client writes
+samples to that directory and ``render_metrics`` aggregates every process.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+logger = logging.getLogger(__name__)
+
+# ── API ──────────────────────────────────────────────────────────────────────
+
+HTTP_REQUEST_DURATION = Histogram(
+    "logan_http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "logan_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the SQLAlchemy pool",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+DB_QUERIES = Counter(
+    "logan_db_queries_total",
+    "SQL statements executed",
+)
+
+# ── Celery ───────────────────────────────────────────────────────────────────
+
+CELERY_TASK_DURATION = Histogram(
+    "logan_celery_task_duration_seconds",
+    "Celery task run time by task name",
+    ["task", "state"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 900),
+)
+
+CELERY_TASK_FAILURES = Counter(
+    "logan_celery_task_failures_total",
+    "Celery task failures by task name",
+    ["task"],
+)
+
+# ── AI / agents ──────────────────────────────────────────────────────────────
+
+ANTHROPIC_REQUEST_DURATION = Histogram(
+    "logan_anthropic_request_duration_seconds",
+    "Anthropic API request latency by model",
+    ["model"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+
+ANTHROPIC_TOKENS = Counter(
+    "logan_anthropic_tokens_total",
+    "Anthropic tokens consumed by model and direction",
+    ["model", "direction"],
+)
+
+AGENT_ESCALATIONS = Counter(
+    "logan_agent_escalations_total",
+    "Agent escalations to the Gerente Legal by agent role",
+    ["agent"],
+)
+
+WEBSOCKET_CONNECTIONS = Gauge(
+    "logan_websocket_connections",
+    "Open WebSocket connections by channel",
+    ["channel"],
+    multiprocess_mode="livesum",
+)
+
+
+# ── Helpers ──────────────────────────────────────────────────────────────────
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def _registry() -> CollectorRegistry:
+    if not multiprocess_enabled():
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return (payload, content_type) for the /metrics endpoint."""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def observe_anthropic_call(model: str, latency_s: float, input_tokens: int, output_tokens: int) -> None:
+    ANTHROPIC_REQUEST_DURATION.labels(model=model).observe(latency_s)
+    if input_tokens:
+        ANTHROPIC_TOKENS.labels(model=model, direction="input").inc(input_tokens)
+    if output_tokens:
+        ANTHROPIC_TOKENS.labels(model=model, direction="output").inc(output_tokens)
+
+
+def install_celery_metrics(celery_app) -> None:
+    """Hook Celery signals for task duration/failure metrics and worker export."""
+    from celery.signals import (
+        task_failure,
+        task_postrun,
+        task_prerun,
+        worker_process_shutdown,
+        worker_ready,
+    )
+
+    started: dict[str, float] = {}
+
+    @task_prerun.connect(weak=False)
+    def _on_prerun(task_id=None, task=None, **kwargs):
+        started[task_id] = time.perf_counter()
+
+    @task_postrun.connect(weak=False)
+    def _on_postrun(task_id=None, task=None, state=None, **kwargs):
+        start = started.pop(task_id, None)
+        if start is not None and task is not None:
+            CELERY_TASK_DURATION.labels(task=task.name, state=state or "UNKNOWN").observe(
+                time.perf_counter() - start
+            )
+
+    @task_failure.connect(weak=False)
+    def _on_failure(sender=None, **kwargs):
+        CELERY_TASK_FAILURES.labels(task=getattr(sender, "name", "unknown")).inc()
+
+    @worker_ready.connect(weak=False)
+    def _on_worker_ready(**kwargs):
+        # The worker has no HTTP server; expose the aggregated multiprocess
+        # registry on a side port so Prometheus can scrape task metrics.
+        from app.core.config import settings
+        if not (settings.METRICS_ENABLED and multiprocess_enabled()):
+            return
+        from prometheus_client import start_http_server
+        start_http_server(settings.CELERY_METRICS_PORT, registry=_registry())
+        logger.info("Celery metrics exported on :%d", settings.CELERY_METRICS_PORT)
+
+    @worker_process_shutdown.connect(weak=False)
+    def _on_process_shutdown(pid=None, **kwargs):
+        if multiprocess_enabled():
+            multiprocess.mark_process_dead(pid or os.getpid())
@@ -2,6 +2,11 @@
 Security and utility middleware for Logan Virtual.
 
 Implements HTTP security headers, request logging, and audit trail support.
+
+Both middlewares are written as raw ASGI callables instead of
+``BaseHTTPMiddleware`` subclasses: they only touch the
+``http.response.start`` message, so they avoid the extra task and
+body-stream wrapping that ``BaseHTTPMiddleware`` adds to every request.
 """
 
 from __future__ import annotations
@@ -9,43 +14,27 @@ from __future__ import annotations
 import logging
 import time
 
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-logger = logging.getLogger(__name__)
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core.metrics import HTTP_REQUEST_DURATION
+from app.core.query_profiler import profile_queries
+from app.core.timing import reset_request_timings, start_request_timings
 
-class SecurityHeadersMiddleware(BaseHTTPMiddleware):
-    """
-    Adds standard security headers to all HTTP responses.
-    Prevents common attacks: clickjacking, MIME sniffing, XSS, etc.
-    """
+logger = logging.getLogger(__name__)
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        response = await call_next(request)
 
+def _security_headers() -> list[tuple[bytes, bytes]]:
+    """Build the static security header set once at startup."""
+    headers = {
         # Prevent MIME type sniffing
-        response.headers["X-Content-Type-Options"] = "nosniff"
-
+        "X-Content-Type-Options": "nosniff",
         # Prevent clickjacking
-        response.headers["X-Frame-Options"] = "DENY"
-
+        "X-Frame-Options": "DENY",
         # XSS protection (legacy browsers)
-        response.headers["X-XSS-Protection"] = "1; mode=block"
-
-        # HSTS — enforce HTTPS (only in production)
-        try:
-            from app.core.config import settings
-            if settings.APP_ENV == "production":
-                response.headers["Strict-Transport-Security"] = (
-                    "max-age=31536000; includeSubDomains; preload"
-                )
-        except Exception:
-            pass
-
+        "X-XSS-Protection": "1; mode=block",
         # Content Security Policy
-        response.headers["Content-Security-Policy"] = (
+        "Content-Security-Policy": (
             "default-src 'self'; "
             "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
             "style-src 'self' 'unsafe-inline'; "
@@ -53,49 +42,123 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             "font-src 'self' data:; "
             "connect-src 'self' https://api.anthropic.com https://api.openai.com; "
             "frame-ancestors 'none'"
-        )
-
+        ),
         # Referrer Policy
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-
+        "Referrer-Policy": "strict-origin-when-cross-origin",
         # Permissions Policy (restrict browser features)
-        response.headers["Permissions-Policy"] = (
-            "camera=(), microphone=(), geolocation=(), payment=()"
-        )
+        "Permissions-Policy": "camera=(), microphone=(), geolocation=(), payment=()",
+    }
+
+    # HSTS — enforce HTTPS (only in production)
+    try:
+        from app.core.config import settings
+        if settings.APP_ENV == "production":
+            headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains; preload"
+    except Exception:
+        pass
 
-        return response
+    return [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()]
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class SecurityHeadersMiddleware:
     """
-    Logs all incoming requests with timing information.
-    Useful for monitoring and debugging.
+    Adds standard security headers to all HTTP responses.
+    Prevents common attacks: clickjacking, MIME sniffing, XSS, etc.
     """
 
-    async def dispatch(self, request: Request, call_next) -> Response:
-        start = time.perf_counter()
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.headers = _security_headers()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                for key, value in self.headers:
+                    headers[key.decode("latin-1")] = value.decode("latin-1")
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
+
+
+def _route_template(scope: Scope) -> str:
+    """
+    Route template for metric labels, e.g. ``/api/v1/leads/{lead_id}``.
+
+    Depending on the FastAPI version, ``scope["route"]`` may hold the route
+    as declared on its module router (without the include prefix), so the
+    prefix is recovered from the concrete path's leading segments.
+    """
+    template = getattr(scope.get("route"), "path_format", None)
+    if not template:
+        return "unmatched"
+    parts = scope["path"].split("/")
+    depth = template.count("/")
+    prefix = "/".join(parts[: len(parts) - depth]) if depth < len(parts) else ""
+    return prefix + template
 
-        response = await call_next(request)
 
-        duration_ms = (time.perf_counter() - start) * 1000
+class RequestLoggingMiddleware:
+    """
+    Logs all incoming requests with timing information.
 
-        # Log at WARNING level for slow requests (>2s)
-        level = logging.WARNING if duration_ms > 2000 else logging.INFO
+    Installs a per-request timing collector and emits its DB, AI and
+    serialization totals as a ``Server-Timing`` header, so every slow
+    request can explain where its time went. Latency is also observed in
+    the Prometheus histogram, labelled by route template (not raw path)
+    to keep label cardinality bounded. Queries are profiled per request
+    and oversized budgets or repeated statements are logged as warnings.
+    """
 
-        # Skip health checks from verbose logging
-        if request.url.path == "/health":
-            return response
+    SLOW_REQUEST_MS = 2000
 
-        logger.log(
-            level,
-            "%s %s → %d (%.1fms)",
-            request.method,
-            request.url.path,
-            response.status_code,
-            duration_ms,
-        )
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        # Add Server-Timing header for debugging
-        response.headers["Server-Timing"] = f"total;dur={duration_ms:.1f}"
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        start = time.perf_counter()
+        timings, token = start_request_timings()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["Server-Timing"] = timings.server_timing_header()
+            await send(message)
+
+        try:
+            with profile_queries(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            reset_request_timings(token)
+            duration_ms = (time.perf_counter() - start) * 1000
+
+            HTTP_REQUEST_DURATION.labels(
+                method=scope["method"],
+                route=_route_template(scope),
+                status=str(status_code),
+            ).observe(duration_ms / 1000)
+
+            # Skip health checks from verbose logging
+            if scope["path"] != "/health":
+                # Log at WARNING level for slow requests (>2s)
+                level = logging.WARNING if duration_ms > self.SLOW_REQUEST_MS else logging.INFO
+                logger.log(
+                    level,
+                    "%s %s → %d (%.1fms) [%s]",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    duration_ms,
+                    timings.server_timing_header(),
+                )
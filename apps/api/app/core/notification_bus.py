@@ -0,0 +1,205 @@
+"""
+Notification bus for Logan Virtual — live delivery across workers.
+
+Publishing: every committed ``Notification`` row is published to Redis
+channel ``notifications:user:<id>`` by a session hook, whichever process
+created it (API worker, Celery task, agent tool). Rows are published
+only after commit, so a client never sees a notification it can't load.
+
+Delivery: each API worker runs a single pattern subscription
+(``NotificationHub``) while it has sockets connected and fans messages out
+to its local WebSockets. Every socket has a bounded queue; a client
+that falls behind is disconnected (1013) rather than buffering without
+limit, and on reconnect it catches up from the database (``last_id``).
+Without Redis, notifications still reach sockets on the publishing
+process. The same hook bumps the per-user unread counters
+(``app.core.unread_counters``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core import redis_client, unread_counters
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "notifications:user:"
+_PENDING_KEY = "pending_notifications"
+
+
+def channel_for(user_id: int) -> str:
+    return f"{CHANNEL_PREFIX}{user_id}"
+
+
+def notification_payload(n) -> dict:
+    return {
+        "id": n.id,
+        "type": n.type,
+        "title": n.title,
+        "message": n.message,
+        "entity_type": n.entity_type,
+        "entity_id": n.entity_id,
+        "created_at": n.created_at.isoformat() if n.created_at else None,
+    }
+
+
+def publish_notifications(items: list[tuple[int, dict]]) -> None:
+    """
+    Publish ``(user_id, payload)`` pairs to every worker via Redis in one
+    pipelined round trip; local-only delivery when Redis is down.
+    """
+    messages = [(user_id, json.dumps(payload)) for user_id, payload in items]
+    r = redis_client.get_redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for user_id, message in messages:
+                pipe.publish(channel_for(user_id), message)
+            pipe.execute()
+            redis_client.mark_redis_up()
+            return
+        except Exception as exc:
+            redis_client.mark_redis_down(exc)
+    for user_id, message in messages:
+        hub.deliver_threadsafe(user_id, message)
+
+
+def publish_notification(user_id: int, payload: dict) -> None:
+    publish_notifications([(user_id, payload)])
+
+
+# ── Publish on commit ────────────────────────────────────────────────────────
+
+def _after_flush(session: Session, flush_context) -> None:
+    from app.db.models.notification import Notification
+
+    # Snapshot now: after commit the rows are expired and reading them
+    # back would cost a SELECT per notification.
+    new = [(obj.user_id, notification_payload(obj)) for obj in session.new if isinstance(obj, Notification)]
+    if new:
+        session.info.setdefault(_PENDING_KEY, []).extend(new)
+
+
+def _after_commit(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    try:
+        unread_counters.adjust(Counter(user_id for user_id, _ in pending))
+        publish_notifications(pending)
+    except Exception as exc:
+        logger.warning("Notification publish failed: %s", exc)
+
+
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+def install_notification_publisher() -> None:
+    """Publish committed notifications from every session in this process."""
+    if not event.contains(Session, "after_commit", _after_commit):
+        event.listen(Session, "after_flush", _after_flush)
+        event.listen(Session, "after_commit", _after_commit)
+        event.listen(Session, "after_rollback", _after_rollback)
+
+
+# ── Per-worker fan-out ───────────────────────────────────────────────────────
+
+class Subscriber:
+    """One WebSocket's bounded delivery queue."""
+
+    OVERFLOW = None  # sentinel: client too slow, drop the connection
+
+    def __init__(self, user_id: int, maxsize: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, message: str) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Backpressure: discard the backlog and tell the sender to close;
+            # the client reconnects and catches up from the database.
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(self.OVERFLOW)
+
+
+class NotificationHub:
+    def __init__(self):
+        self._subscribers: dict[int, set[Subscriber]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, user_id: int) -> Subscriber:
+        """Register a local socket (call from the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(user_id, settings.NOTIFICATION_WS_QUEUE_SIZE)
+        self._subscribers.setdefault(user_id, set()).add(sub)
+        if self._listener is None or self._listener.done():
+            self._listener = self._loop.create_task(self._listen())
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        subs = self._subscribers.get(sub.user_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subscribers[sub.user_id]
+        if not self._subscribers and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    def deliver(self, user_id: int, message: str) -> None:
+        for sub in list(self._subscribers.get(user_id, ())):
+            sub.offer(message)
+
+    def deliver_threadsafe(self, user_id: int, message: str) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed() or user_id not in self._subscribers:
+            return
+        loop.call_soon_threadsafe(self.deliver, user_id, message)
+
+    async def _listen(self) -> None:
+        """One pattern subscription per worker, reconnecting with backoff."""
+        backoff = redis_client.BACKOFF_INITIAL
+        while self._subscribers:
+            client = None
+            try:
+                client = redis_client.get_async_redis()
+                pubsub = client.pubsub()
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                backoff = redis_client.BACKOFF_INITIAL
+                while self._subscribers:
+                    msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if msg and msg["type"] == "pmessage":
+                        user_id = int(msg["channel"].rsplit(":", 1)[1])
+                        self.deliver(user_id, msg["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Notification subscription lost (%s); retrying in %.0fs", exc, backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, redis_client.BACKOFF_MAX)
+            finally:
+                if client is not None:
+                    try:
+                        await client.aclose()
+                    except Exception:
+                        pass
+
+
+hub = NotificationHub()
@@ -7,71 +7,39 @@ notary documents, invoices, and court filings.
 
 from __future__ import annotations
 
+import functools
 import io
 import logging
+import textwrap
 from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import BinaryIO, Iterable, Iterator, Optional
 
 logger = logging.getLogger(__name__)
 
 
-def _get_reportlab():
-    """Import reportlab lazily."""
+@functools.lru_cache(maxsize=1)
+def _get_reportlab() -> Optional[SimpleNamespace]:
+    """Import reportlab once per process; None when it is not installed."""
     try:
         from reportlab.lib.pagesizes import LETTER
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch, cm
+        from reportlab.lib.units import cm
         from reportlab.lib.colors import HexColor
         from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-        from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_JUSTIFY
-        return True
     except ImportError:
-        return False
-
-
-def generate_pdf(
-    title: str,
-    content_blocks: list[dict],
-    metadata: dict | None = None,
-) -> bytes:
-    """
-    Generate a professional PDF document.
-
-    Args:
-        title: Document title
-        content_blocks: List of content sections, each with:
-            - type: "heading" | "paragraph" | "table" | "spacer"
-            - text: For heading/paragraph
-            - data: For table (list of rows, first row = headers)
-            - height: For spacer (points)
-        metadata: Optional dict with author, date, reference_number, etc.
-
-    Returns:
-        PDF bytes
-    """
-    try:
-        from reportlab.lib.pagesizes import LETTER
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch, cm
-        from reportlab.lib.colors import HexColor
-        from reportlab.platypus import (
-            SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-            PageBreak, Image
-        )
-        from reportlab.lib.enums import TA_CENTER, TA_RIGHT, TA_JUSTIFY
-    except ImportError:
-        # Fallback: generate a simple text-based PDF without reportlab
-        return _generate_simple_pdf(title, content_blocks, metadata)
+        return None
+    return SimpleNamespace(
+        LETTER=LETTER, cm=cm, HexColor=HexColor, SimpleDocTemplate=SimpleDocTemplate,
+        Paragraph=Paragraph, Spacer=Spacer, Table=Table, TableStyle=TableStyle, PageBreak=PageBreak,
+    )
 
-    buffer = io.BytesIO()
 
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=LETTER,
-        topMargin=1.5 * cm,
-        bottomMargin=2 * cm,
-        leftMargin=2 * cm,
-        rightMargin=2 * cm,
-    )
+@functools.lru_cache(maxsize=1)
+def _get_styles():
+    """Sample stylesheet plus the house styles, built once per process (read-only)."""
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.colors import HexColor
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
 
     styles = getSampleStyleSheet()
 
@@ -105,6 +73,65 @@ def generate_pdf(
         fontSize=8,
         textColor=HexColor("#666666"),
     ))
+    return styles
+
+
+@functools.lru_cache(maxsize=1)
+def _get_table_style():
+    rl = _get_reportlab()
+    HexColor = rl.HexColor
+    return rl.TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), HexColor("#2c5282")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), HexColor("#ffffff")),
+        ("FONTSIZE", (0, 0), (-1, 0), 10),
+        ("FONTSIZE", (0, 1), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#cccccc")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [HexColor("#f7fafc"), HexColor("#ffffff")]),
+        ("TOPPADDING", (0, 0), (-1, -1), 6),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
+        ("LEFTPADDING", (0, 0), (-1, -1), 8),
+    ])
+
+
+def generate_pdf(
+    title: str,
+    content_blocks: list[dict],
+    metadata: dict | None = None,
+) -> bytes:
+    """
+    Generate a professional PDF document.
+
+    Args:
+        title: Document title
+        content_blocks: List of content sections, each with:
+            - type: "heading" | "paragraph" | "table" | "spacer"
+            - text: For heading/paragraph
+            - data: For table (list of rows, first row = headers)
+            - height: For spacer (points)
+        metadata: Optional dict with author, date, reference_number, etc.
+
+    Returns:
+        PDF bytes
+    """
+    rl = _get_reportlab()
+    if rl is None:
+        # Fallback: generate a simple text-based PDF without reportlab
+        return _generate_simple_pdf(title, content_blocks, metadata)
+    Paragraph, Spacer = rl.Paragraph, rl.Spacer
+    cm = rl.cm
+
+    buffer = io.BytesIO()
+
+    doc = rl.SimpleDocTemplate(
+        buffer,
+        pagesize=rl.LETTER,
+        topMargin=1.5 * cm,
+        bottomMargin=2 * cm,
+        leftMargin=2 * cm,
+        rightMargin=2 * cm,
+    )
+
+    styles = _get_styles()
 
     elements = []
 
@@ -141,25 +168,15 @@ def generate_pdf(
         elif btype == "table":
             data = block.get("data", [])
             if data:
-                table = Table(data)
-                table.setStyle(TableStyle([
-                    ("BACKGROUND", (0, 0), (-1, 0), HexColor("#2c5282")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), HexColor("#ffffff")),
-                    ("FONTSIZE", (0, 0), (-1, 0), 10),
-                    ("FONTSIZE", (0, 1), (-1, -1), 9),
-                    ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#cccccc")),
-                    ("ROWBACKGROUNDS", (0, 1), (-1, -1), [HexColor("#f7fafc"), HexColor("#ffffff")]),
-                    ("TOPPADDING", (0, 0), (-1, -1), 6),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 6),
-                    ("LEFTPADDING", (0, 0), (-1, -1), 8),
-                ]))
+                table = rl.Table(data)
+                table.setStyle(_get_table_style())
                 elements.append(table)
 
         elif btype == "spacer":
             elements.append(Spacer(1, block.get("height", 20)))
 
         elif btype == "page_break":
-            elements.append(PageBreak())
+            elements.append(rl.PageBreak())
 
     # Footer
     elements.append(Spacer(1, 40))
@@ -177,102 +194,148 @@ def generate_pdf(
     return buffer.read()
 
 
-def _generate_simple_pdf(title: str, content_blocks: list[dict], metadata: dict | None = None) -> bytes:
+# ── Stdlib fallback ───────────────────────────────────────────────────────────
+
+# Letter page, Courier 10pt: 14pt leading between y=750 and the 50pt bottom margin
+_PAGE_WIDTH, _PAGE_HEIGHT = 612, 792
+_TOP_Y, _BOTTOM_Y, _LEADING = 750, 50, 14
+_LINES_PER_PAGE = (_TOP_Y - _BOTTOM_Y) // _LEADING + 1
+_CHARS_PER_LINE = 85  # (612 - 2 * 50) / 6pt Courier advance
+
+
+class _PdfStreamWriter:
+    """
+    Minimal PDF writer that emits objects as they are produced.
+
+    Object offsets are counted as bytes are written (the target needn't be
+    seekable), so the xref table is exact. Only the current page's lines
+    are held in memory; the page tree is written last, pointing at every
+    page object emitted along the way.
+    """
+
+    _CATALOG, _PAGES, _FONT = 1, 2, 3
+
+    def __init__(self, out: BinaryIO):
+        self._out = out
+        self._pos = 0
+        self._offsets: dict[int, int] = {}
+        self._next_id = 4
+        self._page_ids: list[int] = []
+        self._lines: list[str] = []
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._object(self._FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+
+    def _write(self, data: bytes) -> None:
+        self._out.write(data)
+        self._pos += len(data)
+
+    def _object(self, obj_id: int, body: bytes) -> None:
+        self._offsets[obj_id] = self._pos
+        self._write(f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n")
+
+    def _allocate(self) -> int:
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def add_line(self, line: str) -> None:
+        if len(self._lines) >= _LINES_PER_PAGE:
+            self.end_page()
+        self._lines.append(line)
+
+    def end_page(self) -> None:
+        """Flush the current page (no-op when it is empty)."""
+        if not self._lines:
+            return
+        parts = [f"BT\n/F1 10 Tf\n{_LEADING} TL\n50 {_TOP_Y} Td\n".encode()]
+        for line in self._lines:
+            safe = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            parts.append(b"(" + safe.encode("cp1252", errors="replace") + b") Tj T*\n")
+        parts.append(b"ET")
+        stream = b"".join(parts)
+        self._lines = []
+
+        content_id, page_id = self._allocate(), self._allocate()
+        self._object(content_id, f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        self._object(
+            page_id,
+            f"<< /Type /Page /Parent {self._PAGES} 0 R /MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] "
+            f"/Contents {content_id} 0 R /Resources << /Font << /F1 {self._FONT} 0 R >> >> >>".encode(),
+        )
+        self._page_ids.append(page_id)
+
+    def close(self) -> None:
+        """Write the page tree, catalog, xref table and trailer."""
+        self.end_page()
+        if not self._page_ids:
+            self._lines = [""]
+            self.end_page()
+        kids = " ".join(f"{pid} 0 R" for pid in self._page_ids)
+        self._object(self._PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode())
+        self._object(self._CATALOG, f"<< /Type /Catalog /Pages {self._PAGES} 0 R >>".encode())
+
+        size = self._next_id
+        xref_offset = self._pos
+        xref = [f"xref\n0 {size}\n0000000000 65535 f \n"]
+        xref.extend(f"{self._offsets[i]:010d} 00000 n \n" for i in range(1, size))
+        self._write("".join(xref).encode())
+        self._write(f"trailer\n<< /Size {size} /Root {self._CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode())
+
+
+def _wrap(text: str) -> Iterator[str]:
+    for raw in text.split("\n"):
+        yield from textwrap.wrap(raw, _CHARS_PER_LINE, break_long_words=True, replace_whitespace=False) or [""]
+
+
+def write_simple_pdf(
+    out: BinaryIO, title: str, content_blocks: Iterable[dict], metadata: dict | None = None
+) -> None:
     """
     Fallback PDF generator using only Python stdlib.
-    Creates a minimal but valid PDF with text content.
+
+    Streams a multi-page text PDF to ``out`` block by block, so long
+    reports stay complete and memory stays bounded by one page.
     """
     now = datetime.now(timezone.utc)
     meta = metadata or {}
+    writer = _PdfStreamWriter(out)
 
-    lines = []
-    lines.append(f"LOGAN & LOGAN ABOGADOS")
-    lines.append(f"{'=' * 50}")
-    lines.append(f"{title.upper()}")
+    header = ["LOGAN & LOGAN ABOGADOS", "=" * 50, title.upper()]
     if meta.get("reference_number"):
-        lines.append(f"Ref: {meta['reference_number']}")
-    lines.append(f"Fecha: {meta.get('date', now.strftime('%d/%m/%Y'))}")
-    lines.append(f"{'=' * 50}")
-    lines.append("")
+        header.append(f"Ref: {meta['reference_number']}")
+    header += [f"Fecha: {meta.get('date', now.strftime('%d/%m/%Y'))}", "=" * 50, ""]
+    for line in header:
+        writer.add_line(line)
 
     for block in content_blocks:
         btype = block.get("type", "paragraph")
         if btype == "heading":
-            lines.append(f"\n--- {block.get('text', '')} ---\n")
+            for line in _wrap(f"\n--- {block.get('text', '')} ---\n"):
+                writer.add_line(line)
         elif btype == "paragraph":
-            lines.append(block.get("text", ""))
-            lines.append("")
+            for line in _wrap(block.get("text", "")):
+                writer.add_line(line)
+            writer.add_line("")
         elif btype == "table":
-            data = block.get("data", [])
-            for row in data:
-                lines.append(" | ".join(str(cell) for cell in row))
-            lines.append("")
+            for row in block.get("data", []):
+                for line in _wrap(" | ".join(str(cell) for cell in row)):
+                    writer.add_line(line)
+            writer.add_line("")
         elif btype == "spacer":
-            lines.append("")
-
-    lines.append(f"\n{'=' * 50}")
-    lines.append(f"Generado por Logan Virtual - {now.strftime('%d/%m/%Y %H:%M UTC')}")
-
-    text_content = "\n".join(lines)
-
-    # Create minimal valid PDF
-    pdf_lines = []
-    pdf_lines.append(b"%PDF-1.4")
-
-    # Object 1: Catalog
-    pdf_lines.append(b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj")
-
-    # Object 2: Pages
-    pdf_lines.append(b"2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj")
-
-    # Object 4: Font
-    pdf_lines.append(b"4 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>\nendobj")
-
-    # Object 5: Stream content
-    content_lines = text_content.encode("latin-1", errors="replace")
-    stream_parts = [b"BT\n/F1 10 Tf\n"]
-    y = 750
-    for line in text_content.split("\n"):
-        safe_line = line.encode("latin-1", errors="replace").decode("latin-1")
-        safe_line = safe_line.replace("(", "\\(").replace(")", "\\)")
-        stream_parts.append(f"1 0 0 1 50 {y} Tm\n({safe_line}) Tj\n".encode())
-        y -= 14
-        if y < 50:
-            break
-    stream_parts.append(b"ET")
-    stream_content = b"".join(stream_parts)
-
-    pdf_lines.append(
-        f"5 0 obj\n<< /Length {len(stream_content)} >>\nstream\n".encode() +
-        stream_content +
-        b"\nendstream\nendobj"
-    )
-
-    # Object 3: Page
-    pdf_lines.append(
-        b"3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
-        b"/Contents 5 0 R /Resources << /Font << /F1 4 0 R >> >> >>\nendobj"
-    )
-
-    body = b"\n".join(pdf_lines)
-
-    xref_offset = len(body) + 1
-    xref = b"\nxref\n0 6\n"
-    xref += b"0000000000 65535 f \n"
+            writer.add_line("")
+        elif btype == "page_break":
+            writer.end_page()
 
-    offset = len(b"%PDF-1.4\n")
-    for i in range(1, 6):
-        xref += f"{offset:010d} 00000 n \n".encode()
-        obj_marker = f"{i} 0 obj".encode()
-        pos = body.find(obj_marker, offset)
-        if pos >= 0:
-            offset = pos
-        xref += b""
+    writer.add_line("")
+    writer.add_line("=" * 50)
+    writer.add_line(f"Generado por Logan Virtual - {now.strftime('%d/%m/%Y %H:%M UTC')}")
+    writer.close()
 
-    # Simplified xref
-    trailer = f"\ntrailer\n<< /Size 6 /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF".encode()
 
-    return body + xref + trailer
+def _generate_simple_pdf(title: str, content_blocks: list[dict], metadata: dict | None = None) -> bytes:
+    buffer = io.BytesIO()
+    write_simple_pdf(buffer, title, content_blocks, metadata)
+    return buffer.getvalue()
 
 
 # ── Document-specific generators ──────────────────────────────────────────────
@@ -0,0 +1,153 @@
+"""
+Batch PDF generation for Logan Virtual.
+
+Renders many proposal, contract or invoice PDFs at once: data for the
+whole batch is loaded in a few queries, rendering (CPU-bound reportlab
+work) fans out over the shared process pool, and every result is stored
+content-addressed and recorded as a ``Document`` of the source entity.
+Progress is reported after each PDF through an optional callback (the
+Celery task publishes it as task state).
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+from concurrent.futures import as_completed
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core import process_pool
+from app.core.blob_store import store_blob
+from app.db.enums import DocumentStatusEnum, DocumentTypeEnum
+from app.db.models import Client, Contract, Document, Invoice, Lead, Matter, Proposal
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 500
+
+# kind → (model, document type, file name prefix)
+PDF_KINDS = {
+    "proposal": (Proposal, DocumentTypeEnum.PROPOSAL_PDF, "PROP"),
+    "contract": (Contract, DocumentTypeEnum.CONTRACT_PDF, "CTR"),
+    "invoice": (Invoice, DocumentTypeEnum.OTHER, "INV"),
+}
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def render_pdf(kind: str, data: dict) -> bytes:
+    """Render one PDF; top-level so it can run in a worker process."""
+    from app.core import pdf_generator
+
+    generator = {
+        "proposal": pdf_generator.generate_proposal_pdf,
+        "contract": pdf_generator.generate_contract_pdf,
+        "invoice": pdf_generator.generate_invoice_pdf,
+    }[kind]
+    return generator(data)
+
+
+def _by_id(db: Session, model, ids: set) -> dict:
+    ids.discard(None)
+    if not ids:
+        return {}
+    return {row.id: row for row in db.query(model).filter(model.id.in_(ids)).all()}
+
+
+def load_pdf_data(db: Session, kind: str, ids: list[int], org_id: int) -> list[tuple[int, dict]]:
+    """Generator input for each entity, in the order of ``ids``."""
+    model = PDF_KINDS[kind][0]
+    rows = {
+        row.id: row
+        for row in db.query(model).filter(model.id.in_(ids), model.organization_id == org_id).all()
+    }
+    clients = _by_id(db, Client, {r.client_id for r in rows.values()})
+    matters = _by_id(db, Matter, {r.matter_id for r in rows.values()})
+    leads = _by_id(db, Lead, {getattr(r, "lead_id", None) for r in rows.values()})
+
+    items = []
+    for entity_id in ids:
+        row = rows.get(entity_id)
+        if row is None:
+            continue
+        client = clients.get(row.client_id)
+        lead = leads.get(getattr(row, "lead_id", None))
+        matter = matters.get(row.matter_id)
+        data = {
+            "id": row.id,
+            "client_name": client.full_name_or_company if client else (lead.full_name if lead else "N/A"),
+            "matter_title": matter.title if matter else "N/A",
+        }
+        if kind == "proposal":
+            data.update(
+                matter_type=getattr(matter.matter_type, "value", matter.matter_type) if matter else "N/A",
+                description=row.strategy_summary_text or "",
+                amount=row.amount or 0,
+                payment_mode=row.payment_terms_text or "Cuotas mensuales",
+                date=row.created_at.strftime("%d/%m/%Y") if row.created_at else "",
+            )
+        elif kind == "contract":
+            data.update(
+                description=(matter.description if matter else None) or "Prestación de servicios jurídicos.",
+                duration=row.notes or "Según avance del caso.",
+            )
+        else:
+            data.update(
+                rut=(client.rut if client else None) or "N/A",
+                amount=row.amount,
+                due_date=row.due_date.strftime("%d/%m/%Y"),
+                status=str(getattr(row.status, "value", row.status)),
+            )
+        items.append((entity_id, data))
+    return items
+
+
+def generate_batch(
+    db: Session,
+    kind: str,
+    ids: list[int],
+    org_id: int,
+    user_id: Optional[int] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> dict:
+    """Render, store and record a PDF per entity; returns the created documents."""
+    if kind not in PDF_KINDS:
+        raise ValueError(f"Tipo de PDF inválido: {kind}")
+    _, doc_type, prefix = PDF_KINDS[kind]
+
+    items = load_pdf_data(db, kind, ids[:MAX_BATCH_SIZE], org_id)
+    total = len(items)
+    futures = {process_pool.submit(render_pdf, kind, data): entity_id for entity_id, data in items}
+
+    documents, errors = [], []
+    for done, future in enumerate(as_completed(futures), start=1):
+        entity_id = futures[future]
+        try:
+            pdf = future.result()
+            blob = store_blob(db, io.BytesIO(pdf))
+            doc = Document(
+                organization_id=org_id,
+                entity_type=kind,
+                entity_id=entity_id,
+                doc_type=doc_type,
+                file_name=f"{prefix}-{entity_id}.pdf",
+                storage_path=blob.storage_path,
+                content_hash=blob.digest,
+                status=DocumentStatusEnum.DRAFT,
+                uploaded_by_user_id=user_id,
+            )
+            db.add(doc)
+            db.commit()
+            documents.append({"entity_id": entity_id, "document_id": doc.id})
+        except Exception as exc:
+            db.rollback()
+            logger.error("PDF generation failed for %s %s: %s", kind, entity_id, exc)
+            errors.append({"entity_id": entity_id, "error": str(exc)})
+        if progress:
+            progress(done, total)
+
+    missing = sorted(set(ids[:MAX_BATCH_SIZE]) - {entity_id for entity_id, _ in items})
+    errors.extend({"entity_id": entity_id, "error": "No encontrado"} for entity_id in missing)
+    return {"kind": kind, "total": total, "documents": documents, "errors": errors}
@@ -0,0 +1,94 @@
+"""
+Shared process pool for CPU-bound work (text extraction, PDF rendering).
+
+One ``ProcessPoolExecutor`` per process, created on first use and sized by
+PROCESS_POOL_WORKERS. Where a pool cannot be started — Celery's prefork
+children are daemonic and may not spawn processes, some sandboxes forbid
+it — work runs inline in the calling process instead, so callers never
+need to care which mode they got.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_disabled = False
+_lock = threading.Lock()
+
+
+def get_process_pool() -> Optional[Executor]:
+    """The shared pool, or None when work must run inline."""
+    global _pool, _pool_disabled
+    if _pool is not None or _pool_disabled:
+        return _pool
+    with _lock:
+        if _pool is None and not _pool_disabled:
+            if settings.PROCESS_POOL_WORKERS <= 0:
+                _pool_disabled = True
+            else:
+                _pool = ProcessPoolExecutor(max_workers=settings.PROCESS_POOL_WORKERS)
+    return _pool
+
+
+def _disable_pool(exc: BaseException) -> None:
+    global _pool, _pool_disabled
+    logger.warning("Process pool unavailable (%s); running CPU-bound work inline", exc)
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_disabled = True
+
+
+def _inline_future(fn: Callable, *args: Any) -> Future:
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except BaseException as exc:
+        future.set_exception(exc)
+    return future
+
+
+def submit(fn: Callable, *args: Any) -> Future:
+    """Submit ``fn(*args)`` to the pool (or run it inline as a fallback)."""
+    pool = get_process_pool()
+    if pool is not None:
+        try:
+            return pool.submit(fn, *args)
+        except (AssertionError, OSError, BrokenProcessPool, RuntimeError) as exc:
+            _disable_pool(exc)
+    return _inline_future(fn, *args)
+
+
+def submit_all(fn: Callable, items: Iterable[tuple]) -> list[tuple[tuple, Future]]:
+    """
+    Submit ``fn(*item)`` for every item and wait for all of them; returns
+    the finished (item, future) pairs in input order.
+    """
+    pairs = [(item, submit(fn, *item)) for item in items]
+    results = []
+    for item, future in pairs:
+        exc = future.exception()
+        if isinstance(exc, BrokenProcessPool):
+            # Pool died (e.g. could not fork) — retry this item inline
+            _disable_pool(exc)
+            future = _inline_future(fn, *item)
+        results.append((item, future))
+    return results
+
+
+def shutdown() -> None:
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
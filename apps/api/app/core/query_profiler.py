@@ -0,0 +1,175 @@
+"""
+SQL query profiler and N+1 detector for Logan Virtual.
+
+A ``QueryProfile`` is installed per HTTP request (by the logging
+middleware) and per Celery task. The engine's cursor listeners in
+``app.core.database`` feed every statement into the active profile, which
+tracks query count, total DB time and how often each statement *shape*
+(the SQL with literals and IN-lists collapsed) was executed.
+
+When a unit of work finishes, thresholds from settings are checked and a
+warning is logged for oversized query budgets or repeated shapes — the
+usual signature of a per-row lookup inside a loop.
+
+Tests use ``capture_queries(engine)`` (exposed as the ``assert_max_queries``
+fixture in conftest) to put upper bounds on the queries an endpoint runs.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("logan.queries")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NAMED_PARAM = re.compile(r"%\(\w+\)s|:\w+|\$\d+|%s")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Reduce a SQL statement to its shape so repeated lookups compare equal."""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _NAMED_PARAM.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class QueryProfile:
+    """Queries executed during one request, task or test block."""
+    label: str = ""
+    count: int = 0
+    total_ms: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes executed at least ``threshold`` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, limit: int = 5) -> str:
+        lines = [f"{self.count} queries, {self.total_ms:.1f}ms"]
+        for shape, n in self.shapes.most_common(limit):
+            lines.append(f"  {n}× {shape[:200]}")
+        return "\n".join(lines)
+
+    def report(self) -> None:
+        """Log a warning when the profile exceeds the configured thresholds."""
+        from app.core.config import settings
+
+        if (
+            self.count > settings.QUERY_PROFILER_MAX_QUERIES
+            or self.total_ms > settings.QUERY_PROFILER_MAX_DB_MS
+        ):
+            logger.warning(
+                "Query budget exceeded in %s: %d queries, %.1fms (limits %d / %.0fms)",
+                self.label or "unknown",
+                self.count,
+                self.total_ms,
+                settings.QUERY_PROFILER_MAX_QUERIES,
+                settings.QUERY_PROFILER_MAX_DB_MS,
+            )
+
+        for shape, n in self.repeated(settings.QUERY_PROFILER_MAX_REPEATS):
+            logger.warning(
+                "Possible N+1 in %s: statement executed %d times — %s",
+                self.label or "unknown",
+                n,
+                shape[:300],
+            )
+
+
+_current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+
+
+def record_query(statement: str, duration_ms: float) -> None:
+    """Record a statement against the active profile, if any."""
+    profile = _current.get()
+    if profile is not None:
+        profile.record(statement, duration_ms)
+
+
+@contextmanager
+def profile_queries(label: str) -> Iterator[Optional[QueryProfile]]:
+    """
+    Profile the queries run in the current context and report on exit.
+
+    Yields ``None`` when the profiler is disabled.
+    """
+    from app.core.config import settings
+
+    if not settings.QUERY_PROFILER_ENABLED:
+        yield None
+        return
+
+    profile = QueryProfile(label=label)
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+        profile.report()
+
+
+@contextmanager
+def capture_queries(engine: Engine) -> Iterator[QueryProfile]:
+    """
+    Capture every statement executed on ``engine`` regardless of context.
+
+    Unlike ``profile_queries`` this does not rely on the ContextVar, so it
+    also sees queries run by TestClient in its own event-loop thread.
+    """
+    import time
+
+    profile = QueryProfile(label="capture")
+    started: list[float] = []
+
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        started.append(time.perf_counter())
+
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - started.pop()) * 1000 if started else 0.0
+        profile.record(statement, duration_ms)
+
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+    try:
+        yield profile
+    finally:
+        event.remove(engine, "before_cursor_execute", _before)
+        event.remove(engine, "after_cursor_execute", _after)
+
+
+def install_celery_query_profiler(celery_app) -> None:
+    """Profile the queries of each Celery task (prerun → postrun)."""
+    from celery.signals import task_postrun, task_prerun
+
+    active: dict[str, object] = {}
+
+    @task_prerun.connect(weak=False)
+    def _on_prerun(task_id=None, task=None, **kwargs):
+        ctx = profile_queries(f"task {getattr(task, 'name', task_id)}")
+        ctx.__enter__()
+        active[task_id] = ctx
+
+    @task_postrun.connect(weak=False)
+    def _on_postrun(task_id=None, **kwargs):
+        ctx = active.pop(task_id, None)
+        if ctx is not None:
+            ctx.__exit__(None, None, None)
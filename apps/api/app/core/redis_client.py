@@ -0,0 +1,92 @@
+"""
+Shared Redis client for Logan Virtual.
+
+One connection-pooled client per process with short socket timeouts.
+Redis is an accelerator here (notification fan-out, counters, caches),
+never the source of truth, so an outage must not slow requests down:
+after a connection failure ``get_redis()`` returns ``None`` for a
+growing backoff window (1s, 2s, 4s … 30s) instead of letting every
+caller pay the connect timeout again.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 30.0
+
+_client = None
+_down_until = 0.0
+_backoff = BACKOFF_INITIAL
+_lock = threading.Lock()
+
+
+def get_redis():
+    """The shared ``redis.Redis`` client, or None while Redis is considered down."""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        with _lock:
+            if _client is None:
+                try:
+                    import redis
+                except ImportError:
+                    return None
+                _client = redis.Redis.from_url(
+                    settings.REDIS_URL,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    health_check_interval=30,
+                    decode_responses=True,
+                )
+    return _client
+
+
+def get_async_redis():
+    """A new ``redis.asyncio`` client (bound to the calling event loop)."""
+    import redis.asyncio as aioredis
+
+    return aioredis.from_url(
+        settings.REDIS_URL,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        decode_responses=True,
+    )
+
+
+def mark_redis_down(exc: BaseException) -> None:
+    """Record a failure; ``get_redis()`` returns None until the backoff expires."""
+    global _down_until, _backoff
+    with _lock:
+        _down_until = time.monotonic() + _backoff
+        logger.warning("Redis unavailable (%s); retrying in %.0fs", exc, _backoff)
+        _backoff = min(_backoff * 2, BACKOFF_MAX)
+
+
+def mark_redis_up() -> None:
+    global _down_until, _backoff
+    if _backoff != BACKOFF_INITIAL:
+        with _lock:
+            _down_until = 0.0
+            _backoff = BACKOFF_INITIAL
+
+
+def reset_redis() -> None:
+    """Drop the shared client and backoff state (tests, settings changes)."""
+    global _client, _down_until, _backoff
+    with _lock:
+        if _client is not None:
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        _down_until = 0.0
+        _backoff = BACKOFF_INITIAL
@@ -3,22 +3,48 @@ File storage backends for Logan Virtual.
 
 Supports local filesystem and AWS S3 (or S3-compatible like MinIO).
 Selected via STORAGE_BACKEND setting ("local" or "s3").
+
+Besides the whole-file ``upload``/``download`` helpers, every backend
+offers a streaming API (``upload_stream``, ``size``, ``iter_chunks``) so
+large files move through the API in fixed-size chunks: chunked writes to
+disk, S3 multipart uploads, and ranged chunked reads for downloads.
 """
 
+import io
 import logging
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from pathlib import Path
-from typing import Protocol
+from typing import BinaryIO, Iterator, Optional, Protocol
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Chunk size for streamed reads/writes (constant per-request memory)
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# S3 multipart: parts of 8 MB, at most 4 in flight per upload
+S3_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+S3_MULTIPART_CONCURRENCY = 4
+
+# Presigned URLs are reused until shortly before their signature expires
+PRESIGNED_URL_CACHE_SIZE = 10_000
+PRESIGNED_URL_SAFETY_MARGIN = 60  # seconds
+
 
 class StorageBackend(Protocol):
     def upload(self, file_name: str, content: bytes, subfolder: str = "") -> str: ...
+    def upload_stream(self, file_name: str, stream: BinaryIO, subfolder: str = "") -> str: ...
+    def put_stream(self, path: str, stream: BinaryIO) -> None: ...
     def download(self, path: str) -> bytes: ...
+    def size(self, path: str) -> int: ...
+    def iter_chunks(
+        self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]: ...
     def delete(self, path: str) -> None: ...
     def exists(self, path: str) -> bool: ...
     def get_presigned_url(self, path: str, expires_in: int = 3600) -> str | None: ...
@@ -32,12 +58,27 @@ class LocalStorage:
         self.base_path.mkdir(parents=True, exist_ok=True)
 
     def upload(self, file_name: str, content: bytes, subfolder: str = "") -> str:
+        return self.upload_stream(file_name, io.BytesIO(content), subfolder=subfolder)
+
+    def upload_stream(self, file_name: str, stream: BinaryIO, subfolder: str = "") -> str:
         unique_name = f"{uuid.uuid4().hex}_{file_name}"
-        folder = self.base_path / subfolder if subfolder else self.base_path
-        folder.mkdir(parents=True, exist_ok=True)
-        file_path = folder / unique_name
-        file_path.write_bytes(content)
-        return str(file_path.relative_to(self.base_path))
+        path = f"{subfolder}/{unique_name}" if subfolder else unique_name
+        self.put_stream(path, stream)
+        return path
+
+    def put_stream(self, path: str, stream: BinaryIO) -> None:
+        """Write ``stream`` to ``path`` in chunks; the file appears atomically."""
+        file_path = self.base_path / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = file_path.with_name(f".{file_path.name}.{uuid.uuid4().hex}.part")
+        try:
+            with open(tmp_path, "wb") as out:
+                while chunk := stream.read(CHUNK_SIZE):
+                    out.write(chunk)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
 
     def download(self, path: str) -> bytes:
         file_path = self.base_path / path
@@ -45,6 +86,38 @@ class LocalStorage:
             raise FileNotFoundError(f"Archivo no encontrado: {path}")
         return file_path.read_bytes()
 
+    def size(self, path: str) -> int:
+        return self.local_path(path).stat().st_size
+
+    def local_path(self, path: str) -> Path:
+        """Filesystem path of a stored file (for zero-copy serving)."""
+        file_path = (self.base_path / path).resolve()
+        if not file_path.is_relative_to(self.base_path.resolve()) or not file_path.is_file():
+            raise FileNotFoundError(f"Archivo no encontrado: {path}")
+        return file_path
+
+    def iter_chunks(
+        self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Yield bytes ``start``..``end`` (inclusive; ``None`` = EOF) in chunks."""
+        file_path = self.base_path / path
+        if not file_path.is_file():
+            raise FileNotFoundError(f"Archivo no encontrado: {path}")
+        return self._read_range(file_path, start, end, chunk_size)
+
+    @staticmethod
+    def _read_range(file_path: Path, start: int, end: Optional[int], chunk_size: int) -> Iterator[bytes]:
+        with open(file_path, "rb") as f:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
     def delete(self, path: str) -> None:
         file_path = self.base_path / path
         if file_path.exists():
@@ -59,7 +132,13 @@ class LocalStorage:
 
 
 class S3Storage:
-    """Store files on AWS S3 or S3-compatible storage (MinIO, DigitalOcean Spaces, etc.)."""
+    """
+    Store files on AWS S3 or S3-compatible storage (MinIO, DigitalOcean Spaces, etc.).
+
+    Instances are meant to be shared process-wide (see ``get_storage``): the
+    boto3 client is thread-safe and keeps a pool of keep-alive connections,
+    and presigned URLs are cached until shortly before they expire.
+    """
 
     def __init__(
         self,
@@ -70,17 +149,25 @@ class S3Storage:
         endpoint_url: str = settings.S3_ENDPOINT_URL,
     ):
         import boto3
+        from botocore.config import Config
 
         self.bucket_name = bucket_name
         kwargs = {
             "region_name": region,
             "aws_access_key_id": access_key,
             "aws_secret_access_key": secret_key,
+            "config": Config(
+                signature_version="s3v4",
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": 3, "mode": "standard"},
+            ),
         }
         if endpoint_url:
             kwargs["endpoint_url"] = endpoint_url
 
         self.client = boto3.client("s3", **kwargs)
+        self._presigned: OrderedDict[tuple[str, int], tuple[str, float]] = OrderedDict()
+        self._presigned_lock = threading.Lock()
         logger.info("S3Storage initialized: bucket=%s, region=%s", bucket_name, region)
 
     def upload(self, file_name: str, content: bytes, subfolder: str = "") -> str:
@@ -94,6 +181,24 @@ class S3Storage:
         logger.info("S3 upload: %s (%d bytes)", key, len(content))
         return key
 
+    def upload_stream(self, file_name: str, stream: BinaryIO, subfolder: str = "") -> str:
+        unique_name = f"{uuid.uuid4().hex}_{file_name}"
+        key = f"{subfolder}/{unique_name}" if subfolder else unique_name
+        self.put_stream(key, stream)
+        return key
+
+    def put_stream(self, path: str, stream: BinaryIO) -> None:
+        """Managed upload: multipart above one part size, bounded buffering."""
+        from boto3.s3.transfer import TransferConfig
+
+        config = TransferConfig(
+            multipart_threshold=S3_MULTIPART_CHUNK_SIZE,
+            multipart_chunksize=S3_MULTIPART_CHUNK_SIZE,
+            max_concurrency=S3_MULTIPART_CONCURRENCY,
+        )
+        self.client.upload_fileobj(stream, self.bucket_name, path, Config=config)
+        logger.info("S3 streamed upload: %s", path)
+
     def download(self, path: str) -> bytes:
         try:
             response = self.client.get_object(Bucket=self.bucket_name, Key=path)
@@ -101,8 +206,42 @@ class S3Storage:
         except self.client.exceptions.NoSuchKey:
             raise FileNotFoundError(f"Archivo no encontrado en S3: {path}")
 
+    def size(self, path: str) -> int:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.head_object(Bucket=self.bucket_name, Key=path)["ContentLength"]
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(f"Archivo no encontrado en S3: {path}")
+            raise
+
+    def iter_chunks(
+        self, path: str, start: int = 0, end: Optional[int] = None, chunk_size: int = CHUNK_SIZE
+    ) -> Iterator[bytes]:
+        """Ranged GET streamed in chunks (``end`` inclusive; ``None`` = EOF)."""
+        kwargs = {"Bucket": self.bucket_name, "Key": path}
+        if start or end is not None:
+            kwargs["Range"] = f"bytes={start}-{'' if end is None else end}"
+        try:
+            response = self.client.get_object(**kwargs)
+        except self.client.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"Archivo no encontrado en S3: {path}")
+        return self._stream_body(response["Body"], chunk_size)
+
+    @staticmethod
+    def _stream_body(body, chunk_size: int) -> Iterator[bytes]:
+        # Release the HTTP connection even if the client disconnects mid-download
+        try:
+            yield from body.iter_chunks(chunk_size)
+        finally:
+            body.close()
+
     def delete(self, path: str) -> None:
         self.client.delete_object(Bucket=self.bucket_name, Key=path)
+        with self._presigned_lock:
+            for cache_key in [k for k in self._presigned if k[0] == path]:
+                del self._presigned[cache_key]
         logger.info("S3 delete: %s", path)
 
     def exists(self, path: str) -> bool:
@@ -113,21 +252,45 @@ class S3Storage:
             return False
 
     def get_presigned_url(self, path: str, expires_in: int = 3600) -> str | None:
-        """Generate a presigned URL for secure temporary download access."""
+        """
+        Presigned URL for secure temporary download access.
+
+        Cached per (path, expires_in) and reused until ``PRESIGNED_URL_SAFETY_MARGIN``
+        seconds (at most half the lifetime) before the signature expires, so a
+        returned URL always stays valid for a while after it is handed out.
+        """
+        cache_key = (path, expires_in)
+        now = time.monotonic()
+        with self._presigned_lock:
+            cached = self._presigned.get(cache_key)
+            if cached and cached[1] > now:
+                self._presigned.move_to_end(cache_key)
+                return cached[0]
+
         try:
             url = self.client.generate_presigned_url(
                 "get_object",
                 Params={"Bucket": self.bucket_name, "Key": path},
                 ExpiresIn=expires_in,
             )
-            return url
         except Exception as exc:
             logger.error("Failed to generate presigned URL: %s", exc)
             return None
 
+        margin = min(PRESIGNED_URL_SAFETY_MARGIN, expires_in / 2)
+        with self._presigned_lock:
+            self._presigned[cache_key] = (url, now + expires_in - margin)
+            self._presigned.move_to_end(cache_key)
+            while len(self._presigned) > PRESIGNED_URL_CACHE_SIZE:
+                self._presigned.popitem(last=False)
+        return url
 
-def get_storage() -> StorageBackend:
-    """Factory function to get the configured storage backend."""
+
+_storage: Optional[StorageBackend] = None
+_storage_lock = threading.Lock()
+
+
+def _create_storage() -> StorageBackend:
     if settings.STORAGE_BACKEND == "s3" and settings.S3_BUCKET_NAME:
         try:
             return S3Storage()
@@ -135,3 +298,20 @@ def get_storage() -> StorageBackend:
             logger.error("Failed to initialize S3 storage, falling back to local: %s", exc)
 
     return LocalStorage()
+
+
+def get_storage() -> StorageBackend:
+    """Process-wide configured storage backend (created on first use)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = _create_storage()
+    return _storage
+
+
+def reset_storage() -> None:
+    """Drop the cached backend (tests / configuration changes)."""
+    global _storage
+    with _storage_lock:
+        _storage = None
@@ -0,0 +1,56 @@
+"""
+Compiled template cache for Logan Virtual.
+
+Templates are rendered with a sandboxed Jinja2 environment. Parsing and
+compiling the source is by far the most expensive part of a render, so
+compiled templates are kept in a process-wide LRU keyed by
+``(template_id, updated_at)``: editing a template bumps ``updated_at``
+and naturally misses the cache, while repeated renders (agent drafts,
+bulk mail merge) reuse the compiled code.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from jinja2 import Template as JinjaTemplate
+from jinja2.sandbox import SandboxedEnvironment
+
+TEMPLATE_CACHE_SIZE = 256
+
+sandbox_env = SandboxedEnvironment(autoescape=True)
+
+_cache: OrderedDict[tuple[int, Optional[datetime]], JinjaTemplate] = OrderedDict()
+_lock = threading.Lock()
+
+
+def compile_template(template_id: int, updated_at: Optional[datetime], source: str) -> JinjaTemplate:
+    """Compiled template for this version, compiling it on first use."""
+    key = (template_id, updated_at)
+    with _lock:
+        compiled = _cache.get(key)
+        if compiled is not None:
+            _cache.move_to_end(key)
+            return compiled
+
+    # Compile outside the lock; TemplateSyntaxError propagates uncached
+    compiled = sandbox_env.from_string(source)
+    with _lock:
+        _cache[key] = compiled
+        _cache.move_to_end(key)
+        while len(_cache) > TEMPLATE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return compiled
+
+
+def get_compiled(template) -> JinjaTemplate:
+    """Compiled form of a ``Template`` row."""
+    return compile_template(template.id, template.updated_at, template.content_text)
+
+
+def clear_cache() -> None:
+    with _lock:
+        _cache.clear()
@@ -0,0 +1,103 @@
+"""
+Plain-text extraction from uploaded documents (PDF, DOCX, TXT).
+
+Functions here are pure and top-level so they can run in a worker
+process (see ``app.core.process_pool``). PDF parsing uses ``pypdf``
+(imported lazily); DOCX bodies (``word/document.xml`` inside the ZIP
+container) are untrusted XML, parsed with ``defusedxml``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+import zipfile
+
+from defusedxml import ElementTree
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"}
+
+# Chunking: ~2k characters per chunk with a small overlap so a passage cut
+# at a boundary is still found whole in one of the two chunks.
+CHUNK_CHARS = 2000
+CHUNK_OVERLAP = 200
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+_SPACES = re.compile(r"[ \t\r\f\v]+")
+
+
+class UnsupportedDocument(Exception):
+    """The file type cannot be converted to text."""
+
+
+def extract_text(path: str, file_name: str) -> str:
+    """Extract normalized plain text from the file at ``path``."""
+    ext = os.path.splitext(file_name)[1].lower()
+    if ext == ".pdf":
+        text = _extract_pdf(path)
+    elif ext == ".docx":
+        text = _extract_docx(path)
+    elif ext == ".txt":
+        text = _extract_txt(path)
+    else:
+        raise UnsupportedDocument(f"Tipo de archivo sin extracción de texto: {ext or file_name}")
+    return normalize_text(text)
+
+
+def _extract_pdf(path: str) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{_WORD_NS}t")))
+    return "\n\n".join(paragraphs)
+
+
+def _extract_txt(path: str) -> str:
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def normalize_text(text: str) -> str:
+    text = text.replace("\x00", "")
+    text = _SPACES.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+def chunk_text(text: str, size: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """Split text into ~``size`` character chunks, preferring paragraph breaks."""
+    if not text:
+        return []
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Back off to the last paragraph / sentence / word break in the window
+            window = text[start:end]
+            for sep in ("\n\n", ". ", " "):
+                cut = window.rfind(sep)
+                if cut > size // 2:
+                    end = start + cut + len(sep)
+                    break
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return [c for c in chunks if c]
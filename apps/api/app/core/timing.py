@@ -0,0 +1,111 @@
+"""
+Per-request timing collector for Logan Virtual.
+
+Accumulates where a request spent its time (database, AI provider,
+response serialization) and renders it as a ``Server-Timing`` header.
+
+The active collector lives in a ContextVar, so sync endpoints running in
+the threadpool and agent calls dispatched with ``asyncio.to_thread`` record
+into the same object as the request that spawned them.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+# Metrics emitted in the header, in display order → human description
+SERVER_TIMING_METRICS: dict[str, str] = {
+    "db": "Database",
+    "ai": "AI provider",
+    "serialize": "Serialization",
+}
+
+
+@dataclass
+class RequestTimings:
+    """Accumulated durations (ms) and counters for a single request."""
+    started_at: float = field(default_factory=time.perf_counter)
+    durations_ms: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def add(self, metric: str, duration_ms: float, count: int = 1) -> None:
+        self.durations_ms[metric] = self.durations_ms.get(metric, 0.0) + duration_ms
+        self.counts[metric] = self.counts.get(metric, 0) + count
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def server_timing_header(self) -> str:
+        """Render entries as ``name;dur=X;desc="..."`` joined by commas."""
+        entries = []
+        for metric, desc in SERVER_TIMING_METRICS.items():
+            if metric not in self.durations_ms:
+                continue
+            count = self.counts.get(metric, 0)
+            if metric == "db":
+                desc = f"{desc} ({count} queries)"
+            entries.append(f'{metric};dur={self.durations_ms[metric]:.1f};desc="{desc}"')
+        entries.append(f"total;dur={self.elapsed_ms():.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> tuple[RequestTimings, Token]:
+    """Install a fresh collector for the current context."""
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def reset_request_timings(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def record_timing(metric: str, duration_ms: float, count: int = 1) -> None:
+    """Record a duration against the active request, if any."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(metric, duration_ms, count)
+
+
+@contextmanager
+def timed(metric: str) -> Iterator[None]:
+    """Context manager that records the wrapped block's duration."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_timing(metric, (time.perf_counter() - start) * 1000)
+
+
+def instrument_serialization() -> None:
+    """
+    Time FastAPI's response serialization (validation + JSON encoding).
+
+    ``fastapi.routing.serialize_response`` is looked up by name on every
+    request, so wrapping it once here covers all routes regardless of how
+    routers were included. Idempotent.
+    """
+    import fastapi.routing as fastapi_routing
+
+    original = fastapi_routing.serialize_response
+    if getattr(original, "__timed__", False):
+        return
+
+    @functools.wraps(original)
+    async def timed_serialize_response(*args, **kwargs):
+        with timed("serialize"):
+            return await original(*args, **kwargs)
+
+    timed_serialize_response.__timed__ = True
+    fastapi_routing.serialize_response = timed_serialize_response
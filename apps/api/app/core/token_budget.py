@@ -0,0 +1,167 @@
+"""
+Token budgeting for agent requests.
+
+``len(json.dumps(msg)) // 4`` badly undercounts Spanish legal text
+(accented characters, long numbers like RUTs and amounts) and JSON
+punctuation. This module provides:
+
+- ``estimate()``: a fast local estimate that segments text the way BPE
+  tokenizers tend to split it (words, digit groups, punctuation), scaled
+  by a per-model calibration factor.
+- ``observe()``: calibration against the real ``input_tokens`` the API
+  reports for every call (exponential moving average of actual/estimated,
+  per model and per process).
+- Per-model context windows and the history budget left once the system
+  prompt, tool schemas and the reply are accounted for.
+- ``truncate_to_tokens()`` and ``trim_history()`` built on the above.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+from typing import Any, Optional
+
+from app.core.config import settings
+
+DEFAULT_CONTEXT_WINDOW = 200_000
+
+# Longest matching prefix wins
+CONTEXT_WINDOWS = {
+    "claude-opus-4": 200_000,
+    "claude-sonnet-4": 200_000,
+    "claude-3-7-sonnet": 200_000,
+    "claude-3-5-sonnet": 200_000,
+    "claude-3-5-haiku": 200_000,
+    "claude-3-haiku": 200_000,
+}
+
+SAFETY_MARGIN = 0.05  # of the window, for estimator error
+CALIBRATION_ALPHA = 0.2
+CALIBRATION_BOUNDS = (0.5, 3.0)
+TRUNCATION_MARKER = "... [truncado]"
+
+_SEGMENT = re.compile(r"[^\W\d_]+|\d+|\n+|\s+|[^\w\s]|_+")
+
+_calibration: dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def context_window(model: Optional[str]) -> int:
+    if model:
+        for prefix in sorted(CONTEXT_WINDOWS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return CONTEXT_WINDOWS[prefix]
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def _as_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def estimate_raw(value: Any) -> int:
+    """Uncalibrated token estimate for a string or any JSON-able value."""
+    tokens = 0
+    for seg in _SEGMENT.findall(_as_text(value)):
+        first = seg[0]
+        if first.isalpha():
+            # Non-ASCII letters (á, é, ñ …) usually cost more than one char
+            weighted = len(seg) + sum(1 for ch in seg if ord(ch) > 127)
+            tokens += math.ceil(weighted / 4)
+        elif first.isdigit():
+            tokens += math.ceil(len(seg) / 3)
+        elif first == "\n":
+            tokens += 1
+        elif first.isspace():
+            tokens += len(seg) // 4  # single spaces merge into the next word
+        else:
+            tokens += len(seg) if first == "_" else 1
+    return tokens
+
+
+def calibration(model: Optional[str]) -> float:
+    return _calibration.get(model or "", 1.0)
+
+
+def estimate(value: Any, model: Optional[str] = None) -> int:
+    return math.ceil(estimate_raw(value) * calibration(model))
+
+
+def observe(model: str, estimated_raw: int, actual_tokens: int) -> None:
+    """Fold one (estimate, reported ``input_tokens``) pair into the model's factor."""
+    if not model or estimated_raw <= 0 or actual_tokens <= 0:
+        return
+    ratio = min(max(actual_tokens / estimated_raw, CALIBRATION_BOUNDS[0]), CALIBRATION_BOUNDS[1])
+    with _lock:
+        previous = _calibration.get(model)
+        _calibration[model] = ratio if previous is None else (
+            previous + CALIBRATION_ALPHA * (ratio - previous)
+        )
+
+
+def reset_calibration() -> None:
+    with _lock:
+        _calibration.clear()
+
+
+def history_budget(
+    model: Optional[str],
+    system: str = "",
+    tools: Optional[list] = None,
+    max_output_tokens: int = 4096,
+) -> int:
+    """Tokens left for messages: the model window (capped by the cost budget)
+    minus system prompt, tool schemas, reply and a safety margin."""
+    window = context_window(model)
+    fixed = estimate(system, model) + (estimate(tools, model) if tools else 0)
+    available = int(window * (1 - SAFETY_MARGIN)) - max_output_tokens - fixed
+    return max(min(available, settings.AGENT_HISTORY_TOKEN_BUDGET), 0)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Longest prefix of ``text`` (plus a marker) within ``max_tokens``."""
+    if estimate(text, model) <= max_tokens:
+        return text
+    budget = max(max_tokens - estimate(TRUNCATION_MARKER, model), 0)
+    # A token rarely spans more than a handful of characters: bound the search
+    lo, hi = 0, min(len(text), budget * 16)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate(text[:mid], model) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + TRUNCATION_MARKER
+
+
+def trim_history(history: list[dict], budget: int, model: Optional[str] = None) -> int:
+    """
+    Drop the oldest messages (after the first) until ``history`` fits
+    ``budget``. The kept tail starts at an assistant turn, so user/assistant
+    alternation stays valid and no tool_result loses its tool_use. Returns
+    the number of messages dropped.
+    """
+    costs = [estimate(m, model) for m in history]
+    if sum(costs) <= budget:
+        return 0
+    assistant_turns = [i for i in range(1, len(history)) if history[i]["role"] == "assistant"]
+    if not assistant_turns:
+        return 0  # nothing can be dropped without breaking the conversation
+
+    # Walk back from the newest message while it fits next to the first one
+    used = costs[0]
+    start = len(history)
+    while start > 1 and used + costs[start - 1] <= budget:
+        start -= 1
+        used += costs[start]
+
+    # Never past the last assistant turn; otherwise move forward to one
+    start = next((i for i in assistant_turns if i >= start), assistant_turns[-1])
+    dropped = start - 1
+    if dropped:
+        history[:] = [history[0]] + history[start:]
+    return dropped
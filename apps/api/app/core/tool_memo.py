@@ -0,0 +1,82 @@
+"""
+Memoization of read-only agent tool results.
+
+Within one agent task the model often repeats a read (``get_matter_details``
+for the same id after the history was trimmed), and the steps of a
+workflow re-fetch the same records. ``ToolMemo`` caches results of tools
+flagged ``read_only`` keyed by tool name and canonical JSON arguments.
+Any write tool executed in the same scope clears it, so a read after a
+write always sees fresh data.
+
+Scope: one memo per ``AgentRuntime.execute`` call, or one shared memo for
+every agent task run inside ``workflow_scope()``.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import copy
+import json
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+MISSING = object()
+
+_workflow_memo: contextvars.ContextVar[Optional["ToolMemo"]] = contextvars.ContextVar(
+    "workflow_tool_memo", default=None,
+)
+
+
+def canonical_key(tool_name: str, args: dict) -> str:
+    return tool_name + ":" + json.dumps(args or {}, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolMemo:
+    def __init__(self):
+        self._results: dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, tool_name: str, args: dict) -> Any:
+        """Cached result or ``MISSING``; counts the hit/miss."""
+        result = self._results.get(canonical_key(tool_name, args), MISSING)
+        if result is MISSING:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return copy.deepcopy(result)  # callers may mutate what they get
+
+    def put(self, tool_name: str, args: dict, result: Any) -> None:
+        self._results[canonical_key(tool_name, args)] = copy.deepcopy(result)
+
+    def invalidate(self) -> None:
+        if self._results:
+            self._results.clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+
+def current() -> Optional[ToolMemo]:
+    """The enclosing workflow's memo, if any."""
+    return _workflow_memo.get()
+
+
+@contextmanager
+def workflow_scope() -> Iterator[ToolMemo]:
+    """Share one memo across every agent task run inside the block."""
+    memo = ToolMemo()
+    token = _workflow_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _workflow_memo.reset(token)
+
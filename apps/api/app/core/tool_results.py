@@ -0,0 +1,177 @@
+"""
+Compact serialization of tool results sent back to the model.
+
+``str(result)`` (a Python repr) spends most of its tokens on quoting,
+padding, repeated keys and ``None`` fields. ``serialize()`` instead emits:
+
+- compact JSON (no spaces, UTF-8 kept as is);
+- key elision: ``None``, empty strings/lists/dicts are dropped, and lists
+  of records become ``{"columns": [...], "rows": [[...]]}`` so each key is
+  written once instead of once per row;
+- per-tool projection: a tool's ``result_fields`` keep only those fields
+  of every record in its lists;
+- pagination: lists longer than ``AGENT_TOOL_RESULT_PAGE_SIZE`` (or than
+  the token budget allows) are cut to a page and followed by
+  ``"<key>_more": {"cursor": ..., "remaining": n}``. The rest is held in a
+  ``ResultPager`` and the model asks for it with the ``fetch_more_results``
+  tool.
+
+Timestamps lose their sub-second part. ``token_budget.truncate_to_tokens``
+stays as the last resort when a single page is still over budget.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+from app.core import token_budget
+from app.core.config import settings
+
+FETCH_MORE_TOOL = "fetch_more_results"
+MAX_HELD_CURSORS = 50
+
+FETCH_MORE_SCHEMA = {
+    "name": FETCH_MORE_TOOL,
+    "description": (
+        "Obtener la siguiente página de una lista recortada en un resultado anterior. "
+        "Usar el cursor indicado en el campo '<lista>_more'."
+    ),
+    "input_schema": {
+        "type": "object",
+        "properties": {
+            "cursor": {"type": "string", "description": "Cursor entregado en '<lista>_more'"},
+        },
+        "required": ["cursor"],
+    },
+}
+
+_TIMESTAMP = re.compile(r"^(\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d)\.\d+")
+
+
+class ResultPager:
+    """List remainders held back from the model, by cursor (one per task)."""
+
+    def __init__(self, max_cursors: int = MAX_HELD_CURSORS):
+        self._held: OrderedDict[str, list] = OrderedDict()
+        self._max_cursors = max_cursors
+
+    def hold(self, cursor: str, items: list) -> None:
+        self._held[cursor] = items
+        while len(self._held) > self._max_cursors:
+            self._held.popitem(last=False)
+
+    def fetch(self, cursor: Optional[str], page_size: Optional[int] = None) -> dict:
+        """Next page for ``cursor``; the cursor stays valid until exhausted."""
+        items = self._held.get(cursor or "")
+        if items is None:
+            return {"error": f"Cursor '{cursor}' no válido o agotado"}
+        size = max(page_size or settings.AGENT_TOOL_RESULT_PAGE_SIZE, 1)
+        page, rest = items[:size], items[size:]
+        if rest:
+            self._held[cursor] = rest
+            return {"items": page, "more": {"cursor": cursor, "remaining": len(rest)}}
+        del self._held[cursor]
+        return {"items": page}
+
+    def __len__(self) -> int:
+        return len(self._held)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+class _Compactor:
+    def __init__(self, fields: Sequence[str], page_size: Optional[int]):
+        self.fields = tuple(fields)
+        self.page_size = page_size
+        self.held: list[tuple[str, list]] = []
+
+    def value(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            return self.mapping(value)
+        if isinstance(value, (list, tuple)):
+            return self.records([self.item(v) for v in value])
+        if isinstance(value, str):
+            return _TIMESTAMP.sub(r"\1", value)
+        return value
+
+    def item(self, value: Any) -> Any:
+        if isinstance(value, dict) and self.fields:
+            value = {k: v for k, v in value.items() if k in self.fields}
+        return self.value(value)
+
+    def mapping(self, value: dict) -> dict:
+        out = {}
+        for key, raw in value.items():
+            if isinstance(raw, (list, tuple)) and self.page_size is not None and len(raw) > self.page_size:
+                items = [self.item(v) for v in raw]
+                cursor = uuid.uuid4().hex[:8]
+                self.held.append((cursor, items[self.page_size:]))
+                out[key] = self.records(items[:self.page_size])
+                out[f"{key}_more"] = {"cursor": cursor, "remaining": len(items) - self.page_size}
+                continue
+            compact = self.value(raw)
+            if not _is_empty(compact):
+                out[key] = compact
+        return out
+
+    @staticmethod
+    def records(items: list) -> Any:
+        """Lists of two or more dicts become columns + rows."""
+        if len(items) < 2 or not all(isinstance(i, dict) for i in items):
+            return items
+        columns: list[str] = []
+        for item in items:
+            columns.extend(k for k in item if k not in columns)
+        return {"columns": columns, "rows": [[item.get(c) for c in columns] for item in items]}
+
+
+def compact(value: Any, fields: Sequence[str] = (), page_size: Optional[int] = None) -> tuple[Any, list]:
+    """
+    Compact ``value`` for the model. Returns the compact value and the held
+    ``(cursor, items)`` remainders of lists cut at ``page_size`` (``None``:
+    no pagination).
+    """
+    compactor = _Compactor(fields, page_size)
+    return compactor.value(value), compactor.held
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def serialize(
+    result: Any,
+    fields: Sequence[str] = (),
+    pager: Optional[ResultPager] = None,
+    max_tokens: Optional[int] = None,
+    model: Optional[str] = None,
+) -> str:
+    """
+    Tool result as compact JSON within ``max_tokens``. Without a ``pager``
+    lists are never cut (nothing could serve the rest).
+    """
+    if result is None:
+        return '{"status":"ok"}'
+    if isinstance(result, str):
+        text = result
+    else:
+        page_size = settings.AGENT_TOOL_RESULT_PAGE_SIZE if pager is not None else None
+        while True:
+            value, held = compact(result, fields, page_size)
+            text = dumps(value)
+            if page_size is None or page_size <= 1 or max_tokens is None:
+                break
+            if token_budget.estimate(text, model) <= max_tokens:
+                break
+            page_size //= 2  # over budget: retry with smaller pages
+        for cursor, items in held:
+            pager.hold(cursor, items)
+    if max_tokens is None:
+        return text
+    return token_budget.truncate_to_tokens(text, max_tokens, model)
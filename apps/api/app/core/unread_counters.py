@@ -0,0 +1,86 @@
+"""
+Per-user unread notification counters in Redis.
+
+The header badge polls the unread count constantly; these counters let
+it skip ``COUNT(*)`` on ``notifications``. The database stays the source
+of truth:
+
+- A missing key is loaded from the database once (``SET NX`` with a TTL,
+  so any drift heals on expiry).
+- Increments/decrements only touch keys that already exist, so a counter
+  is never created from a partial delta.
+- Updates are applied after commit; with Redis down every call is a
+  no-op and readers fall back to the database.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Callable, Mapping
+
+from app.core import redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "notifications:unread:"
+COUNTER_TTL_SECONDS = 3600
+
+# INCRBY only when the key exists, clamped at zero, TTL preserved
+_ADJUST_SCRIPT = """
+for i, key in ipairs(KEYS) do
+    if redis.call('EXISTS', key) == 1 then
+        local value = redis.call('INCRBY', key, ARGV[i])
+        if value < 0 then redis.call('SET', key, 0, 'KEEPTTL') end
+    end
+end
+return 1
+"""
+
+
+def _key(user_id: int) -> str:
+    return f"{KEY_PREFIX}{user_id}"
+
+
+def get_unread(user_id: int, load: Callable[[], int]) -> int:
+    """Cached unread count, loading it with ``load()`` on a miss."""
+    r = redis_client.get_redis()
+    if r is not None:
+        try:
+            cached = r.get(_key(user_id))
+            redis_client.mark_redis_up()
+            if cached is not None:
+                return max(int(cached), 0)
+        except Exception as exc:
+            redis_client.mark_redis_down(exc)
+            r = None
+
+    count = load()
+    if r is not None:
+        try:
+            r.set(_key(user_id), count, ex=COUNTER_TTL_SECONDS, nx=True)
+        except Exception as exc:
+            redis_client.mark_redis_down(exc)
+    return count
+
+
+def adjust(deltas: Mapping[int, int]) -> None:
+    """Apply ``{user_id: delta}`` to existing counters in one round trip."""
+    deltas = {uid: d for uid, d in deltas.items() if d}
+    r = redis_client.get_redis() if deltas else None
+    if r is None:
+        return
+    try:
+        r.eval(_ADJUST_SCRIPT, len(deltas), *(_key(uid) for uid in deltas), *deltas.values())
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
+
+
+def reset(user_id: int, value: int = 0) -> None:
+    """Set the counter to a known value (e.g. 0 after "mark all read")."""
+    r = redis_client.get_redis()
+    if r is None:
+        return
+    try:
+        r.set(_key(user_id), value, ex=COUNTER_TTL_SECONDS)
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
@@ -11,6 +11,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.core import tool_memo
 from app.core.agent_bus import AgentBus
 
 logger = logging.getLogger(__name__)
@@ -123,32 +124,35 @@ def execute_workflow(
     accumulated_context = context or {}
     previous_output = message or ""
 
-    for i, step in enumerate(workflow.steps):
-        step_message = step.instruction
-        if previous_output:
-            step_message += f"\n\nContexto del paso anterior:\n{previous_output[:2000]}"
-
-        result = bus.send_message(
-            from_agent_id=0,  # System-initiated
-            to_agent_role=step.agent_role,
-            message=step_message,
-            context=accumulated_context,
-        )
-
-        results.append({
-            "step": i + 1,
-            "agent_role": step.agent_role,
-            "agent_name": result.get("target_agent", {}).get("name", "Unknown"),
-            "status": result.get("status", "unknown"),
-            "response_preview": result.get("response", "")[:300],
-        })
-
-        if step.pass_output_to_next and result.get("status") == "completed":
-            previous_output = result.get("response", "")
-
-        # Stop workflow if a step fails or escalates
-        if result.get("status") in ("failed", "escalated", "depth_exceeded"):
-            break
+    # Steps share read-only tool results (e.g. the same matter) until a write
+    with tool_memo.workflow_scope() as memo:
+        for i, step in enumerate(workflow.steps):
+            step_message = step.instruction
+            if previous_output:
+                step_message += f"\n\nContexto del paso anterior:\n{previous_output[:2000]}"
+
+            result = bus.send_message(
+                from_agent_id=0,  # System-initiated
+                to_agent_role=step.agent_role,
+                message=step_message,
+                context=accumulated_context,
+            )
+
+            results.append({
+                "step": i + 1,
+                "agent_role": step.agent_role,
+                "agent_name": result.get("target_agent", {}).get("name", "Unknown"),
+                "status": result.get("status", "unknown"),
+                "response_preview": result.get("response", "")[:300],
+                "tool_memo": result.get("tool_memo"),
+            })
+
+            if step.pass_output_to_next and result.get("status") == "completed":
+                previous_output = result.get("response", "")
+
+            # Stop workflow if a step fails or escalates
+            if result.get("status") in ("failed", "escalated", "depth_exceeded"):
+                break
 
     return {
         "workflow": workflow.key,
@@ -156,6 +160,7 @@ def execute_workflow(
         "steps_completed": len(results),
         "steps_total": len(workflow.steps),
         "results": results,
+        "tool_memo": memo.stats(),
     }
 
 
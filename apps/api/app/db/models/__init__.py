@@ -16,6 +16,8 @@ from app.db.models.email_ticket import EmailTicket
 from app.db.models.invoice import Invoice, Payment
 from app.db.models.collection_case import CollectionCase
 from app.db.models.document import Document
+from app.db.models.storage_blob import StorageBlob
+from app.db.models.document_text import DocumentTextChunk
 from app.db.models.template import Template
 from app.db.models.scraper import ScraperJob, ScraperResult
 from app.db.models.time_entry import TimeEntry
@@ -29,7 +31,7 @@ __all__ = [
     "Organization", "User", "AuditLog", "Lead", "Client", "Matter",
     "Proposal", "Contract", "Mandate", "NotaryDocument", "Deadline",
     "CourtAction", "Task", "Communication", "EmailTicket", "Invoice",
-    "Payment", "CollectionCase", "Document", "Template",
+    "Payment", "CollectionCase", "Document", "StorageBlob", "DocumentTextChunk", "Template",
     "ScraperJob", "ScraperResult", "TimeEntry", "Notification",
     "AIAgent", "AIAgentSkill", "AIAgentConversation", "AIAgentTask",
 ]
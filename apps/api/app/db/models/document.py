@@ -19,6 +19,7 @@ class Document(TimestampMixin, OrgMixin, Base):
     )
     file_name: Mapped[str] = mapped_column(String(500), nullable=False)
     storage_path: Mapped[str] = mapped_column(String(1000), nullable=False)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True, index=True)  # SHA-256 of blob
     version_int: Mapped[int] = mapped_column(Integer, default=1)
     status: Mapped[str] = mapped_column(
         PgEnum(DocumentStatusEnum, name="document_status_enum"),
@@ -26,3 +27,6 @@ class Document(TimestampMixin, OrgMixin, Base):
     )
     uploaded_by_user_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
     metadata_json: Mapped[Optional[dict]] = mapped_column(JSONB, nullable=True)
+    # Text extraction: content_hash of the indexed version, or the failure reason
+    text_indexed_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    text_index_error: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
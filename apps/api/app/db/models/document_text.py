@@ -0,0 +1,31 @@
+"""Extracted text of a document, split into chunks for full-text search and retrieval."""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, OrgMixin
+
+
+class DocumentTextChunk(OrgMixin, Base):
+    __tablename__ = "document_text_chunks"
+    __table_args__ = (
+        # Spanish full-text index (migration 004); PostgreSQL only
+        Index(
+            "ix_document_text_chunks_fts",
+            text("to_tsvector('spanish', text)"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    document_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False, index=True)  # Blob digest the text came from
+    chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
+    )
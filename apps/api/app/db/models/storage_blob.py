@@ -0,0 +1,16 @@
+"""Content-addressed storage blob shared by documents with identical bytes."""
+
+from sqlalchemy import BigInteger, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base, TimestampMixin
+
+
+class StorageBlob(TimestampMixin, Base):
+    __tablename__ = "storage_blobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    digest: Mapped[str] = mapped_column(String(64), nullable=False, unique=True)  # SHA-256 hex
+    size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    storage_path: Mapped[str] = mapped_column(String(1000), nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -7,13 +7,15 @@ rate limiting, and all module routers.
 
 import os
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi.errors import RateLimitExceeded
 
 from app.core.config import settings
 from app.core.middleware import RequestLoggingMiddleware, SecurityHeadersMiddleware
 from app.core.rate_limiter import limiter, rate_limit_exceeded_handler
+from app.core.timing import instrument_serialization
 
 
 def create_app() -> FastAPI:
@@ -51,6 +53,11 @@ def create_app() -> FastAPI:
     # ── Security middleware ───────────────────────────────────────
     application.add_middleware(SecurityHeadersMiddleware)
     application.add_middleware(RequestLoggingMiddleware)
+    instrument_serialization()
+
+    # ── Live notifications: publish committed rows to all workers ──
+    from app.core.notification_bus import install_notification_publisher
+    install_notification_publisher()
 
     # ── Routers ──────────────────────────────────────────────────
     register_routers(application)
@@ -60,31 +67,13 @@ def create_app() -> FastAPI:
     application.include_router(ws_router)
 
     # ── Startup: auto-create tables & seed if empty ──────────
-    @application.on_event("startup")
-    def _init_db():
-        import logging
-        log = logging.getLogger("logan.startup")
-        try:
-            from app.db.base import Base
-            from app.core.database import engine, SessionLocal
-            import app.db.models  # noqa: F401 — register all models with Base
-            Base.metadata.create_all(bind=engine)
-            log.info("✅ Database tables ensured (%d tables).", len(Base.metadata.tables))
-            # Seed only when database is empty (first run)
-            db = SessionLocal()
-            try:
-                from app.db.models import User
-                if db.query(User).count() == 0:
-                    log.info("Empty database detected — running seed…")
-                    from app.db.seed import seed
-                    seed()
-                    log.info("✅ Seed completed.")
-                else:
-                    log.info("✅ Database already seeded (%d users).", db.query(User).count())
-            finally:
-                db.close()
-        except Exception as e:
-            log.error("❌ Database startup failed: %s", e, exc_info=True)
+    # No DB I/O happens at import time; with DB_AUTO_CREATE_TABLES=false the
+    # schema is managed only by Alembic and startup touches no database.
+    if settings.DB_AUTO_CREATE_TABLES:
+        @application.on_event("startup")
+        def _init_db():
+            from app.core.database import ensure_tables
+            ensure_tables()
 
     return application
 
@@ -156,3 +145,16 @@ app = create_app()
 @app.get("/health", tags=["Health"])
 def health_check():
     return {"status": "ok", "app": settings.APP_NAME, "version": "0.2.0"}
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def metrics(request: Request):
+    """Prometheus scrape endpoint (aggregates all workers in multiprocess mode)."""
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404)
+    if settings.METRICS_AUTH_TOKEN:
+        if request.headers.get("authorization") != f"Bearer {settings.METRICS_AUTH_TOKEN}":
+            raise HTTPException(status_code=401, detail="No autorizado")
+    from app.core.metrics import render_metrics
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
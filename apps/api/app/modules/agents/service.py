@@ -131,7 +131,7 @@ class AgentService:
                 (AIAgentConversation.from_agent_id == agent_id)
                 | (AIAgentConversation.to_agent_id == agent_id)
             )
-        return q.order_by(AIAgentConversation.created_at.desc()).limit(limit).all()
+        return q.order_by(AIAgentConversation.created_at.desc(), AIAgentConversation.id.desc()).limit(limit).all()
 
     # ── Cost Tracking ─────────────────────────────────────────────────────
 
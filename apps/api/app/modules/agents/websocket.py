@@ -6,17 +6,33 @@ JWT auth on connection, then:
   - Execute agent via runtime
   - Stream/push response back
   - Push escalation notifications
+
+The socket holds no database connection while idle: the user and agent
+are read once at connect time into small snapshots (the principal is
+cached for a short TTL so reconnect storms don't hit the database), and
+every message runs in its own short-lived session. Idle and busy sockets
+get a ``heartbeat`` frame; clients may send ``ping`` at any time. Each
+user may keep at most ``AGENT_WS_MAX_CONNECTIONS_PER_USER`` chat sockets
+open per worker. A turn holds its thread and session until it finishes,
+even after the socket stops waiting for it, so new messages are rejected
+while the socket's previous turn is running or the user already has
+``AGENT_WS_MAX_RUNNING_TURNS_PER_USER`` turns running.
 """
 
 import asyncio
 import json
 import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
 from typing import Optional
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from app.core.config import settings
 from app.core.database import SessionLocal
+from app.core.metrics import WEBSOCKET_CONNECTIONS
 from app.core.security import decode_token
 from app.db.models.user import User
 from app.db.models import AIAgent
@@ -25,8 +41,85 @@ logger = logging.getLogger(__name__)
 
 ws_router = APIRouter()
 
+PRINCIPAL_TTL_SECONDS = 60
+
+
+@dataclass(frozen=True)
+class ChatPrincipal:
+    """Detached snapshot of the authenticated user for the socket's lifetime."""
+    user_id: int
+    org_id: int
+    full_name: str
+
+
+@dataclass(frozen=True)
+class ChatAgent:
+    id: int
+    name: str
+    role: str
+    model: str
+
+
+_principals: dict[tuple[int, int], tuple[float, ChatPrincipal]] = {}
+_open_sockets: dict[int, int] = defaultdict(int)
+_running_turns: dict[int, int] = defaultdict(int)  # Updated from worker threads
+_running_turns_lock = threading.Lock()
+
+
+def _load_principal(user_id: int, org_id: int) -> Optional[ChatPrincipal]:
+    """Active user as a ``ChatPrincipal``, cached for ``PRINCIPAL_TTL_SECONDS``."""
+    key = (user_id, org_id)
+    cached = _principals.get(key)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    with SessionLocal() as db:
+        user = db.query(User).filter(User.id == user_id, User.active.is_(True)).first()
+        if not user:
+            _principals.pop(key, None)
+            return None
+        principal = ChatPrincipal(user_id=user.id, org_id=org_id, full_name=user.full_name)
+    _principals[key] = (time.monotonic() + PRINCIPAL_TTL_SECONDS, principal)
+    return principal
+
+
+def _load_agent(agent_id: int, org_id: int) -> Optional[ChatAgent]:
+    with SessionLocal() as db:
+        agent = db.query(AIAgent).filter(
+            AIAgent.id == agent_id,
+            AIAgent.organization_id == org_id,
+            AIAgent.is_active.is_(True),
+        ).first()
+        if not agent:
+            return None
+        return ChatAgent(
+            id=agent.id,
+            name=agent.display_name,
+            role=agent.role if isinstance(agent.role, str) else agent.role.value,
+            model=agent.model_name,
+        )
+
 
-async def _authenticate_ws(websocket: WebSocket) -> Optional[tuple]:
+def _run_turn(principal: ChatPrincipal, agent_id: int, message: str, thread_id: Optional[str]) -> dict:
+    """One chat message as its own unit of work (runs in a worker thread)."""
+    from app.modules.agents.service import AgentService
+
+    with SessionLocal() as db:
+        try:
+            result = AgentService(db, principal.org_id).execute_agent(
+                agent_id=agent_id,
+                message=message,
+                thread_id=thread_id,
+                user_id=principal.user_id,
+            )
+            db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+
+
+async def _authenticate_ws(websocket: WebSocket) -> Optional[ChatPrincipal]:
     """Authenticate a WebSocket connection via JWT token in query params."""
     token = websocket.query_params.get("token")
     if not token:
@@ -43,62 +136,122 @@ async def _authenticate_ws(websocket: WebSocket) -> Optional[tuple]:
         await websocket.close(code=4001, reason="Tipo de token inválido")
         return None
 
-    db = SessionLocal()
     user_id = int(payload.get("sub", 0))
     org_id = int(payload.get("org", 0))
-    user = db.query(User).filter(User.id == user_id, User.active.is_(True)).first()
-    if not user:
-        db.close()
+    principal = await asyncio.to_thread(_load_principal, user_id, org_id)
+    if not principal:
         await websocket.close(code=4001, reason="Usuario no encontrado")
         return None
 
-    return user, org_id, db
+    return principal
+
+
+async def _receive(websocket: WebSocket) -> str:
+    """Next client message; answers pings and sends heartbeats while idle."""
+    while True:
+        try:
+            data = await asyncio.wait_for(
+                websocket.receive_text(), timeout=settings.AGENT_WS_HEARTBEAT_SECONDS,
+            )
+        except asyncio.TimeoutError:
+            await websocket.send_json({"type": "heartbeat"})
+            continue
+        if data == "ping":
+            await websocket.send_json({"type": "pong"})
+            continue
+        return data
+
+
+def _start_turn(principal: ChatPrincipal, agent_id: int, message: str, thread_id) -> asyncio.Future:
+    """Run one turn off the event loop; it counts as running until its thread finishes."""
+    user_id = principal.user_id
+    with _running_turns_lock:
+        _running_turns[user_id] += 1
+
+    def run() -> dict:
+        try:
+            return _run_turn(principal, agent_id, message, thread_id)
+        finally:
+            with _running_turns_lock:
+                _running_turns[user_id] -= 1
+                if _running_turns[user_id] <= 0:
+                    del _running_turns[user_id]
+
+    job = asyncio.ensure_future(asyncio.to_thread(run))
+    # Retrieve the outcome even when the socket stopped waiting for it
+    job.add_done_callback(lambda done: done.cancelled() or done.exception())
+    return job
+
+
+async def _execute(websocket: WebSocket, job: asyncio.Future, thread_id):
+    """Wait for a turn, keeping the socket alive meanwhile."""
+    deadline = time.monotonic() + settings.AGENT_RUNTIME_TIMEOUT
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            # The worker thread finishes (and closes its session) on its own
+            return {
+                "response": "El agente tardó demasiado en responder. Intente de nuevo.",
+                "status": "failed",
+                "thread_id": thread_id,
+            }
+        done, _ = await asyncio.wait({job}, timeout=min(remaining, settings.AGENT_WS_HEARTBEAT_SECONDS))
+        if done:
+            return job.result()
+        await websocket.send_json({"type": "heartbeat", "status": "thinking"})
 
 
 @ws_router.websocket("/ws/chat/{agent_id}")
 async def agent_chat(websocket: WebSocket, agent_id: int):
     """WebSocket endpoint for chatting with an AI agent."""
-    result = await _authenticate_ws(websocket)
-    if not result:
+    principal = await _authenticate_ws(websocket)
+    if not principal:
         return
 
-    user, org_id, db = result
+    if _open_sockets[principal.user_id] >= settings.AGENT_WS_MAX_CONNECTIONS_PER_USER:
+        await websocket.close(code=4029, reason="Demasiadas conexiones de chat abiertas")
+        return
+    _open_sockets[principal.user_id] += 1  # reserved before the next await
+
+    try:
+        await _chat(websocket, principal, agent_id)
+    finally:
+        _open_sockets[principal.user_id] -= 1
+        if _open_sockets[principal.user_id] <= 0:
+            del _open_sockets[principal.user_id]
 
-    # Verify agent exists and belongs to org
-    agent = db.query(AIAgent).filter(
-        AIAgent.id == agent_id,
-        AIAgent.organization_id == org_id,
-        AIAgent.is_active.is_(True),
-    ).first()
 
+async def _chat(websocket: WebSocket, principal: ChatPrincipal, agent_id: int) -> None:
+    # Verify agent exists and belongs to org
+    agent = await asyncio.to_thread(_load_agent, agent_id, principal.org_id)
     if not agent:
         await websocket.close(code=4004, reason="Agente no encontrado")
-        db.close()
         return
 
     await websocket.accept()
-
-    # Send initial connection message
-    await websocket.send_json({
-        "type": "connected",
-        "agent": {
-            "id": agent.id,
-            "name": agent.display_name,
-            "role": agent.role if isinstance(agent.role, str) else agent.role.value,
-            "model": agent.model_name,
-        },
-    })
-
-    thread_id = None
+    WEBSOCKET_CONNECTIONS.labels(channel="agent_chat").inc()
 
     try:
+        # Send initial connection message
+        await websocket.send_json({
+            "type": "connected",
+            "agent": {"id": agent.id, "name": agent.name, "role": agent.role, "model": agent.model},
+        })
+
+        thread_id = None
+        job: Optional[asyncio.Future] = None
         while True:
             # Receive message from client
-            data = await websocket.receive_text()
+            data = await _receive(websocket)
             try:
                 msg = json.loads(data)
             except json.JSONDecodeError:
                 msg = {"message": data}
+            if not isinstance(msg, dict):
+                msg = {"message": data}
+            if msg.get("type") == "ping":
+                await websocket.send_json({"type": "pong"})
+                continue
 
             user_message = msg.get("message", "")
             thread_id = msg.get("thread_id", thread_id)
@@ -107,31 +260,24 @@ async def agent_chat(websocket: WebSocket, agent_id: int):
                 await websocket.send_json({"type": "error", "message": "Mensaje vacío"})
                 continue
 
+            if job is not None and not job.done():
+                await websocket.send_json({
+                    "type": "error", "message": "El agente aún está respondiendo el mensaje anterior",
+                })
+                continue
+            with _running_turns_lock:
+                running = _running_turns.get(principal.user_id, 0)
+            if running >= settings.AGENT_WS_MAX_RUNNING_TURNS_PER_USER:
+                await websocket.send_json({
+                    "type": "error", "message": "Demasiados mensajes en curso; espere a que terminen",
+                })
+                continue
+
             # Send "thinking" status
             await websocket.send_json({"type": "status", "status": "thinking"})
 
-            # Execute agent in thread pool to avoid blocking the event loop
-            from app.modules.agents.service import AgentService
-            svc = AgentService(db, org_id)
-            try:
-                result = await asyncio.wait_for(
-                    asyncio.to_thread(
-                        svc.execute_agent,
-                        agent_id=agent_id,
-                        message=user_message,
-                        thread_id=thread_id,
-                        user_id=user.id,
-                    ),
-                    timeout=120.0,
-                )
-                await asyncio.to_thread(db.commit)
-            except asyncio.TimeoutError:
-                result = {
-                    "response": "El agente tardó demasiado en responder. Intente de nuevo.",
-                    "status": "failed",
-                    "thread_id": thread_id,
-                }
-
+            job = _start_turn(principal, agent_id, user_message, thread_id)
+            result = await _execute(websocket, job, thread_id)
             thread_id = result.get("thread_id", thread_id)
 
             # Send response
@@ -155,12 +301,12 @@ async def agent_chat(websocket: WebSocket, agent_id: int):
                 })
 
     except WebSocketDisconnect:
-        logger.info("WebSocket disconnected: user=%s agent=%s", user.id, agent_id)
+        logger.info("WebSocket disconnected: user=%s agent=%s", principal.user_id, agent_id)
     except Exception as exc:
-        logger.exception("WebSocket error: user=%s agent=%s", user.id, agent_id)
+        logger.exception("WebSocket error: user=%s agent=%s", principal.user_id, agent_id)
         try:
             await websocket.send_json({"type": "error", "message": str(exc)})
         except Exception:
             pass
     finally:
-        db.close()
+        WEBSOCKET_CONNECTIONS.labels(channel="agent_chat").dec()
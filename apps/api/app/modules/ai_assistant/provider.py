@@ -77,12 +77,25 @@ class ClaudeProvider:
     # ── Core call ──────────────────────────────────────────────────
 
     def _call(self, system: str, user_message: str, max_tokens: int = 2048) -> str:
+        import time
+        from app.core.metrics import observe_anthropic_call
+        from app.core.timing import record_timing
+
+        start = time.perf_counter()
         response = self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
             system=system,
             messages=[{"role": "user", "content": user_message}],
         )
+        elapsed = time.perf_counter() - start
+        record_timing("ai", elapsed * 1000)
+        usage = getattr(response, "usage", None)
+        observe_anthropic_call(
+            self.model, elapsed,
+            getattr(usage, "input_tokens", 0) or 0,
+            getattr(usage, "output_tokens", 0) or 0,
+        )
         return response.content[0].text
 
     # ── System prompts by role ─────────────────────────────────────
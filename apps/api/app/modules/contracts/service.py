@@ -15,7 +15,8 @@ from app.db.enums import (
 )
 from app.db.models import AuditLog, Client, Contract, Document, Matter, User
 from app.db.models.task import Task
-from app.core.storage import get_storage
+from app.core.blob_store import store_blob
+from app.core.file_validator import validate_upload_stream
 from app.modules.contracts.schemas import ContractCreate, ContractUpdate
 
 
@@ -409,13 +410,8 @@ def upload_scan_file(
     """Upload a scanned document and attach it to the contract."""
     contract = _get_contract_or_404(db, contract_id, org_id)
 
-    storage = get_storage()
-    content = file.file.read()
-    storage_path = storage.upload(
-        file_name=file.filename or "scan.pdf",
-        content=content,
-        subfolder="contracts",
-    )
+    upload = validate_upload_stream(file.file, file.filename or "scan.pdf")
+    blob = store_blob(db, upload.file, digest=upload.sha256, size=upload.size)
 
     doc = Document(
         organization_id=org_id,
@@ -423,7 +419,8 @@ def upload_scan_file(
         entity_id=contract.id,
         doc_type=DocumentTypeEnum.CONTRACT_PDF,
         file_name=file.filename or "scan.pdf",
-        storage_path=storage_path,
+        storage_path=blob.storage_path,
+        content_hash=blob.digest,
         status=DocumentStatusEnum.FINAL,
         uploaded_by_user_id=current_user.id,
     )
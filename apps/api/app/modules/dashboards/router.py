@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.security import get_current_user
 from app.modules.dashboards import service
 from app.modules.dashboards.schemas import DashboardOverview, ActionItemsResponse
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("/overview", response_model=DashboardOverview)
 def get_overview(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
     return service.get_overview(db, current_user.organization_id)
@@ -19,7 +19,7 @@ def get_overview(
 
 @router.get("/action-items", response_model=ActionItemsResponse)
 def get_action_items(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
     return service.get_action_items(db, current_user.organization_id)
@@ -27,7 +27,7 @@ def get_action_items(
 
 @router.get("/stats")
 def get_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(get_current_user),
 ):
     return service.get_stats(db, current_user.organization_id)
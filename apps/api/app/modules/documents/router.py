@@ -1,14 +1,13 @@
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, Query, UploadFile, File, Form
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, Query, Request, UploadFile, File, Form
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import get_current_user
 from app.db.models.user import User
 from app.modules.documents import service
-from app.modules.documents.schemas import DocumentResponse
+from app.modules.documents.schemas import DocumentResponse, PdfBatchRequest, PdfBatchStatus
 
 router = APIRouter()
 
@@ -83,6 +82,24 @@ def list_documents(
     return [_enrich_doc(d, db) for d in docs]
 
 
+@router.post("/generate-batch", response_model=PdfBatchStatus, status_code=202)
+def generate_pdf_batch(
+    data: PdfBatchRequest,
+    current_user=Depends(get_current_user),
+):
+    """Generate proposal/contract/invoice PDFs in the background; poll for progress."""
+    job_id = service.start_pdf_batch(data.kind, data.ids, current_user.organization_id, current_user.id)
+    return PdfBatchStatus(job_id=job_id, state="PENDING", total=len(data.ids))
+
+
+@router.get("/generate-batch/{job_id}", response_model=PdfBatchStatus)
+def get_pdf_batch_status(
+    job_id: str,
+    current_user=Depends(get_current_user),
+):
+    return service.get_pdf_batch_status(job_id, current_user.organization_id)
+
+
 @router.get("/{document_id}")
 def get_document(
     document_id: int,
@@ -96,14 +113,11 @@ def get_document(
 @router.get("/{document_id}/download")
 def download_document(
     document_id: int,
+    request: Request,
+    inline: bool = Query(False, description="Mostrar en el navegador en vez de descargar"),
     db: Session = Depends(get_db),
     current_user=Depends(get_current_user),
 ):
-    content, file_name = service.download_document(
-        db, document_id, current_user.organization_id
-    )
-    return Response(
-        content=content,
-        media_type="application/octet-stream",
-        headers={"Content-Disposition": f'attachment; filename="{file_name}"'},
+    return service.download_document(
+        db, document_id, current_user.organization_id, request.headers, inline=inline
     )
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class DocumentResponse(BaseModel):
@@ -23,3 +23,16 @@ class DocumentResponse(BaseModel):
     file_url: Optional[str] = None           # download URL
 
     model_config = {"from_attributes": True}
+
+
+class PdfBatchRequest(BaseModel):
+    kind: Literal["proposal", "contract", "invoice"]
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
+class PdfBatchStatus(BaseModel):
+    job_id: str
+    state: str  # PENDING | STARTED | PROGRESS | SUCCESS | FAILURE
+    done: int = 0
+    total: Optional[int] = None
+    result: Optional[dict] = None
@@ -1,12 +1,24 @@
-from typing import Optional, List
+import json
+import logging
+from typing import Mapping, Optional, List
 
 from fastapi import HTTPException, UploadFile
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
+from app.core import redis_client
+from app.core.blob_store import store_blob
+from app.core.config import settings
+from app.core.downloads import storage_file_response
+from app.core.file_validator import validate_upload_stream
 from app.core.storage import LocalStorage, get_storage
 from app.db.models.document import Document
 from app.db.enums import DocumentTypeEnum, DocumentStatusEnum
 
+logger = logging.getLogger(__name__)
+
+PDF_BATCH_KEY_PREFIX = "pdf_batch:"
+
 
 def upload_document(
     db: Session,
@@ -41,19 +53,19 @@ def upload_document(
     )
     next_version = (latest.version_int + 1) if latest else 1
 
-    # Read file content and store
-    content = file.file.read()
-    storage = get_storage()
-    subfolder = f"{entity_type}/{entity_id}"
-    storage_path = storage.upload(file.filename or "unnamed", content, subfolder=subfolder)
+    # One streamed pass validates type/size and hashes the upload; storage
+    # then writes it content-addressed (identical bytes only gain a reference).
+    upload = validate_upload_stream(file.file, file.filename)
+    blob = store_blob(db, upload.file, digest=upload.sha256, size=upload.size)
 
     document = Document(
         organization_id=org_id,
         entity_type=entity_type,
         entity_id=entity_id,
         doc_type=doc_type_enum,
-        file_name=file.filename or "unnamed",
-        storage_path=storage_path,
+        file_name=upload.original_filename,
+        storage_path=blob.storage_path,
+        content_hash=blob.digest,
         version_int=next_version,
         status=DocumentStatusEnum.DRAFT,
         uploaded_by_user_id=user_id,
@@ -64,15 +76,23 @@ def upload_document(
     return document
 
 
-def download_document(db: Session, document_id: int, org_id: int) -> tuple[bytes, str]:
-    """Return file bytes and filename for a document."""
+def download_document(
+    db: Session,
+    document_id: int,
+    org_id: int,
+    request_headers: Optional[Mapping[str, str]] = None,
+    inline: bool = False,
+) -> Response:
+    """Serve a document's file from storage (ETag / Range aware)."""
     doc = get_document(db, document_id, org_id)
-    storage = get_storage()
-    try:
-        content = storage.download(doc.storage_path)
-    except FileNotFoundError:
-        raise HTTPException(status_code=404, detail="Archivo no encontrado en el almacenamiento")
-    return content, doc.file_name
+    return storage_file_response(
+        get_storage(),
+        doc.storage_path,
+        doc.file_name,
+        request_headers,
+        content_hash=doc.content_hash,
+        inline=inline,
+    )
 
 
 def list_documents(
@@ -100,3 +120,70 @@ def get_document(db: Session, document_id: int, org_id: int) -> Document:
     if not doc:
         raise HTTPException(status_code=404, detail="Documento no encontrado")
     return doc
+
+
+def start_pdf_batch(kind: str, ids: list[int], org_id: int, user_id: int) -> str:
+    """Queue a batch PDF job; returns its id for progress polling."""
+    from app.tasks.document_tasks import generate_pdf_batch
+
+    job_id = generate_pdf_batch.delay(kind, ids, org_id, user_id).id
+    _record_pdf_batch(job_id, org_id, len(ids))
+    return job_id
+
+
+def _record_pdf_batch(job_id: str, org_id: int, total: int) -> None:
+    """Remember which organization queued ``job_id`` (before a worker reports on it)."""
+    r = redis_client.get_redis()
+    if r is None:
+        return
+    try:
+        r.set(
+            PDF_BATCH_KEY_PREFIX + job_id,
+            json.dumps({"org_id": org_id, "total": total}),
+            ex=settings.PDF_BATCH_JOB_TTL_SECONDS,
+        )
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
+
+
+def _pdf_batch_owner(job_id: str) -> Optional[dict]:
+    r = redis_client.get_redis()
+    if r is None:
+        return None
+    try:
+        raw = r.get(PDF_BATCH_KEY_PREFIX + job_id)
+    except Exception as exc:
+        redis_client.mark_redis_down(exc)
+        return None
+    try:
+        return json.loads(raw) if raw else None
+    except ValueError:
+        logger.warning("Unreadable PDF batch record for job %s", job_id)
+        return None
+
+
+def get_pdf_batch_status(job_id: str, org_id: int) -> dict:
+    """
+    Progress of a batch job queued by ``org_id``. Jobs are visible to every
+    user of the organization that queued them and 404 for anyone else.
+    """
+    from app.tasks.celery_app import celery_app
+
+    result = celery_app.AsyncResult(job_id)
+    info = result.info
+    # The owner is recorded at enqueue time; without it (Redis down) fall back
+    # to the org the task publishes in every state it reports. Anything else
+    # (unknown ids, other tasks' results, raw failures) is not this org's to read
+    owner = _pdf_batch_owner(job_id)
+    reported = info if isinstance(info, dict) and "org_id" in info else None
+    owner_org = (owner or reported or {}).get("org_id")
+    if owner_org != org_id or (reported is not None and reported["org_id"] != org_id):
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+
+    if reported is None:
+        # Queued (PENDING), picked up (STARTED) or lost by the worker: no progress yet
+        return {"job_id": job_id, "state": result.state, "done": 0, "total": owner.get("total")}
+    status = {"job_id": job_id, "state": result.state, "done": reported.get("done", 0), "total": reported.get("total")}
+    if result.state == "SUCCESS":
+        status.update(done=reported.get("total", 0), result=reported)
+    return status
@@ -1,8 +1,9 @@
 """
 Notifications service with WebSocket support.
 
-Uses Redis PubSub for broadcasting notifications from Celery workers
-to connected WebSocket clients.
+Live delivery goes through ``app.core.notification_bus``: committed
+notifications are published to Redis Pub/Sub and every API worker fans
+them out to its own sockets.
 """
 
 from __future__ import annotations
@@ -11,15 +12,20 @@ import asyncio
 import json
 import logging
 from datetime import datetime, timezone
+from typing import Iterable
 
 from fastapi import WebSocket, WebSocketDisconnect
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core import unread_counters
+from app.core.config import settings
+from app.core.metrics import WEBSOCKET_CONNECTIONS
+from app.core.notification_bus import Subscriber, hub, notification_payload
 
 logger = logging.getLogger(__name__)
 
-# ── In-memory WebSocket connections (per-worker) ─────────────────────────────
-# In production, use Redis PubSub for cross-worker broadcasting.
-_connections: dict[int, list[WebSocket]] = {}  # user_id → [ws, ws, ...]
+HEARTBEAT_SECONDS = 30
 
 
 def list_notifications(
@@ -63,8 +69,10 @@ def mark_read(db: Session, user_id: int, notification_id: int) -> dict:
     if not n:
         from fastapi import HTTPException
         raise HTTPException(status_code=404, detail="Notificación no encontrada")
-    n.read_at = datetime.now(timezone.utc)
-    db.commit()
+    if n.read_at is None:
+        n.read_at = datetime.now(timezone.utc)
+        db.commit()
+        unread_counters.adjust({user_id: -1})
     return {"id": n.id, "status": "read"}
 
 
@@ -78,19 +86,23 @@ def mark_all_read(db: Session, user_id: int, org_id: int) -> dict:
         Notification.read_at.is_(None),
     ).update({"read_at": now})
     db.commit()
+    unread_counters.reset(user_id)
     return {"marked_read": updated}
 
 
 def get_unread_count(db: Session, user_id: int, org_id: int) -> dict:
+    """Unread badge count — served from the Redis counter, COUNT(*) on a miss."""
     from app.db.models.notification import Notification
     from sqlalchemy import func
 
-    count = db.query(func.count(Notification.id)).filter(
-        Notification.user_id == user_id,
-        Notification.organization_id == org_id,
-        Notification.read_at.is_(None),
-    ).scalar() or 0
-    return {"unread_count": count}
+    def load() -> int:
+        return db.query(func.count(Notification.id)).filter(
+            Notification.user_id == user_id,
+            Notification.organization_id == org_id,
+            Notification.read_at.is_(None),
+        ).scalar() or 0
+
+    return {"unread_count": unread_counters.get_unread(user_id, load)}
 
 
 def create_notification(
@@ -116,30 +128,106 @@ def create_notification(
         entity_id=entity_id,
     )
     db.add(n)
-    db.commit()
-    db.refresh(n)
-
-    # Try Redis PubSub broadcast
-    try:
-        _broadcast_via_redis(user_id, {
-            "id": n.id, "type": type_, "title": title, "message": message,
-            "entity_type": entity_type, "entity_id": entity_id,
-        })
-    except Exception as exc:
-        logger.debug("Redis broadcast failed (expected in non-async context): %s", exc)
+    db.commit()  # published to live sockets by the notification bus on commit
 
     return {"id": n.id, "status": "created"}
 
 
-def _broadcast_via_redis(user_id: int, payload: dict):
-    """Publish notification to Redis for WebSocket delivery."""
+def create_notifications_bulk(
+    db: Session,
+    org_id: int,
+    user_ids: Iterable[int],
+    type_: str,
+    title: str,
+    message: str,
+    entity_type: str | None = None,
+    entity_id: int | None = None,
+    commit: bool = True,
+) -> list[int]:
+    """
+    Fan one notification out to many users in a single batched INSERT.
+
+    The rows are flushed together (one multi-row ``INSERT … RETURNING``);
+    live delivery and unread counters follow on commit. Pass
+    ``commit=False`` to make them part of the caller's transaction.
+    """
+    from app.db.models.notification import Notification
+
+    rows = [
+        Notification(
+            organization_id=org_id,
+            user_id=user_id,
+            type=type_,
+            title=title,
+            message=message,
+            entity_type=entity_type,
+            entity_id=entity_id,
+        )
+        for user_id in dict.fromkeys(user_ids)
+    ]
+    for n in rows:
+        db.add(n)
+    db.flush()
+    ids = [n.id for n in rows]
+    if commit:
+        db.commit()
+    return ids
+
+
+def _missed_notifications(user_id: int, last_id: int) -> list[dict]:
+    """Notifications created after ``last_id`` (catch-up on reconnect)."""
+    from app.core.database import SessionLocal
+    from app.db.models.notification import Notification
+
+    db = SessionLocal()
     try:
-        import redis
-        from app.core.config import settings
-        r = redis.Redis.from_url(settings.REDIS_URL)
-        r.publish(f"notifications:{user_id}", json.dumps(payload))
-    except Exception:
-        pass  # Best effort
+        rows = (
+            db.query(Notification)
+            .filter(Notification.user_id == user_id, Notification.id > last_id)
+            .order_by(Notification.id)
+            .limit(settings.NOTIFICATION_CATCHUP_LIMIT)
+            .all()
+        )
+        return [notification_payload(n) for n in rows]
+    finally:
+        db.close()
+
+
+def _parse_handshake(text: str) -> tuple[str, int | None]:
+    """First message: a bare JWT or ``{"token": ..., "last_id": N}``."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return text, None
+    if not isinstance(data, dict):
+        return text, None
+    last_id = data.get("last_id")
+    return str(data.get("token", "")), int(last_id) if last_id is not None else None
+
+
+async def _send_live(websocket: WebSocket, sub: Subscriber, last_sent: int) -> None:
+    while True:
+        message = await sub.queue.get()
+        if message is Subscriber.OVERFLOW:
+            await websocket.close(code=1013, reason="Cliente lento; reconecte con last_id")
+            return
+        try:
+            msg_id = json.loads(message).get("id")
+        except (ValueError, AttributeError):
+            msg_id = None
+        if msg_id is not None and msg_id <= last_sent:
+            continue  # already delivered by the catch-up
+        await websocket.send_text(message)
+
+
+async def _receive(websocket: WebSocket, sub: Subscriber) -> None:
+    while True:
+        try:
+            data = await asyncio.wait_for(websocket.receive_text(), timeout=HEARTBEAT_SECONDS)
+            if data == "ping":
+                sub.offer("pong")
+        except asyncio.TimeoutError:
+            sub.offer(json.dumps({"type": "heartbeat"}))
 
 
 async def handle_websocket(websocket: WebSocket):
@@ -150,7 +238,8 @@ async def handle_websocket(websocket: WebSocket):
     try:
         token_msg = await asyncio.wait_for(websocket.receive_text(), timeout=10)
         from app.core.security import decode_token
-        payload = decode_token(token_msg)
+        token, last_id = _parse_handshake(token_msg)
+        payload = decode_token(token)
         user_id = int(payload.get("sub", 0))
         if not user_id:
             await websocket.close(code=4001, reason="Invalid token")
@@ -159,47 +248,31 @@ async def handle_websocket(websocket: WebSocket):
         await websocket.close(code=4001, reason="Authentication timeout")
         return
 
-    # Register connection
-    if user_id not in _connections:
-        _connections[user_id] = []
-    _connections[user_id].append(websocket)
-
+    sub = hub.subscribe(user_id)
+    WEBSOCKET_CONNECTIONS.labels(channel="notifications").inc()
     logger.info("WebSocket connected for user %d", user_id)
 
+    tasks: list[asyncio.Task] = []
     try:
-        # Try Redis PubSub for cross-worker delivery
-        try:
-            import redis.asyncio as aioredis
-            from app.core.config import settings
-            r = aioredis.from_url(settings.REDIS_URL)
-            pubsub = r.pubsub()
-            await pubsub.subscribe(f"notifications:{user_id}")
-
-            while True:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message and message["type"] == "message":
-                    await websocket.send_text(message["data"].decode())
-                # Also check if client sent anything (ping/pong)
-                try:
-                    data = await asyncio.wait_for(websocket.receive_text(), timeout=0.1)
-                    if data == "ping":
-                        await websocket.send_text("pong")
-                except asyncio.TimeoutError:
-                    pass
-        except ImportError:
-            # No async redis, use simple keepalive loop
-            while True:
-                try:
-                    data = await asyncio.wait_for(websocket.receive_text(), timeout=30)
-                    if data == "ping":
-                        await websocket.send_text("pong")
-                except asyncio.TimeoutError:
-                    await websocket.send_text(json.dumps({"type": "heartbeat"}))
-
+        # Subscribed before the catch-up query, so nothing falls in between;
+        # duplicates are skipped by id.
+        last_sent = 0
+        if last_id is not None:
+            for payload in await run_in_threadpool(_missed_notifications, user_id, last_id):
+                await websocket.send_text(json.dumps(payload))
+                last_sent = payload["id"]
+
+        tasks = [
+            asyncio.create_task(_send_live(websocket, sub, last_sent)),
+            asyncio.create_task(_receive(websocket, sub)),
+        ]
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected for user %d", user_id)
     finally:
-        if user_id in _connections:
-            _connections[user_id] = [ws for ws in _connections[user_id] if ws != websocket]
-            if not _connections[user_id]:
-                del _connections[user_id]
+        for task in tasks:
+            task.cancel()
+        hub.unsubscribe(sub)
+        WEBSOCKET_CONNECTIONS.labels(channel="notifications").dec()
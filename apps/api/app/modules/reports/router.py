@@ -8,7 +8,7 @@ from typing import Optional
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.permissions import Action, check_permission
 from app.modules.reports import service
 
@@ -21,7 +21,7 @@ def report_productivity(
     end_date: Optional[date] = Query(None),
     lawyer_id: Optional[int] = Query(None),
     user=Depends(check_permission("reports", Action.READ)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.get_productivity_report(db, user.organization_id, start_date, end_date, lawyer_id)
 
@@ -31,7 +31,7 @@ def report_financial(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     user=Depends(check_permission("reports", Action.READ)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.get_financial_report(db, user.organization_id, start_date, end_date)
 
@@ -41,7 +41,7 @@ def report_sla_compliance(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     user=Depends(check_permission("reports", Action.READ)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.get_sla_compliance_report(db, user.organization_id, start_date, end_date)
 
@@ -51,7 +51,7 @@ def report_lead_conversion(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     user=Depends(check_permission("reports", Action.READ)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.get_lead_conversion_report(db, user.organization_id, start_date, end_date)
 
@@ -59,7 +59,7 @@ def report_lead_conversion(
 @router.get("/collections-aging")
 def report_collections_aging(
     user=Depends(check_permission("reports", Action.READ)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.get_collections_aging_report(db, user.organization_id)
 
@@ -71,6 +71,6 @@ def export_report(
     start_date: Optional[date] = Query(None),
     end_date: Optional[date] = Query(None),
     user=Depends(check_permission("reports", Action.EXPORT)),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     return service.export_report(db, user.organization_id, report_type, format, start_date, end_date)
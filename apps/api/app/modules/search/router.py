@@ -7,7 +7,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.core.security import get_current_user
 from app.modules.search import service
 
@@ -20,7 +20,7 @@ def global_search(
     type: str = Query("all", pattern="^(all|clients|matters|leads|contracts|documents)$"),
     limit: int = Query(20, ge=1, le=100),
     user=Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     """
     Global search across clients, matters, leads, contracts, and documents.
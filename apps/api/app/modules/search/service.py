@@ -74,6 +74,36 @@ def _search_model(db: Session, model, org_id: int, fields: list[str], ts_query:
     return results
 
 
+def _search_document_text(db: Session, org_id: int, ts_query: str, limit: int) -> list[dict]:
+    """Match documents by extracted content (see ``app.core.document_indexing``)."""
+    from app.db.models.document import Document
+    from app.db.models.document_text import DocumentTextChunk
+
+    if not ts_query:
+        return []
+
+    query = db.query(DocumentTextChunk.document_id).filter(DocumentTextChunk.organization_id == org_id)
+    if db.get_bind().dialect.name == "postgresql":
+        # Served by the GIN index ix_document_text_chunks_fts
+        query = query.filter(
+            func.to_tsvector("spanish", DocumentTextChunk.text).op("@@")(
+                func.to_tsquery("spanish", ts_query)
+            )
+        )
+    else:
+        for term in ts_query.replace(":*", "").replace(" & ", " ").split():
+            query = query.filter(DocumentTextChunk.text.ilike(f"%{term}%"))
+    doc_ids = [row.document_id for row in query.distinct().limit(limit).all()]
+    if not doc_ids:
+        return []
+
+    docs = db.query(Document).filter(Document.id.in_(doc_ids), Document.organization_id == org_id).all()
+    return [
+        {"id": d.id, "type": Document.__tablename__, "title": d.file_name, "subtitle": "Coincidencia en el contenido"}
+        for d in docs
+    ]
+
+
 def global_search(db: Session, org_id: int, q: str, search_type: str, limit: int) -> dict:
     """Execute global search across multiple entity types."""
     ts_query = _sanitize_query(q)
@@ -85,7 +115,7 @@ def global_search(db: Session, org_id: int, q: str, search_type: str, limit: int
         "matters": ("app.db.models.matter", "Matter", ["title", "rol", "description"]),
         "leads": ("app.db.models.lead", "Lead", ["name", "email", "phone", "company"]),
         "contracts": ("app.db.models.contract", "Contract", ["title", "description"]),
-        "documents": ("app.db.models.document", "Document", ["original_name", "description"]),
+        "documents": ("app.db.models.document", "Document", ["file_name"]),
     }
 
     types_to_search = [search_type] if search_type != "all" else list(search_configs.keys())
@@ -100,6 +130,13 @@ def global_search(db: Session, org_id: int, q: str, search_type: str, limit: int
             mod = importlib.import_module(module_path)
             model_class = getattr(mod, class_name)
             type_results = _search_model(db, model_class, org_id, fields, ts_query, per_type_limit)
+            if stype == "documents" and len(type_results) < per_type_limit:
+                seen = {r["id"] for r in type_results}
+                type_results.extend(
+                    r for r in _search_document_text(db, org_id, ts_query, per_type_limit)
+                    if r["id"] not in seen
+                )
+                type_results = type_results[:per_type_limit]
             results.extend(type_results)
         except Exception as exc:
             logger.warning("Search failed for %s: %s", stype, exc)
@@ -12,6 +12,7 @@ from app.modules.templates.schemas import (
     TemplateResponse,
     RenderRequest,
     RenderResponse,
+    BulkRenderRequest,
 )
 
 router = APIRouter()
@@ -82,3 +83,21 @@ def render_template(
         db, template_id, data.variables, current_user.organization_id
     )
     return RenderResponse(rendered_text=rendered)
+
+
+@router.post("/{template_id}/render-bulk")
+def render_template_bulk(
+    template_id: int,
+    data: BulkRenderRequest,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    """Mail merge: one ZIP (a file per variable set) or a single merged PDF."""
+    return service.render_bulk(
+        db,
+        template_id,
+        data.variables_list,
+        current_user.organization_id,
+        output_format=data.format,
+        file_name_variable=data.file_name_variable,
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TemplateCreate(BaseModel):
@@ -39,3 +39,9 @@ class RenderRequest(BaseModel):
 
 class RenderResponse(BaseModel):
     rendered_text: str
+
+
+class BulkRenderRequest(BaseModel):
+    variables_list: List[dict] = Field(..., min_length=1, max_length=5000)
+    format: Literal["zip", "pdf"] = "zip"
+    file_name_variable: Optional[str] = None  # Variable used to name each file in the ZIP
@@ -1,12 +1,16 @@
-from typing import Optional, List
+from typing import BinaryIO, Iterator, Optional, List
 
 import re
+import tempfile
 
 from fastapi import HTTPException
+from fastapi.responses import Response, StreamingResponse
 from jinja2 import TemplateSyntaxError, UndefinedError
-from jinja2.sandbox import SandboxedEnvironment, SecurityError
+from jinja2.sandbox import SecurityError
 from sqlalchemy.orm import Session
 
+from app.core.downloads import content_disposition, zip_stream
+from app.core.template_engine import get_compiled
 from app.db.models.template import Template
 from app.db.enums import TemplateTypeEnum
 from app.modules.templates.schemas import TemplateCreate, TemplateUpdate
@@ -93,31 +97,31 @@ def delete_template(db: Session, template_id: int, org_id: int) -> None:
     db.commit()
 
 
-_sandbox_env = SandboxedEnvironment(autoescape=True)
+_VARIABLE_NAME = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
+_UNSAFE_FILE_CHARS = re.compile(r"[^\w\-.]+")
+_PDF_SPOOL_MAX_MEMORY = 8 * 1024 * 1024  # Merged PDFs beyond this spill to a temp file
+_PDF_CHUNK_SIZE = 64 * 1024
 
 
-def render_template(
-    db: Session,
-    template_id: int,
-    variables: dict,
-    org_id: int,
-) -> str:
-    """Render a template's content_text using sandboxed Jinja2 with the provided variables."""
-    template = get_template(db, template_id, org_id)
-
-    # Validate variable keys are safe identifiers
+def _validate_variables(variables: dict) -> None:
     for key in variables:
-        if not re.match(r'^[a-zA-Z_][a-zA-Z0-9_]*$', key):
+        if not _VARIABLE_NAME.match(key):
             raise HTTPException(status_code=400, detail=f"Nombre de variable inválido: {key}")
 
+
+def _compile(template: Template):
     try:
-        jinja_tmpl = _sandbox_env.from_string(template.content_text)
-        rendered = jinja_tmpl.render(**variables)
+        return get_compiled(template)
     except TemplateSyntaxError as e:
         raise HTTPException(
             status_code=400,
             detail=f"Error de sintaxis en la plantilla: {str(e)}",
         )
+
+
+def _render(compiled, variables: dict) -> str:
+    try:
+        return compiled.render(**variables)
     except UndefinedError as e:
         raise HTTPException(
             status_code=400,
@@ -129,4 +133,99 @@ def render_template(
             detail=f"Operación no permitida en plantilla: {str(e)}",
         )
 
-    return rendered
+
+def render_template(
+    db: Session,
+    template_id: int,
+    variables: dict,
+    org_id: int,
+) -> str:
+    """Render a template's content_text using sandboxed Jinja2 with the provided variables."""
+    template = get_template(db, template_id, org_id)
+
+    # Validate variable keys are safe identifiers
+    _validate_variables(variables)
+    return _render(_compile(template), variables)
+
+
+def render_bulk(
+    db: Session,
+    template_id: int,
+    variables_list: List[dict],
+    org_id: int,
+    output_format: str = "zip",
+    file_name_variable: Optional[str] = None,
+) -> Response:
+    """
+    Mail merge: render one template against many variable sets.
+
+    ``zip`` streams one text file per row (rows that fail to render are
+    listed in ``errores.txt``); ``pdf`` merges every letter into a single
+    PDF, one per page, written page by page to a spooled temp file and
+    streamed from there. The template is compiled once for the whole batch.
+    """
+    template = get_template(db, template_id, org_id)
+    for variables in variables_list:
+        _validate_variables(variables)
+    compiled = _compile(template)
+    base_name = _UNSAFE_FILE_CHARS.sub("_", template.name).strip("_") or "plantilla"
+
+    if output_format == "pdf":
+        from app.core.pdf_generator import write_simple_pdf
+
+        def blocks():
+            for i, variables in enumerate(variables_list, start=1):
+                try:
+                    text = _render(compiled, variables)
+                except HTTPException as e:
+                    raise HTTPException(status_code=400, detail=f"Fila {i}: {e.detail}")
+                if i > 1:
+                    yield {"type": "page_break"}
+                yield {"type": "paragraph", "text": text}
+
+        # Rendered before the response starts, so a bad row is still a 400
+        spool = tempfile.SpooledTemporaryFile(max_size=_PDF_SPOOL_MAX_MEMORY)
+        try:
+            write_simple_pdf(spool, template.name, blocks())
+        except BaseException:
+            spool.close()
+            raise
+        size = spool.tell()
+        spool.seek(0)
+        return StreamingResponse(
+            _iter_spool(spool),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": content_disposition(f"{base_name}.pdf"),
+                "Content-Length": str(size),
+            },
+        )
+
+    def entries():
+        errors = []
+        for i, variables in enumerate(variables_list, start=1):
+            label = str(variables.get(file_name_variable, "")) if file_name_variable else ""
+            label = _UNSAFE_FILE_CHARS.sub("_", label)[:80].strip("_")
+            try:
+                text = _render(compiled, variables)
+            except HTTPException as e:
+                errors.append(f"Fila {i}: {e.detail}")
+                continue
+            yield f"{i:05d}_{label or base_name}.txt", text.encode("utf-8")
+        if errors:
+            yield "errores.txt", "\n".join(errors).encode("utf-8")
+
+    return StreamingResponse(
+        zip_stream(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"{base_name}.zip")},
+    )
+
+
+def _iter_spool(spool: BinaryIO) -> Iterator[bytes]:
+    """Stream a spooled file in chunks and close it once sent."""
+    try:
+        while chunk := spool.read(_PDF_CHUNK_SIZE):
+            yield chunk
+    finally:
+        spool.close()
@@ -8,6 +8,7 @@ from app.core.database import SessionLocal
 logger = logging.getLogger(__name__)
 
 AGENT_ROLE = "agente_comercial"  # Admin TI uses this role
+HALF_OPEN_AFTER = 0.75  # Share of the cool-down a circuit stays open before the check may end it
 
 
 @celery_app.task(name="app.tasks.agent_health_tasks.agent_health_check")
@@ -24,6 +25,21 @@ def agent_health_check():
             AIAgent.is_active.is_(True),
         ).distinct().all()
 
+        # Half-open circuits near the end of their cool-down so the next call
+        # probes the agent instead of waiting for the next check. The check
+        # runs more often than the cool-down lasts, so earlier would cut it short
+        from app.core.circuit_breaker import OPEN
+        from app.core.escalation import agent_breaker
+
+        reopened = []
+        cut_short = agent_breaker.cooldown_seconds * (1 - HALF_OPEN_AFTER)
+        for (agent_id,) in db.query(AIAgent.id).filter(AIAgent.is_active.is_(True)).all():
+            if agent_breaker.state(agent_id) == OPEN and agent_breaker.open_remaining(agent_id) <= cut_short:
+                agent_breaker.half_open(agent_id)
+                reopened.append(agent_id)
+        if reopened:
+            logger.info("Health check half-opened agent circuits: %s", reopened)
+
         results = []
         for (org_id,) in org_ids:
             health_report = agent_draft(
@@ -38,7 +54,7 @@ def agent_health_check():
             results.append({"org_id": org_id, "report": health_report[:200]})
 
         db.commit()
-        return {"checks_run": len(results), "results": results}
+        return {"checks_run": len(results), "results": results, "circuits_half_opened": reopened}
     except Exception as exc:
         logger.exception("Agent health check failed")
         return {"error": str(exc)}
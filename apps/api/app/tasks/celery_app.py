@@ -1,5 +1,8 @@
 from celery import Celery
 from app.core.config import settings
+from app.core.metrics import install_celery_metrics
+from app.core.notification_bus import install_notification_publisher
+from app.core.query_profiler import install_celery_query_profiler
 
 celery_app = Celery(
     "logan_virtual",
@@ -61,6 +64,32 @@ celery_app.conf.beat_schedule["agent-health-check-5min"] = {
     "schedule": 300.0,  # every 5 min
 }
 
+# Purge unreferenced content-addressed blobs daily
+celery_app.conf.beat_schedule["purge-unreferenced-blobs-daily"] = {
+    "task": "app.tasks.storage_tasks.purge_unreferenced_blobs",
+    "schedule": crontab(hour=3, minute=30),
+}
+
+# Extract + index text of newly uploaded document versions
+celery_app.conf.beat_schedule["index-pending-documents-2min"] = {
+    "task": "app.tasks.document_tasks.index_pending_documents",
+    "schedule": 120.0,  # every 2 min
+}
+
+# Incrementally refresh the per-organization knowledge (BM25) index
+celery_app.conf.beat_schedule["sync-knowledge-index-5min"] = {
+    "task": "app.tasks.document_tasks.sync_knowledge_index",
+    "schedule": 300.0,  # every 5 min
+}
+
+# Task duration/failure metrics (run workers with PROMETHEUS_MULTIPROC_DIR set)
+# and per-task query profiling (N+1 warnings)
+install_celery_metrics(celery_app)
+install_celery_query_profiler(celery_app)
+
+# Notifications created by tasks reach users' open sockets via Redis
+install_notification_publisher()
+
 # Explicit imports so the worker registers all tasks
 import app.tasks.proposal_tasks  # noqa: F401
 import app.tasks.sla_tasks  # noqa: F401
@@ -69,3 +98,5 @@ import app.tasks.notary_tasks  # noqa: F401
 import app.tasks.digest_tasks  # noqa: F401
 import app.tasks.agent_bus_tasks  # noqa: F401
 import app.tasks.agent_health_tasks  # noqa: F401
+import app.tasks.storage_tasks  # noqa: F401
+import app.tasks.document_tasks  # noqa: F401
@@ -53,10 +53,11 @@ def generate_collection_reminders():
                 fallback_desc = f"Contactar cliente. Monto: ${invoice.amount:,} CLP. Vencimiento: {invoice.due_date}"
                 ai_desc = agent_draft(
                     db, invoice.organization_id, AGENT_ROLE,
-                    f"Redacta un mensaje breve y profesional de cobranza preventiva para un cliente. "
-                    f"La factura #{invoice.id} por ${invoice.amount:,} CLP vence en 5 días ({invoice.due_date}). "
-                    f"Tono cordial pero firme. Máximo 3 líneas.",
+                    "Redacta un mensaje breve y profesional de cobranza preventiva para un cliente. "
+                    "La factura #{factura} por {monto} CLP vence en 5 días ({vencimiento}). "
+                    "Tono cordial pero firme. Máximo 3 líneas.",
                     fallback_desc, task_type="collection_reminder",
+                    fill={"factura": invoice.id, "monto": f"${invoice.amount:,}", "vencimiento": invoice.due_date},
                 )
 
                 task = Task(
@@ -120,10 +121,11 @@ def generate_collection_reminders():
             invoice.updated_at = now
             ai_escalation = agent_draft(
                 db, invoice.organization_id, AGENT_ROLE,
-                f"La factura #{invoice.id} por ${invoice.amount:,} CLP esta morosa (vencio el {invoice.due_date}). "
-                f"Recomienda una estrategia de escalamiento en 2 lineas.",
+                "La factura #{factura} por {monto} CLP esta morosa (vencio el {vencimiento}). "
+                "Recomienda una estrategia de escalamiento en 2 lineas.",
                 f"Factura #{invoice.id} marcada como morosa. Requiere escalamiento.",
                 task_type="collection_escalation",
+                fill={"factura": invoice.id, "monto": f"${invoice.amount:,}", "vencimiento": invoice.due_date},
             )
             db.add(AuditLog(
                 organization_id=invoice.organization_id,
@@ -18,10 +18,12 @@ AGENT_ROLE = "secretaria"
 
 @celery_app.task(name="app.tasks.digest_tasks.daily_digest")
 def daily_digest():
-    """Generate daily digest with AI summary and send via email to managers."""
+    """Generate a daily digest per organization with AI summary and send it to its managers."""
     db = SessionLocal()
     try:
         from app.core.agent_dispatch import agent_draft, get_agent_id
+        from app.core.email import send_email
+        from app.modules.notifications.service import create_notifications_bulk
 
         now = datetime.now(timezone.utc)
 
@@ -54,44 +56,55 @@ def daily_digest():
             .all()
         )
 
-        total_overdue_amount = sum(inv.amount for inv in overdue_invoices)
-
-        context_lines = [
-            f"Fecha: {now.strftime('%d/%m/%Y')}",
-            f"Tareas vencidas: {len(overdue_tasks)}",
-            f"Facturas morosas: {len(overdue_invoices)} por un total de ${total_overdue_amount:,} CLP",
-            f"Emails con SLA en riesgo/incumplido: {len(sla_at_risk)}",
-        ]
-        context = "\n".join(context_lines)
-
-        fallback_summary = (
-            f"Resumen diario Logan Virtual - {now.strftime('%d/%m/%Y')}\n\n"
-            f"{context}\n\n"
-            f"Se requiere atencion a los items pendientes."
+        managers = (
+            db.query(User)
+            .filter(User.role == "gerente_legal", User.active.is_(True))
+            .all()
         )
 
-        # Use all orgs - get first org_id from any of the collected data
-        org_ids = set()
+        # Every figure and summary stays within its own organization
+        tasks_by_org, invoices_by_org, tickets_by_org, managers_by_org = (
+            defaultdict(list), defaultdict(list), defaultdict(list), defaultdict(list),
+        )
         for t in overdue_tasks:
-            org_ids.add(t.organization_id)
+            tasks_by_org[t.organization_id].append(t)
         for inv in overdue_invoices:
-            org_ids.add(inv.organization_id)
+            invoices_by_org[inv.organization_id].append(inv)
         for ticket in sla_at_risk:
-            org_ids.add(ticket.organization_id)
-        if not org_ids:
-            org_ids = {1}  # Default org
-
-        first_org = next(iter(org_ids))
-        ai_summary = agent_draft(
-            db, first_org, AGENT_ROLE,
-            f"Genera un resumen ejecutivo breve (5-8 lineas) del estado del estudio juridico hoy. "
-            f"Datos:\n{context}\n\n"
-            f"Incluye: situacion general, prioridades del dia, y recomendaciones concretas. "
-            f"Tono profesional, directo, en espanol chileno.",
-            fallback_summary, task_type="daily_digest",
-        )
+            tickets_by_org[ticket.organization_id].append(ticket)
+        for manager in managers:
+            managers_by_org[manager.organization_id].append(manager)
+
+        org_ids = set(tasks_by_org) | set(invoices_by_org) | set(tickets_by_org) | set(managers_by_org)
+        summaries = {}
+        for org_id in sorted(org_ids):
+            org_tasks, org_invoices = tasks_by_org[org_id], invoices_by_org[org_id]
+            total_overdue_amount = sum(inv.amount for inv in org_invoices)
+
+            context_lines = [
+                f"Fecha: {now.strftime('%d/%m/%Y')}",
+                f"Tareas vencidas: {len(org_tasks)}",
+                f"Facturas morosas: {len(org_invoices)} por un total de ${total_overdue_amount:,} CLP",
+                f"Emails con SLA en riesgo/incumplido: {len(tickets_by_org[org_id])}",
+            ]
+            context = "\n".join(context_lines)
+
+            fallback_summary = (
+                f"Resumen diario Logan Virtual - {now.strftime('%d/%m/%Y')}\n\n"
+                f"{context}\n\n"
+                f"Se requiere atencion a los items pendientes."
+            )
+
+            ai_summary = agent_draft(
+                db, org_id, AGENT_ROLE,
+                f"Genera un resumen ejecutivo breve (5-8 lineas) del estado del estudio juridico hoy. "
+                f"Datos:\n{context}\n\n"
+                f"Incluye: situacion general, prioridades del dia, y recomendaciones concretas. "
+                f"Tono profesional, directo, en espanol chileno.",
+                fallback_summary, task_type="daily_digest",
+            )
+            summaries[org_id] = ai_summary
 
-        for org_id in org_ids:
             db.add(AuditLog(
                 organization_id=org_id,
                 actor_user_id=None,
@@ -101,36 +114,38 @@ def daily_digest():
                 entity_id=None,
                 after_json={
                     "agent": "Secretaria",
-                    "detail": f"Resumen diario: {len(overdue_tasks)} tarea(s) vencida(s), "
-                              f"{len(overdue_invoices)} factura(s) morosa(s)",
+                    "detail": f"Resumen diario: {len(org_tasks)} tarea(s) vencida(s), "
+                              f"{len(org_invoices)} factura(s) morosa(s)",
                     "detail_long": ai_summary,
                     "status": "completed",
-                    "type": "warning" if overdue_tasks else "info",
+                    "type": "warning" if org_tasks else "info",
                 },
             ))
 
-        db.commit()
-
-        # Send email to managers
-        from app.core.email import send_email
-
-        managers = (
-            db.query(User)
-            .filter(User.role == "gerente_legal", User.active.is_(True))
-            .all()
-        )
+            # In-app notification for the org's managers, one batched INSERT
+            if managers_by_org[org_id]:
+                create_notifications_bulk(
+                    db, org_id, [m.id for m in managers_by_org[org_id]],
+                    type_="daily_digest",
+                    title=f"Resumen diario {now.strftime('%d/%m/%Y')}",
+                    message=ai_summary,
+                    commit=False,
+                )
 
-        html_body = (
-            f"<h2>Resumen Diario - Logan Virtual</h2>"
-            f"<p><strong>{now.strftime('%d de %B de %Y')}</strong></p>"
-            f"<pre style='font-family: sans-serif; line-height: 1.6;'>{ai_summary}</pre>"
-            f"<hr>"
-            f"<p style='color: #888; font-size: 12px;'>"
-            f"Generado por la agente Secretaria de Logan Virtual.</p>"
-        )
+        db.commit()
 
+        # Send each manager their own organization's digest
         emails_sent = 0
         for manager in managers:
+            ai_summary = summaries[manager.organization_id]
+            html_body = (
+                f"<h2>Resumen Diario - Logan Virtual</h2>"
+                f"<p><strong>{now.strftime('%d de %B de %Y')}</strong></p>"
+                f"<pre style='font-family: sans-serif; line-height: 1.6;'>{ai_summary}</pre>"
+                f"<hr>"
+                f"<p style='color: #888; font-size: 12px;'>"
+                f"Generado por la agente Secretaria de Logan Virtual.</p>"
+            )
             try:
                 sent = send_email(
                     to=manager.email,
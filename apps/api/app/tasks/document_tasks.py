@@ -0,0 +1,80 @@
+import logging
+
+from app.tasks.celery_app import celery_app
+from app.core.config import settings
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.document_tasks.index_pending_documents")
+def index_pending_documents():
+    """Extract and index text of documents uploaded since the last run."""
+    db = SessionLocal()
+    try:
+        from app.core.document_indexing import index_pending
+
+        return index_pending(db, limit=settings.DOCUMENT_INDEX_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.document_tasks.index_document")
+def index_document(document_id: int):
+    """(Re)index a single document on demand."""
+    db = SessionLocal()
+    try:
+        from app.core.document_indexing import index_documents
+        from app.db.models.document import Document
+
+        doc = db.query(Document).filter(Document.id == document_id).first()
+        if doc is None or not doc.content_hash:
+            return {"indexed": 0}
+        return index_documents(db, [doc])
+    finally:
+        db.close()
+
+
+@celery_app.task(name="app.tasks.document_tasks.sync_knowledge_index")
+def sync_knowledge_index():
+    """Incrementally update every organization's knowledge index shard."""
+    db = SessionLocal()
+    try:
+        from app.core.knowledge_index import sync_organization
+        from app.db.models import Organization
+
+        results = {}
+        for (org_id,) in db.query(Organization.id).all():
+            try:
+                results[org_id] = sync_organization(db, org_id)
+            except Exception as exc:
+                logger.error("Knowledge index sync failed for org %s: %s", org_id, exc)
+        return results
+    finally:
+        db.close()
+
+
+@celery_app.task(bind=True, name="app.tasks.document_tasks.generate_pdf_batch")
+def generate_pdf_batch(self, kind: str, ids: list[int], org_id: int, user_id: int | None = None):
+    """
+    Render a batch of PDFs, publishing progress as PROGRESS task state.
+
+    The progress meta and the result always carry ``org_id`` (the status
+    endpoint hides anything else), so failures are returned, not raised.
+    """
+    db = SessionLocal()
+    try:
+        from app.core.pdf_service import generate_batch
+
+        def progress(done: int, total: int):
+            self.update_state(state="PROGRESS", meta={"org_id": org_id, "done": done, "total": total})
+
+        progress(0, len(ids))
+        try:
+            result = generate_batch(db, kind, ids, org_id, user_id=user_id, progress=progress)
+        except Exception as exc:
+            logger.exception("PDF batch %s failed for org %s", kind, org_id)
+            return {"org_id": org_id, "total": len(ids), "error": str(exc)}
+        return {"org_id": org_id, **result}
+    finally:
+        db.close()
@@ -38,10 +38,12 @@ def generate_notary_contact_tasks():
             fallback_script = f"Intentar contacto con cliente para documento notarial. Horario programado."
             ai_script = agent_draft(
                 db, doc.organization_id, AGENT_ROLE,
+                # doc_type shapes the script, so it stays part of the cache key
                 f"Genera un guion breve (3-4 lineas) para llamar a un cliente sobre un documento notarial "
-                f"(documento #{doc.id}, tipo: {doc.doc_type}). "
+                f"(documento #{{documento}}, tipo: {doc.doc_type}). "
                 f"El objetivo es coordinar la firma o entrega. Tono profesional y amable.",
                 fallback_script, task_type="notary_contact_script",
+                fill={"documento": doc.id},
             )
 
             for hour in contact_hours:
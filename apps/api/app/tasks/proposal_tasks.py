@@ -85,11 +85,12 @@ def create_followup_tasks():
                 fallback_desc = "Contactar cliente para verificar recepcion y lectura de propuesta"
                 ai_desc = agent_draft(
                     db, proposal.organization_id, "secretaria",
-                    f"Redacta un mensaje breve de seguimiento para una propuesta de servicios juridicos "
-                    f"enviada hace 72 horas (propuesta #{proposal.id}, monto ${proposal.amount:,} CLP). "
-                    f"El objetivo es verificar que el cliente la recibio y resolver dudas. "
-                    f"Tono cordial y profesional. Maximo 3 lineas.",
+                    "Redacta un mensaje breve de seguimiento para una propuesta de servicios juridicos "
+                    "enviada hace 72 horas (propuesta #{propuesta}, monto {monto} CLP). "
+                    "El objetivo es verificar que el cliente la recibio y resolver dudas. "
+                    "Tono cordial y profesional. Maximo 3 lineas.",
                     fallback_desc, task_type="proposal_followup",
+                    fill={"propuesta": proposal.id, "monto": f"${proposal.amount:,}"},
                 )
 
                 task = Task(
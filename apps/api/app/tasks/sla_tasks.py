@@ -45,12 +45,13 @@ def check_email_sla():
 
                 ai_suggestion = agent_draft(
                     db, ticket.organization_id, AGENT_ROLE,
-                    f"El email con asunto '{ticket.subject}' del remitente {ticket.from_email} "
-                    f"ha excedido el SLA de 24 horas sin respuesta. "
-                    f"Redacta una disculpa breve y profesional (2-3 lineas) reconociendo el retraso "
-                    f"y comprometiendose a responder a la brevedad.",
+                    "El email con asunto '{asunto}' del remitente {remitente} "
+                    "ha excedido el SLA de 24 horas sin respuesta. "
+                    "Redacta una disculpa breve y profesional (2-3 lineas) reconociendo el retraso "
+                    "y comprometiendose a responder a la brevedad.",
                     "El ticket de correo ha excedido el SLA de 24 horas. Requiere atencion inmediata.",
                     task_type="sla_breach_response",
+                    fill={"asunto": ticket.subject, "remitente": ticket.from_email},
                 )
 
                 task = Task(
@@ -99,10 +100,11 @@ def check_email_sla():
 
             ai_urgente = agent_draft(
                 db, ticket.organization_id, AGENT_ROLE,
-                f"URGENTE: El email '{ticket.subject}' de {ticket.from_email} lleva mas de 48h sin respuesta. "
-                f"Redacta una disculpa formal urgente (3-4 lineas) con compromiso de respuesta inmediata.",
+                "URGENTE: El email '{asunto}' de {remitente} lleva mas de 48h sin respuesta. "
+                "Redacta una disculpa formal urgente (3-4 lineas) con compromiso de respuesta inmediata.",
                 "El ticket ha excedido el SLA de 48 horas. Se debe enviar correo de disculpas y respuesta.",
                 task_type="sla_breach_urgent",
+                fill={"asunto": ticket.subject, "remitente": ticket.from_email},
             )
 
             task = Task(
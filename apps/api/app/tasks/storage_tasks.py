@@ -0,0 +1,18 @@
+import logging
+
+from app.tasks.celery_app import celery_app
+from app.core.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="app.tasks.storage_tasks.purge_unreferenced_blobs")
+def purge_unreferenced_blobs():
+    """Delete content-addressed blobs no document references anymore."""
+    db = SessionLocal()
+    try:
+        from app.core.blob_store import purge_unreferenced_blobs as purge
+
+        return {"purged_count": purge(db)}
+    finally:
+        db.close()
@@ -0,0 +1,101 @@
+"""
+Startup-time benchmark for Logan Virtual.
+
+Measures, each in a fresh interpreter:
+- cold import of ``app.main`` (what every uvicorn worker pays)
+- cold import of the Celery app (what every Celery worker pays)
+- time-to-first-request: import + first ``GET /health`` through TestClient
+
+Also reports which heavy optional SDKs were pulled in by the import, since
+those should only load on first use.
+
+Usage (from apps/api):
+    python -m benchmarks.startup [--runs 5] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("anthropic", "boto3", "reportlab", "bs4", "httpx", "openai")
+
+_IMPORT_APP = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+print(json.dumps({"seconds": t1 - t0, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+_IMPORT_CELERY = """
+import json, time
+t0 = time.perf_counter()
+import app.tasks.celery_app
+print(json.dumps({"seconds": time.perf_counter() - t0}))
+"""
+
+_FIRST_REQUEST = """
+import json, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+client = TestClient(app.main.app)
+assert client.get("/health").status_code == 200
+print(json.dumps({"seconds": time.perf_counter() - t0}))
+"""
+
+
+def _run(snippet: str) -> dict:
+    env = dict(os.environ)
+    # Fast-start mode: no schema creation / seeding on startup
+    env.setdefault("DB_AUTO_CREATE_TABLES", "false")
+    env.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+    out = subprocess.run(
+        [sys.executable, "-c", snippet],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _stats(samples: list[float]) -> dict:
+    return {
+        "min_ms": round(min(samples) * 1000, 1),
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    app_runs = [_run(_IMPORT_APP) for _ in range(args.runs)]
+    results = {
+        "import_app": _stats([r["seconds"] for r in app_runs]),
+        "import_celery": _stats([_run(_IMPORT_CELERY)["seconds"] for _ in range(args.runs)]),
+        "first_request": _stats([_run(_FIRST_REQUEST)["seconds"] for _ in range(args.runs)]),
+        "heavy_modules_loaded": app_runs[-1]["loaded"],
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name in ("import_app", "import_celery", "first_request"):
+        s = results[name]
+        print(f"{name:<15} median {s['median_ms']:>8.1f} ms  (min {s['min_ms']:.1f}, max {s['max_ms']:.1f})")
+    print(f"{'heavy modules':<15} {', '.join(results['heavy_modules_loaded']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
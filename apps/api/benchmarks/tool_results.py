@@ -0,0 +1,135 @@
+"""
+Tool-result size benchmark for Logan Virtual.
+
+Runs every read-only agent tool against the seed data (``app.db.seed`` in
+a throwaway SQLite database) and compares, per tool and in total, what the
+model is sent:
+
+- ``repr``: ``str(result)``, the previous tool-result format
+- ``compact``: ``tool_results.serialize`` without pagination
+- ``sent``: compact + the tool's projection + pagination, as the runtime does
+
+Sizes are characters and estimated tokens (``token_budget.estimate``).
+``--record`` saves the raw tool outputs to a JSON file; ``--recorded``
+measures such a file instead of querying the database.
+
+Usage (from apps/api):
+    python -m benchmarks.tool_results [--record FILE | --recorded FILE] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+
+DATABASE_URL = "sqlite:///./benchmark_tools.db"
+
+# Inputs for tools that need more than their defaults
+SAMPLE_PARAMS = {
+    "get_matter_details": {"matter_id": 1},
+    "analyze_case_law": {"matter_id": 1},
+    "get_invoice_details": {"invoice_id": 1},
+    "get_client_balance": {"client_id": 1},
+    "get_template": {"template_id": 1},
+    "render_template": {"template_id": 1, "variables": {}},
+    "search_firm_knowledge": {"query": "contrato de arriendo cobro de rentas"},
+}
+LIST_LIMIT = 50
+
+
+def _record_outputs() -> dict:
+    os.environ.setdefault("DATABASE_URL", DATABASE_URL)
+    from app.core.agent_tools import ALL_TOOLS
+    from app.core.database import SessionLocal, engine
+    from app.db.base import Base
+    from app.db.models import Organization
+    from app.db.seed import seed
+
+    Base.metadata.create_all(engine)
+    seed()
+
+    outputs = {}
+    with SessionLocal() as db:
+        org_id = db.query(Organization.id).order_by(Organization.id).first()[0]
+        for tool in ALL_TOOLS:
+            if not tool.read_only:
+                continue
+            params = SAMPLE_PARAMS.get(tool.name, {"limit": LIST_LIMIT})
+            try:
+                result = tool.handler(db=db, params=params, org_id=org_id)
+            except Exception as exc:
+                db.rollback()
+                print(f"  skipped {tool.name}: {exc}")
+                continue
+            if isinstance(result, dict) and "error" in result:
+                continue
+            # Round-trip so recorded and live runs measure the same values
+            outputs[tool.name] = json.loads(json.dumps(result, default=str))
+    return outputs
+
+
+def _measure(outputs: dict) -> dict:
+    from app.core import token_budget, tool_results
+    from app.core.agent_tools import ALL_TOOLS
+    from app.core.config import settings
+
+    fields = {t.name: t.result_fields for t in ALL_TOOLS}
+    rows = {}
+    for name, result in sorted(outputs.items()):
+        variants = {
+            "repr": str(result),
+            "compact": tool_results.serialize(result),
+            "sent": tool_results.serialize(
+                result,
+                fields=fields.get(name, ()),
+                pager=tool_results.ResultPager(),
+                max_tokens=settings.AGENT_MAX_TOOL_RESULT_TOKENS,
+            ),
+        }
+        rows[name] = {
+            kind: {"chars": len(text), "tokens": token_budget.estimate(text)}
+            for kind, text in variants.items()
+        }
+
+    totals = {
+        kind: {m: sum(r[kind][m] for r in rows.values()) for m in ("chars", "tokens")}
+        for kind in ("repr", "compact", "sent")
+    }
+    return {"tools": rows, "total": totals}
+
+
+def _saving(before: int, after: int) -> str:
+    return f"{(1 - after / before) * 100:5.1f}%" if before else "    -"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--record", metavar="FILE", help="Save the raw seed-data tool outputs to FILE")
+    source.add_argument("--recorded", metavar="FILE", help="Measure previously recorded outputs")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+
+    if args.recorded:
+        with open(args.recorded, encoding="utf-8") as fh:
+            outputs = json.load(fh)
+    else:
+        outputs = _record_outputs()
+        if args.record:
+            with open(args.record, "w", encoding="utf-8") as fh:
+                json.dump(outputs, fh, ensure_ascii=False, indent=1)
+
+    results = _measure(outputs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'tool':<28} {'repr tok':>9} {'compact':>9} {'sent':>9} {'saved':>7}")
+    for name, row in list(results["tools"].items()) + [("TOTAL", results["total"])]:
+        before, compact, sent = row["repr"]["tokens"], row["compact"]["tokens"], row["sent"]["tokens"]
+        print(f"{name:<28} {before:>9} {compact:>9} {sent:>9} {_saving(before, sent):>7}")
+
+
+if __name__ == "__main__":
+    main()
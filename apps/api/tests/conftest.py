@@ -6,6 +6,7 @@ Set DATABASE_URL env var to use PostgreSQL.
 """
 
 import os
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
@@ -13,13 +14,19 @@ from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 
 from app.main import app
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.query_profiler import capture_queries
 from app.core.security import hash_password
 from app.db.base import Base
 from app.db.models import Organization, User
 from app.db.enums import RoleEnum
 
 
+# Profile every request/task in tests (off by default outside dev/test)
+settings.QUERY_PROFILER_ENABLED = True
+
+
 # ── Database Setup ───────────────────────────────────────────────────────────
 
 _TEST_DB_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
@@ -42,6 +49,7 @@ def override_get_db():
 
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 
 # ── Fixtures ─────────────────────────────────────────────────────────────────
@@ -54,6 +62,29 @@ def setup_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """Failure counters are shared per process; start every test closed."""
+    from app.core.anthropic_client import model_breaker
+    from app.core.escalation import agent_breaker
+
+    for breaker in (agent_breaker, model_breaker):
+        breaker.reset_local()
+    yield
+    for breaker in (agent_breaker, model_breaker):
+        breaker.reset_local()
+
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    """Run process-pool work inline, in the test process."""
+    from app.core import process_pool
+
+    monkeypatch.setattr(settings, "PROCESS_POOL_WORKERS", 0)
+    monkeypatch.setattr(process_pool, "_pool", None)
+    monkeypatch.setattr(process_pool, "_pool_disabled", False)
+
+
 @pytest.fixture
 def db():
     db = TestingSessionLocal()
@@ -68,6 +99,29 @@ def client():
     return TestClient(app)
 
 
+@pytest.fixture
+def assert_max_queries():
+    """
+    Upper-bound the SQL an endpoint runs::
+
+        with assert_max_queries(5):
+            client.get("/api/v1/leads/", headers=auth_headers)
+
+    ``max_repeats`` additionally fails when one statement shape repeats
+    that many times (N+1 lookups).
+    """
+    @contextmanager
+    def _assert(limit: int, max_repeats: int | None = None):
+        with capture_queries(engine) as profile:
+            yield profile
+        assert profile.count <= limit, f"Expected at most {limit} queries:\n{profile.summary()}"
+        if max_repeats is not None:
+            repeated = profile.repeated(max_repeats)
+            assert not repeated, f"Statement repeated {repeated[0][1]}×:\n{profile.summary()}"
+
+    return _assert
+
+
 @pytest.fixture
 def org(db):
     org = Organization(name="Test Org", timezone="America/Santiago")
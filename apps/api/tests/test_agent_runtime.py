@@ -100,3 +100,117 @@ def test_message_result_dataclass():
     assert result.input_tokens == 10
     assert result.output_tokens == 20
     assert result.model_used == "claude-sonnet-4-20250514"
+
+
+# ── Read-only tool memoization ────────────────────────────────────────────────
+
+def _memo_tools(calls):
+    def get_matter(db, params, org_id):
+        calls.append(("get_matter_details", params))
+        return {"id": params["matter_id"], "title": "Causa"}
+
+    def create_task(db, params, org_id):
+        calls.append(("create_task", params))
+        return {"id": 1}
+
+    return [
+        {"schema": {"name": "get_matter_details"}, "handler": get_matter, "read_only": True},
+        {"schema": {"name": "create_task"}, "handler": create_task, "read_only": False},
+    ]
+
+
+def _runtime():
+    from app.core.agent_runtime import AgentRuntime
+
+    return AgentRuntime(MagicMock(), 1, client=MagicMock())
+
+
+def test_read_only_tool_results_are_memoized():
+    calls = []
+    tools = _memo_tools(calls)
+    runtime, agent = _runtime(), MagicMock(skills=[])
+
+    first = runtime._execute_tool(agent, "get_matter_details", {"matter_id": 7}, tools)
+    first["title"] = "mutado"  # callers get copies
+    again = runtime._execute_tool(agent, "get_matter_details", {"matter_id": 7}, tools)
+    runtime._execute_tool(agent, "get_matter_details", {"matter_id": 8}, tools)
+
+    assert again["title"] == "Causa"
+    assert [c[1]["matter_id"] for c in calls] == [7, 8]
+    assert runtime._memo_stats(0, 0) == {"hits": 1, "misses": 2, "hit_rate": 0.333}
+
+
+def test_write_tool_invalidates_memo():
+    calls = []
+    tools = _memo_tools(calls)
+    runtime, agent = _runtime(), MagicMock(skills=[])
+
+    runtime._execute_tool(agent, "get_matter_details", {"matter_id": 7}, tools)
+    runtime._execute_tool(agent, "create_task", {"title": "x"}, tools)
+    runtime._execute_tool(agent, "get_matter_details", {"matter_id": 7}, tools)
+
+    assert [c[0] for c in calls] == ["get_matter_details", "create_task", "get_matter_details"]
+
+
+def test_workflow_scope_shares_memo_across_tasks():
+    from app.core import tool_memo
+
+    calls = []
+    tools = _memo_tools(calls)
+    with tool_memo.workflow_scope() as memo:
+        for _ in range(2):
+            runtime = _runtime()
+            runtime._tool_memo = tool_memo.current()  # as execute() does
+            runtime._execute_tool(MagicMock(skills=[]), "get_matter_details", {"matter_id": 7}, tools)
+
+    assert len(calls) == 1
+    assert memo.stats()["hits"] == 1
+    assert tool_memo.current() is None
+
+
+# ── Batched conversation writes ───────────────────────────────────────────────
+
+def test_conversation_rows_are_written_once_per_iteration(db, org, monkeypatch):
+    from app.core.agent_runtime import AgentRuntime
+    from app.core.anthropic_client import MessageResult
+    from app.core.query_profiler import capture_queries
+    from app.db.enums import RoleEnum
+    from app.db.models import AIAgent, AIAgentConversation
+
+    agent = AIAgent(
+        organization_id=org.id, role=RoleEnum.SECRETARIA.value, display_name="Secretaria",
+        system_prompt="Eres la secretaria.",
+    )
+    db.add(agent)
+    db.commit()
+
+    client = MagicMock()
+    client.send_message.side_effect = [
+        MessageResult(tool_calls=[
+            {"id": f"tu_{i}", "name": "get_matter_details", "input": {"matter_id": i}} for i in (1, 2, 3)
+        ]),
+        MessageResult(content="Listo."),
+    ]
+    runtime = AgentRuntime(db, org.id, client=client)
+    monkeypatch.setattr(runtime, "_get_agent_tools", lambda agent: _memo_tools([]))
+
+    with capture_queries(db.get_bind()) as profile:
+        result = runtime.execute(agent, {"message": "Revisa las causas"}, thread_id="t-batch")
+
+    inserts = [shape for shape in profile.shapes if shape.upper().startswith("INSERT INTO AI_AGENT_CONVERSATIONS")]
+    rows = (
+        db.query(AIAgentConversation)
+        .filter(AIAgentConversation.thread_id == "t-batch")
+        .order_by(AIAgentConversation.created_at, AIAgentConversation.id)
+        .all()
+    )
+
+    assert result["status"] == "completed"
+    assert sum(profile.shapes[s] for s in inserts) == 2  # one per iteration
+    assert [r.message_role for r in rows] == ["user", "assistant", "tool", "tool", "tool", "assistant"]
+    assert rows[1].tool_calls[0] == {
+        "id": "tu_1", "name": "get_matter_details", "input": {"matter_id": 1},
+        "result": {"id": 1, "title": "Causa"},
+    }
+    assert rows[2].tool_calls == [{"tool_use_id": "tu_1", "name": "get_matter_details"}]
+    assert [m["role"] for m in runtime._load_history("t-batch")] == ["user", "assistant", "assistant"]
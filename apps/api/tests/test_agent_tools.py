@@ -76,3 +76,12 @@ def test_tool_input_schemas_valid():
         assert "type" in schema, f"Tool {tool.name} schema missing 'type'"
         assert schema["type"] == "object", f"Tool {tool.name} schema type should be 'object'"
         assert "properties" in schema, f"Tool {tool.name} schema missing 'properties'"
+
+
+def test_read_only_tools_are_flagged():
+    """Reads may be memoized; anything that writes must not be flagged."""
+    from app.core.agent_tools import ALL_TOOLS
+
+    flags = {t.name: t.read_only for t in ALL_TOOLS}
+    assert flags["get_matter_details"] and flags["search_firm_knowledge"]
+    assert not any(flags[n] for n in ("create_task", "send_email", "update_notary_status", "create_notification"))
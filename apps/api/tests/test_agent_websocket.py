@@ -0,0 +1,159 @@
+"""
+Agent chat WebSocket tests — per-message sessions, ping/heartbeat and the
+per-user connection and running-turn caps.
+"""
+
+import threading
+import time
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.config import settings
+from app.db.enums import RoleEnum
+from app.db.models import AIAgent
+from app.modules.agents import websocket as agent_ws
+
+
+@pytest.fixture
+def agent(db, org):
+    a = AIAgent(
+        organization_id=org.id, role=RoleEnum.SECRETARIA.value, display_name="Secretaria",
+        system_prompt="Eres la secretaria del estudio.",
+    )
+    db.add(a)
+    db.commit()
+    return a
+
+
+@pytest.fixture
+def token(auth_headers):
+    return auth_headers["Authorization"].split(" ", 1)[1]
+
+
+@pytest.fixture(autouse=True)
+def fresh_state():
+    agent_ws._principals.clear()
+    agent_ws._open_sockets.clear()
+    agent_ws._running_turns.clear()
+    yield
+    agent_ws._principals.clear()
+
+
+def test_each_message_runs_in_its_own_turn(client, agent, token, monkeypatch):
+    turns = []
+
+    def fake_turn(principal, agent_id, message, thread_id):
+        turns.append((principal.user_id, message, thread_id))
+        return {"response": f"eco: {message}", "status": "completed", "thread_id": "t-1"}
+
+    monkeypatch.setattr(agent_ws, "_run_turn", fake_turn)
+
+    with client.websocket_connect(f"/ws/chat/{agent.id}?token={token}") as ws:
+        assert ws.receive_json()["agent"]["name"] == "Secretaria"
+        for text in ("hola", "¿plazos?"):
+            ws.send_json({"message": text})
+            assert ws.receive_json() == {"type": "status", "status": "thinking"}
+            assert ws.receive_json()["content"] == f"eco: {text}"
+
+    assert [t[1] for t in turns] == ["hola", "¿plazos?"]
+    assert turns[1][2] == "t-1"  # thread carried over between turns
+
+
+def test_ping_and_idle_heartbeat(client, agent, token, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_WS_HEARTBEAT_SECONDS", 0.05)
+
+    with client.websocket_connect(f"/ws/chat/{agent.id}?token={token}") as ws:
+        ws.receive_json()
+        assert ws.receive_json() == {"type": "heartbeat"}
+        ws.send_text("ping")
+        messages = [ws.receive_json() for _ in range(3)]
+
+    assert {"type": "pong"} in messages
+
+
+def test_connection_cap_per_user(client, agent, token, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_WS_MAX_CONNECTIONS_PER_USER", 1)
+    url = f"/ws/chat/{agent.id}?token={token}"
+
+    with client.websocket_connect(url) as first:
+        first.receive_json()
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(url):
+                pass
+        assert exc.value.code == 4029
+
+    with client.websocket_connect(url) as again:  # slot released on disconnect
+        assert again.receive_json()["type"] == "connected"
+
+
+def _reply(ws):
+    """Next assistant message, skipping status and heartbeat frames."""
+    while True:
+        frame = ws.receive_json()
+        if frame["type"] in ("message", "error"):
+            return frame
+
+
+def _wait_for_turns_to_finish(timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while agent_ws._running_turns and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not agent_ws._running_turns
+
+
+def test_timed_out_turn_blocks_new_messages_until_it_finishes(client, agent, admin_user, token, monkeypatch):
+    release = threading.Event()
+
+    def slow_turn(principal, agent_id, message, thread_id):
+        if message == "lento":
+            release.wait(5)
+        return {"response": f"eco: {message}", "status": "completed"}
+
+    monkeypatch.setattr(agent_ws, "_run_turn", slow_turn)
+    monkeypatch.setattr(settings, "AGENT_RUNTIME_TIMEOUT", 0.1)
+
+    with client.websocket_connect(f"/ws/chat/{agent.id}?token={token}") as ws:
+        ws.receive_json()
+        ws.send_json({"message": "lento"})
+        assert _reply(ws)["status"] == "failed"  # socket gave up; the turn keeps running
+
+        ws.send_json({"message": "otra vez"})
+        assert _reply(ws)["type"] == "error"
+        assert agent_ws._running_turns == {admin_user.id: 1}
+
+        release.set()
+        _wait_for_turns_to_finish()
+        ws.send_json({"message": "otra vez"})
+        assert _reply(ws)["content"] == "eco: otra vez"
+
+
+def test_running_turn_cap_spans_sockets(client, agent, token, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(agent_ws, "_run_turn", lambda *args: release.wait(5) and {"response": "ok"})
+    monkeypatch.setattr(settings, "AGENT_RUNTIME_TIMEOUT", 0.1)
+    monkeypatch.setattr(settings, "AGENT_WS_MAX_RUNNING_TURNS_PER_USER", 1)
+    url = f"/ws/chat/{agent.id}?token={token}"
+
+    with client.websocket_connect(url) as first:
+        first.receive_json()
+        first.send_json({"message": "hola"})
+        assert _reply(first)["status"] == "failed"
+
+        with client.websocket_connect(url) as second:  # another tab: the timed-out turn still counts
+            second.receive_json()
+            second.send_json({"message": "hola"})
+            assert _reply(second) == {"type": "error", "message": "Demasiados mensajes en curso; espere a que terminen"}
+
+        release.set()
+        _wait_for_turns_to_finish()
+
+
+def test_principal_is_cached(client, db, agent, admin_user, token):
+    with client.websocket_connect(f"/ws/chat/{agent.id}?token={token}") as ws:
+        ws.receive_json()
+
+    admin_user.full_name = "Renombrado"
+    db.commit()
+
+    assert agent_ws._load_principal(admin_user.id, admin_user.organization_id).full_name == "Admin Test"
@@ -0,0 +1,169 @@
+"""
+AnthropicClient transport tests against a local fake Anthropic HTTP server —
+retries with jitter and retry-after, model fallback, per-model circuit
+breaker, hedged requests and structured errors.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import redis_client
+from app.core.anthropic_client import (
+    AIAuthenticationError,
+    AIBadRequestError,
+    AICircuitOpenError,
+    AIServerError,
+    AnthropicClient,
+)
+from app.core.config import settings
+
+MODEL = "claude-test"
+
+
+class FakeAnthropic:
+    """Serves scripted ``(status, headers, delay)`` replies on /v1/messages."""
+
+    def __init__(self):
+        self.script: list[tuple[int, dict, float]] = []
+        self.requests: list[str] = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                fake.requests.append(body["model"])
+                status, headers, delay = fake.script.pop(0) if fake.script else (200, {}, 0)
+                time.sleep(delay)
+                if status == 200:
+                    payload = {
+                        "id": f"msg_{len(fake.requests)}", "type": "message", "role": "assistant",
+                        "model": body["model"], "stop_reason": "end_turn", "stop_sequence": None,
+                        "content": [{"type": "text", "text": f"respuesta {len(fake.requests)}"}],
+                        "usage": {"input_tokens": 5, "output_tokens": 3},
+                    }
+                else:
+                    payload = {"type": "error", "error": {"type": "api_error", "message": "falla"}}
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def fake():
+    server = FakeAnthropic()
+    yield server
+    server.server.shutdown()
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def client(fake, sleeps, monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    redis_client.reset_redis()
+    monkeypatch.setattr(settings, "AGENT_MAX_RETRIES", 3)
+    monkeypatch.setattr(settings, "ANTHROPIC_HEDGE_DELAY_MS", 0)
+    return AnthropicClient(api_key="sk-test", base_url=fake.url, sleep=sleeps.append)
+
+
+def _send(client, model=MODEL, **kwargs):
+    return client.send_message(model=model, system="", messages=[{"role": "user", "content": "hola"}], **kwargs)
+
+
+def test_retries_server_errors_with_jitter(client, fake, sleeps):
+    fake.script = [(503, {}, 0), (500, {}, 0)]
+
+    result = _send(client)
+
+    assert result.content == "respuesta 3"
+    assert len(fake.requests) == 3
+    assert len(sleeps) == 2 and all(0 <= s <= settings.ANTHROPIC_RETRY_MAX_DELAY for s in sleeps)
+
+
+def test_honors_retry_after(client, fake, sleeps):
+    fake.script = [(429, {"retry-after": "3"}, 0)]
+
+    _send(client)
+
+    assert sleeps[0] >= 3
+
+
+def test_overload_falls_back_to_lighter_model(client, fake, sleeps):
+    fake.script = [(529, {}, 0)]
+
+    result = _send(client, model=settings.ANTHROPIC_OPUS_MODEL)
+
+    assert fake.requests == [settings.ANTHROPIC_OPUS_MODEL, settings.ANTHROPIC_SONNET_MODEL]
+    assert result.model_used == settings.ANTHROPIC_SONNET_MODEL
+    assert sleeps == []
+
+
+def test_non_retryable_error_is_structured(client, fake):
+    fake.script = [(401, {}, 0)]
+
+    with pytest.raises(AIAuthenticationError) as exc:
+        _send(client)
+
+    assert len(fake.requests) == 1
+    assert exc.value.code == "auth" and not exc.value.retryable
+    assert "clave API" in str(exc.value)
+
+
+def test_circuit_opens_per_model(client, fake, monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "AGENT_MAX_RETRIES", 1)
+    fake.script = [(500, {}, 0)] * 2
+
+    with pytest.raises(AIServerError):
+        _send(client)
+    with pytest.raises(AICircuitOpenError):
+        _send(client)
+
+    assert len(fake.requests) == 2  # short-circuited without a request
+    assert _send(client, model="claude-otro").content  # other models unaffected
+
+
+def test_non_retryable_error_keeps_the_failure_streak(client, fake, monkeypatch):
+    from app.core.anthropic_client import model_breaker
+    from app.core.circuit_breaker import OPEN
+
+    monkeypatch.setattr(settings, "ANTHROPIC_CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "AGENT_MAX_RETRIES", 0)
+    fake.script = [(500, {}, 0), (400, {}, 0), (500, {}, 0)]
+
+    for error in (AIServerError, AIBadRequestError, AIServerError):
+        with pytest.raises(error):
+            _send(client)
+
+    assert model_breaker.state(MODEL) == OPEN  # the 400 did not reset the two 5xx
+
+
+def test_hedged_request_beats_slow_first_attempt(client, fake, monkeypatch):
+    monkeypatch.setattr(settings, "ANTHROPIC_HEDGE_DELAY_MS", 50)
+    fake.script = [(200, {}, 1.5)]
+
+    start = time.monotonic()
+    result = _send(client, hedge=True)
+
+    assert time.monotonic() - start < 1.0
+    assert result.content == "respuesta 2"
+    assert len(fake.requests) == 2
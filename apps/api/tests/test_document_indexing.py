@@ -0,0 +1,133 @@
+"""
+Document text extraction and indexing tests — extraction, chunking,
+hash-idempotent incremental indexing and content search.
+"""
+
+import hashlib
+import io
+import zipfile
+
+import pytest
+
+from app.core import document_indexing
+from app.core.storage import LocalStorage
+from app.core.text_extraction import chunk_text, extract_text
+from app.db.enums import DocumentTypeEnum
+from app.db.models import Document, DocumentTextChunk
+
+pytestmark = pytest.mark.usefixtures("inline_pool")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(base_path=str(tmp_path / "storage"))
+
+
+def _docx(*paragraphs: str) -> bytes:
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(f"<w:p><w:r><w:t>{p}</w:t></w:r></w:p>" for p in paragraphs)
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{ns}"><w:body>{body}</w:body></w:document>')
+    return buf.getvalue()
+
+
+def _document(db, org, storage, file_name: str, payload: bytes) -> Document:
+    doc = Document(
+        organization_id=org.id,
+        doc_type=DocumentTypeEnum.OTHER,
+        file_name=file_name,
+        storage_path=storage.upload(file_name, payload),
+        content_hash=hashlib.sha256(payload).hexdigest(),
+    )
+    db.add(doc)
+    db.commit()
+    return doc
+
+
+class TestExtraction:
+    def test_docx_paragraphs(self, tmp_path):
+        path = tmp_path / "escrito.docx"
+        path.write_bytes(_docx("Demanda de cobro", "Tribunal  de   Santiago"))
+        assert extract_text(str(path), "escrito.docx") == "Demanda de cobro\n\nTribunal de Santiago"
+
+    def test_docx_entities_are_refused(self, tmp_path):
+        from defusedxml import EntitiesForbidden
+
+        body = '<!DOCTYPE d [<!ENTITY a "aaaaaaaaaa"><!ENTITY b "&a;&a;&a;&a;&a;">]><d>&b;</d>'
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as archive:
+            archive.writestr("word/document.xml", body)
+        path = tmp_path / "bomba.docx"
+        path.write_bytes(buf.getvalue())
+
+        with pytest.raises(EntitiesForbidden):
+            extract_text(str(path), "bomba.docx")
+
+    def test_latin1_txt(self, tmp_path):
+        path = tmp_path / "nota.txt"
+        path.write_bytes("compraventa según escritura".encode("latin-1"))
+        assert extract_text(str(path), "nota.txt") == "compraventa según escritura"
+
+    def test_chunks_overlap_at_word_breaks(self):
+        text = " ".join(f"palabra{i}" for i in range(1000))
+        chunks = chunk_text(text, size=500, overlap=50)
+        assert len(chunks) > 1
+        assert all(len(c) <= 500 for c in chunks)
+        assert all(not c.endswith("palabr") for c in chunks)
+        assert chunks[0][-20:].split()[-1] in chunks[1]
+
+
+class TestIndexing:
+    def test_indexes_only_new_versions(self, db, org, storage):
+        doc = _document(db, org, storage, "contrato.txt", b"arriendo de oficina en Providencia")
+
+        stats = document_indexing.index_pending(db, storage=storage)
+        assert stats["indexed"] == 1
+        assert doc.text_indexed_hash == doc.content_hash
+        assert document_indexing.pending_documents(db) == []
+
+        # A new version (different bytes) is picked up again
+        payload = b"arriendo de bodega en Quilicura"
+        doc.storage_path = storage.upload("contrato.txt", payload)
+        doc.content_hash = hashlib.sha256(payload).hexdigest()
+        db.commit()
+        document_indexing.index_pending(db, storage=storage)
+
+        texts = [c.text for c in db.query(DocumentTextChunk).filter_by(document_id=doc.id)]
+        assert texts == ["arriendo de bodega en Quilicura"]
+
+    def test_identical_content_extracted_once(self, db, org, storage, monkeypatch):
+        first = _document(db, org, storage, "poder.txt", b"poder especial amplio")
+        document_indexing.index_pending(db, storage=storage)
+
+        calls = []
+        monkeypatch.setattr(document_indexing, "extract_text", lambda *a: calls.append(a) or "")
+        second = _document(db, org, storage, "poder-copia.txt", b"poder especial amplio")
+        stats = document_indexing.index_pending(db, storage=storage)
+
+        assert calls == []
+        assert stats["reused"] == 1
+        assert second.text_indexed_hash == first.content_hash
+        assert db.query(DocumentTextChunk).filter_by(document_id=second.id).count() == 1
+
+    def test_failures_recorded_not_retried(self, db, org, storage):
+        broken = _document(db, org, storage, "roto.docx", b"no es un zip")
+        image = _document(db, org, storage, "firma.png", b"\x89PNG")
+
+        stats = document_indexing.index_pending(db, storage=storage)
+
+        assert stats["failed"] == 1 and stats["unsupported"] == 1
+        assert "BadZipFile" in broken.text_index_error
+        assert image.text_index_error == document_indexing.UNSUPPORTED_ERROR
+        assert document_indexing.pending_documents(db) == []
+
+
+def test_search_matches_document_content(client, auth_headers, db, org, storage):
+    doc = _document(db, org, storage, "sentencia.txt", b"se condena al demandado al pago de alimentos")
+    document_indexing.index_pending(db, storage=storage)
+
+    response = client.get("/api/v1/search/?q=alimentos&type=documents", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [r["id"] for r in response.json()["results"]] == [doc.id]
@@ -0,0 +1,104 @@
+"""
+Draft cache tests — template drafts reuse one completion, LRU/TTL in Redis.
+
+Set REDIS_TEST_URL (e.g. redis://localhost:6379/15) to run the Redis-backed
+cases.
+"""
+
+import os
+
+import pytest
+
+from app.core import draft_cache, redis_client
+from app.core.agent_dispatch import agent_draft
+from app.core.config import settings
+from app.db.enums import RoleEnum
+from app.db.models import AIAgent
+
+REDIS_TEST_URL = os.getenv("REDIS_TEST_URL")
+
+TEMPLATE = "La factura #{factura} por {monto} CLP vence pronto. Redacta un recordatorio."
+
+
+@pytest.fixture
+def redis_cache(monkeypatch):
+    if not REDIS_TEST_URL:
+        pytest.skip("REDIS_TEST_URL not set")
+    monkeypatch.setattr(settings, "REDIS_URL", REDIS_TEST_URL)
+    redis_client.reset_redis()
+    r = redis_client.get_redis()
+    r.delete(*(r.keys(f"{draft_cache.KEY_PREFIX}*") or [draft_cache.LRU_KEY]))
+    yield r
+    redis_client.reset_redis()
+
+
+@pytest.fixture
+def cobranza_agent(db, org):
+    agent = AIAgent(
+        organization_id=org.id, role=RoleEnum.JEFE_COBRANZA.value, display_name="Jefe Cobranza",
+        system_prompt="Eres el jefe de cobranza.",
+    )
+    db.add(agent)
+    db.commit()
+    return agent
+
+
+@pytest.fixture
+def completions(monkeypatch):
+    prompts = []
+
+    def fake_execute(self, agent, task_input, **kwargs):
+        prompts.append(task_input["message"])
+        return {"status": "completed", "response": "Le recordamos que la factura #{factura} por {monto} vence."}
+
+    monkeypatch.setattr("app.core.agent_runtime.AgentRuntime.execute", fake_execute)
+    return prompts
+
+
+def test_placeholders_are_filled_and_others_kept():
+    text = draft_cache.fill_placeholders("Factura #{factura} {desconocido}", {"factura": 7})
+
+    assert text == "Factura #7 {desconocido}"
+    assert "{factura}, {monto}" in draft_cache.placeholder_prompt(TEMPLATE)
+
+
+def test_key_ignores_whitespace_and_case():
+    a = draft_cache.cache_key(1, "sonnet", "Redacta  una disculpa\nbreve", {"task_type": "x"})
+    b = draft_cache.cache_key(1, "sonnet", "redacta una disculpa breve ", {"task_type": "x"})
+
+    assert a == b
+    assert a != draft_cache.cache_key(2, "sonnet", "redacta una disculpa breve", {"task_type": "x"})
+
+
+def test_template_drafts_reuse_one_completion(db, org, cobranza_agent, completions, redis_cache):
+    texts = [
+        agent_draft(db, org.id, "jefe_cobranza", TEMPLATE, "-", fill={"factura": i, "monto": f"${i * 1000:,}"})
+        for i in (1, 2, 3)
+    ]
+
+    assert len(completions) == 1
+    assert texts[2] == "Le recordamos que la factura #3 por $3,000 vence."
+
+
+def test_without_redis_every_call_completes(db, org, cobranza_agent, completions, monkeypatch):
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    redis_client.reset_redis()
+
+    for i in (1, 2):
+        assert agent_draft(db, org.id, "jefe_cobranza", TEMPLATE, "-", fill={"factura": i, "monto": "$1"})
+
+    assert len(completions) == 2
+    redis_client.reset_redis()
+
+
+def test_lru_evicts_least_recently_used(redis_cache, monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_DRAFT_CACHE_MAX_ENTRIES", 2)
+    keys = [draft_cache.cache_key(1, "m", f"plantilla {i}") for i in range(3)]
+
+    draft_cache.put(keys[0], "a")
+    draft_cache.put(keys[1], "b")
+    draft_cache.get(keys[0])  # touch: keys[1] is now the oldest
+    draft_cache.put(keys[2], "c")
+
+    assert [draft_cache.get(k) for k in keys] == ["a", None, "c"]
+    assert 0 < redis_cache.ttl(keys[0]) <= settings.AGENT_DRAFT_CACHE_TTL_SECONDS
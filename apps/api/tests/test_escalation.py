@@ -1,8 +1,15 @@
 """Tests for the escalation system."""
 
+import os
+
 import pytest
 from unittest.mock import MagicMock
 
+from app.core import redis_client
+from app.core.config import settings
+
+REDIS_TEST_URL = os.getenv("REDIS_TEST_URL")
+
 
 def test_always_escalate_actions():
     """Verify ALWAYS_ESCALATE_ACTIONS contains expected dangerous actions."""
@@ -95,3 +102,91 @@ def test_escalation_skill_not_autonomous():
     should, reason = mgr.should_escalate(agent, skill_key="redaccion_legal")
     assert should
     assert "aprobación manual" in reason.lower() or "redacción" in reason.lower()
+
+
+# ── Shared failure counters / circuit breaker ────────────────────────────────
+
+@pytest.fixture(params=["local", "redis"])
+def breaker(request, monkeypatch):
+    from app.core.escalation import agent_breaker
+
+    if request.param == "redis":
+        if not REDIS_TEST_URL:
+            pytest.skip("REDIS_TEST_URL not set")
+        monkeypatch.setattr(settings, "REDIS_URL", REDIS_TEST_URL)
+    else:
+        monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    redis_client.reset_redis()
+    for agent_id in (1, 2):
+        agent_breaker.record_success(agent_id)
+    monkeypatch.setattr(settings, "AGENT_CIRCUIT_FAILURE_THRESHOLD", 3)
+    yield agent_breaker
+    redis_client.reset_redis()
+
+
+def test_error_counts_shared_across_managers(breaker):
+    from app.core.escalation import EscalationManager
+
+    for _ in range(2):
+        EscalationManager(db=MagicMock(), organization_id=1).record_error(agent_id=1)
+
+    assert EscalationManager(db=MagicMock(), organization_id=1).record_error(agent_id=1) == 3
+
+
+def test_circuit_opens_then_probes_once(breaker, monkeypatch):
+    from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+
+    for _ in range(3):
+        assert breaker.allow(1)
+        breaker.record_failure(1)
+
+    assert breaker.state(1) == OPEN
+    assert not breaker.allow(1)
+    assert breaker.allow(2)  # other agents unaffected
+
+    breaker.half_open(1)  # e.g. the health check
+    assert breaker.state(1) == HALF_OPEN
+    assert breaker.allow(1)
+    assert not breaker.allow(1)  # only one probe at a time
+
+    breaker.record_failure(1)  # probe failed: open again
+    assert breaker.state(1) == OPEN
+
+    breaker.half_open(1)
+    assert breaker.allow(1)
+    breaker.record_success(1)
+    assert breaker.state(1) == CLOSED and breaker.allow(1)
+
+
+def test_runtime_short_circuits_open_agent(breaker):
+    from app.core.agent_runtime import AgentRuntime
+
+    for _ in range(3):
+        breaker.record_failure(1)
+    client = MagicMock()
+    agent = MagicMock(id=1, is_active=True, display_name="Abogado Senior")
+
+    result = AgentRuntime(MagicMock(), 1, client=client).execute(agent, {"message": "hola"})
+
+    assert result["status"] == "unavailable"
+    assert not client.method_calls
+
+
+def test_health_check_half_opens_only_near_the_end_of_the_cool_down(breaker, db, org, monkeypatch):
+    from app.core.circuit_breaker import HALF_OPEN, OPEN
+    from app.db.models import AIAgent
+    from app.tasks import agent_health_tasks
+
+    agent = AIAgent(organization_id=org.id, role="abogado", display_name="Abogado", system_prompt="Eres abogado.")
+    db.add(agent)
+    db.commit()
+    monkeypatch.setattr("app.core.agent_dispatch.agent_draft", lambda db, org_id, role, prompt, fallback, **kw: fallback)
+    for _ in range(3):
+        breaker.record_failure(agent.id)
+
+    assert agent_health_tasks.agent_health_check()["circuits_half_opened"] == []
+    assert breaker.state(agent.id) == OPEN
+
+    monkeypatch.setattr(breaker, "open_remaining", lambda key: settings.AGENT_CIRCUIT_COOLDOWN_SECONDS * 0.2)
+    assert agent_health_tasks.agent_health_check()["circuits_half_opened"] == [agent.id]
+    assert breaker.state(agent.id) == HALF_OPEN
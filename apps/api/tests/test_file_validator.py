@@ -0,0 +1,94 @@
+"""
+Streaming upload validation tests — early rejection, hashing and spooling.
+"""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.file_validator import validate_upload, validate_upload_stream
+from app.core.storage import CHUNK_SIZE
+from app.db.models import StorageBlob
+
+
+class _CountingStream(io.RawIOBase):
+    """Non-seekable stream that records how many bytes were consumed."""
+
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        chunk = self._buf.read(n)
+        self.consumed += len(chunk)
+        return chunk
+
+
+def test_valid_pdf_hashed_and_rewound():
+    payload = b"%PDF-1.7 " + b"a" * 10_000
+    stream = io.BytesIO(payload)
+
+    upload = validate_upload_stream(stream, "demanda.pdf")
+
+    assert upload.sha256 == hashlib.sha256(payload).hexdigest()
+    assert upload.size == len(payload)
+    assert upload.file is stream and stream.tell() == 0
+    assert upload.filename.endswith("_demanda.pdf")
+
+
+def test_non_seekable_source_is_spooled():
+    payload = b"\x89PNG" + b"b" * 5000
+    upload = validate_upload_stream(_CountingStream(payload), "firma.png")
+    assert upload.read() == payload
+
+
+def test_disguised_file_rejected_after_first_chunk():
+    stream = _CountingStream(b"MZ\x90\x00" + b"x" * (5 * CHUNK_SIZE))
+    with pytest.raises(HTTPException) as exc:
+        validate_upload_stream(stream, "contrato.pdf")
+    assert "no coincide" in exc.value.detail
+    assert stream.consumed == CHUNK_SIZE
+
+
+def test_oversized_file_aborts_early():
+    stream = _CountingStream(b"%PDF" + b"x" * (10 * CHUNK_SIZE))
+    with pytest.raises(HTTPException) as exc:
+        validate_upload_stream(stream, "escaneo.pdf", max_size=2 * CHUNK_SIZE)
+    assert "demasiado grande" in exc.value.detail
+    assert stream.consumed <= 3 * CHUNK_SIZE
+
+
+@pytest.mark.parametrize("name,payload,detail", [
+    ("virus.exe", b"MZ", "bloqueado"),
+    ("notas.txt", b"", "vacío"),
+    ("corto.pdf", b"%P", "no coincide"),
+])
+def test_rejections(name, payload, detail):
+    with pytest.raises(HTTPException) as exc:
+        validate_upload_stream(io.BytesIO(payload), name)
+    assert detail in exc.value.detail
+
+
+def test_validate_upload_keeps_bytes_api():
+    payload = b"%PDF-1.4 poder"
+    file = UploadFile(file=io.BytesIO(payload), filename="poder.pdf")
+    safe_name, content = asyncio.run(validate_upload(file))
+    assert content == payload
+    assert safe_name.endswith("_poder.pdf")
+
+
+def test_document_upload_rejects_disguised_file(client, auth_headers, db):
+    response = client.post(
+        "/api/v1/documents/upload",
+        headers=auth_headers,
+        files={"file": ("resolucion.pdf", b"MZ\x90\x00not a pdf", "application/pdf")},
+        data={"entity_type": "matter", "entity_id": "1", "doc_type": "other"},
+    )
+    assert response.status_code == 400
+    assert db.query(StorageBlob).count() == 0
@@ -0,0 +1,146 @@
+"""
+Firm knowledge index tests — BM25 ranking, incremental sync, per-org
+sharding and the search_firm_knowledge agent tool.
+"""
+
+import pytest
+
+from app.core import knowledge_index
+from app.core.agent_tools.knowledge import search_firm_knowledge
+from app.core.config import settings
+from app.db.enums import (
+    CommunicationChannelEnum,
+    CommunicationDirectionEnum,
+    DocumentTypeEnum,
+    MatterTypeEnum,
+)
+from app.db.models import Client, Communication, Document, DocumentTextChunk, Matter, Organization
+
+
+@pytest.fixture(autouse=True)
+def index_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_PATH", str(tmp_path / "knowledge"))
+    monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_SYNC_INTERVAL", 0)
+
+
+@pytest.fixture
+def matter(db, org):
+    client = Client(organization_id=org.id, full_name_or_company="Inmobiliaria Los Andes")
+    db.add(client)
+    db.flush()
+    matter = Matter(
+        organization_id=org.id,
+        client_id=client.id,
+        matter_type=MatterTypeEnum.CIVIL,
+        title="Cobro de arriendos impagos",
+        description="Demanda de terminación de contrato de arrendamiento por no pago de rentas.",
+    )
+    db.add(matter)
+    db.commit()
+    return matter
+
+
+def _indexed_document(db, org, matter, text: str) -> Document:
+    doc = Document(
+        organization_id=org.id,
+        entity_type="matter",
+        entity_id=matter.id,
+        doc_type=DocumentTypeEnum.OTHER,
+        file_name="sentencia.pdf",
+        storage_path="x/sentencia.pdf",
+        content_hash="h" * 64,
+        text_indexed_hash="h" * 64,
+    )
+    db.add(doc)
+    db.flush()
+    db.add(DocumentTextChunk(
+        organization_id=org.id, document_id=doc.id, content_hash=doc.content_hash, chunk_index=0, text=text,
+    ))
+    db.commit()
+    return doc
+
+
+def test_tokenize_folds_accents_and_stopwords():
+    assert knowledge_index.tokenize("La Resolución del Juzgado") == ["resolucion", "juzgado"]
+
+
+class TestSync:
+    def test_ranks_most_relevant_passage_first(self, db, org, matter):
+        doc = _indexed_document(db, org, matter, "El tribunal acoge la demanda y ordena la restitución del inmueble.")
+        db.add(Communication(
+            organization_id=org.id, entity_type="matter", entity_id=matter.id,
+            channel=CommunicationChannelEnum.EMAIL, direction=CommunicationDirectionEnum.INBOUND,
+            subject="Consulta", body_text="El cliente pregunta por el estado del inmueble.",
+        ))
+        db.commit()
+        knowledge_index.sync_organization(db, org.id)
+
+        results = knowledge_index.search(org.id, "restitución inmueble tribunal")
+
+        assert results[0]["source_type"] == "document"
+        assert results[0]["source_id"] == doc.id
+        assert results[0]["matter_id"] == matter.id
+        assert {r["source_type"] for r in results} == {"document", "communication"}
+
+    def test_incremental_updates_and_removals(self, db, org, matter):
+        stats = knowledge_index.sync_organization(db, org.id)
+        assert stats["matter"] == {"updated": 1, "removed": 0}
+        assert knowledge_index.sync_organization(db, org.id)["matter"] == {"updated": 0, "removed": 0}
+
+        matter.description = "Juicio ejecutivo de cobro de pagaré."
+        db.commit()
+        assert knowledge_index.sync_organization(db, org.id)["matter"]["updated"] == 1
+        assert knowledge_index.search(org.id, "pagaré")
+        assert not knowledge_index.search(org.id, "arrendamiento")
+
+        db.delete(matter)
+        db.commit()
+        assert knowledge_index.sync_organization(db, org.id)["matter"]["removed"] == 1
+        assert not knowledge_index.search(org.id, "pagaré")
+
+    def test_shards_are_per_organization(self, db, org, matter):
+        other = Organization(name="Otro Estudio", timezone="America/Santiago")
+        db.add(other)
+        db.commit()
+        knowledge_index.sync_organization(db, org.id)
+        knowledge_index.sync_organization(db, other.id)
+
+        assert knowledge_index.shard_path(org.id) != knowledge_index.shard_path(other.id)
+        assert knowledge_index.search(org.id, "arrendamiento")
+        assert knowledge_index.search(other.id, "arrendamiento") == []
+
+
+class TestTool:
+    def test_returns_top_k_passages(self, db, org, matter):
+        _indexed_document(db, org, matter, "Contrato de arrendamiento de local comercial en Ñuñoa.")
+
+        result = search_firm_knowledge(db, {"query": "arrendamiento", "top_k": 1}, org.id)
+
+        assert result["count"] == 1
+        assert result["passages"][0]["text"]
+
+    def test_filters_by_source_type(self, db, org, matter):
+        _indexed_document(db, org, matter, "Contrato de arrendamiento de local comercial.")
+
+        result = search_firm_knowledge(db, {"query": "arrendamiento", "source_types": ["matter"]}, org.id)
+
+        assert {p["source_type"] for p in result["passages"]} == {"matter"}
+
+    def test_requires_query(self, db, org):
+        assert "error" in search_firm_knowledge(db, {"query": " "}, org.id)
+
+    def test_search_skips_sync_of_a_shard_the_beat_kept_fresh(self, db, org, matter, monkeypatch):
+        monkeypatch.setattr(settings, "KNOWLEDGE_INDEX_SYNC_INTERVAL", 900)
+        knowledge_index.sync_organization(db, org.id)  # e.g. the beat task
+        syncs = []
+        monkeypatch.setattr(knowledge_index, "sync_organization", lambda db, org_id: syncs.append(org_id))
+
+        search_firm_knowledge(db, {"query": "arrendamiento"}, org.id)
+
+        assert syncs == []
+
+    def test_top_k_is_coerced_and_validated(self, db, org, matter):
+        _indexed_document(db, org, matter, "Contrato de arrendamiento de local comercial en Ñuñoa.")
+
+        assert search_firm_knowledge(db, {"query": "arrendamiento", "top_k": "1"}, org.id)["count"] == 1
+        assert "error" in search_firm_knowledge(db, {"query": "arrendamiento", "top_k": "diez"}, org.id)
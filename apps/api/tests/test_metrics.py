@@ -0,0 +1,40 @@
+"""
+Prometheus metrics endpoint tests.
+"""
+
+from unittest.mock import patch
+
+
+class TestMetricsEndpoint:
+    def test_metrics_exposed(self, client, auth_headers):
+        client.get("/api/v1/leads/", headers=auth_headers)
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        body = response.text
+        assert "logan_http_request_duration_seconds" in body
+        assert "logan_db_queries_total" in body
+        assert "logan_db_pool_checkout_wait_seconds" in body
+
+    def test_route_label_uses_template(self, client, auth_headers):
+        client.get("/api/v1/leads/999999", headers=auth_headers)
+        body = client.get("/metrics").text
+        assert 'route="/api/v1/leads/{lead_id}"' in body
+        assert 'route="/api/v1/leads/999999"' not in body
+
+    def test_metrics_token_required_when_configured(self, client):
+        from app.core.config import settings
+
+        with patch.object(settings, "METRICS_AUTH_TOKEN", "scrape-secret"):
+            assert client.get("/metrics").status_code == 401
+            ok = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+            assert ok.status_code == 200
+
+
+def test_anthropic_observation_counts_tokens():
+    from app.core.metrics import ANTHROPIC_TOKENS, observe_anthropic_call
+
+    before = ANTHROPIC_TOKENS.labels(model="test-model", direction="input")._value.get()
+    observe_anthropic_call("test-model", 0.5, input_tokens=120, output_tokens=30)
+    after = ANTHROPIC_TOKENS.labels(model="test-model", direction="input")._value.get()
+    assert after - before == 120
@@ -0,0 +1,212 @@
+"""
+Notification delivery tests — publish on commit, per-worker fan-out,
+backpressure, catch-up on reconnect and Redis backoff.
+
+Set REDIS_TEST_URL (e.g. redis://localhost:6379/15) to also run the
+cross-worker round trip through a real Redis.
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from app.core import notification_bus, redis_client
+from app.core.config import settings
+from app.core.notification_bus import Subscriber
+from app.modules.notifications import service
+
+REDIS_TEST_URL = os.getenv("REDIS_TEST_URL")
+
+
+@pytest.fixture(autouse=True)
+def redis_url(monkeypatch):
+    # Default: a port nothing listens on — exercises the no-Redis path quickly
+    monkeypatch.setattr(settings, "REDIS_URL", "redis://127.0.0.1:1/0")
+    redis_client.reset_redis()
+    yield
+    redis_client.reset_redis()
+
+
+def _token(headers: dict) -> str:
+    return headers["Authorization"].split(" ", 1)[1]
+
+
+def _connect(ws, headers, last_id=None):
+    ws.send_text(json.dumps({"token": _token(headers), "last_id": last_id}) if last_id is not None else _token(headers))
+    ws.send_text("ping")
+    assert ws.receive_text() == "pong"  # subscribed and live
+
+
+def _notify(db, user, title="Plazo vence mañana"):
+    return service.create_notification(db, user.organization_id, user.id, "deadline", title, "Revise la causa")
+
+
+class TestWebSocketDelivery:
+    def test_live_delivery_without_redis(self, client, db, admin_user, auth_headers):
+        with client.websocket_connect("/api/v1/notifications/ws") as ws:
+            _connect(ws, auth_headers)
+            created = _notify(db, admin_user)
+
+            message = ws.receive_json()
+
+        assert message["id"] == created["id"]
+        assert message["title"] == "Plazo vence mañana"
+
+    def test_catch_up_on_reconnect(self, client, db, admin_user, auth_headers):
+        ids = [_notify(db, admin_user, f"Aviso {i}")["id"] for i in range(3)]
+
+        with client.websocket_connect("/api/v1/notifications/ws") as ws:
+            ws.send_text(json.dumps({"token": _token(auth_headers), "last_id": ids[0]}))
+            replayed = [ws.receive_json()["id"] for _ in range(2)]
+
+        assert replayed == ids[1:]
+
+    def test_invalid_token_closes(self, client):
+        with client.websocket_connect("/api/v1/notifications/ws") as ws:
+            ws.send_text("not-a-jwt")
+            with pytest.raises(Exception):
+                ws.receive_text()
+
+
+class TestPublishOnCommit:
+    def test_only_committed_rows_are_published(self, db, admin_user, monkeypatch):
+        from app.db.models import Notification
+
+        published = []
+        monkeypatch.setattr(notification_bus, "publish_notifications", lambda items: published.extend(p for _, p in items))
+
+        def add(title):
+            db.add(Notification(
+                organization_id=admin_user.organization_id, user_id=admin_user.id,
+                type="agent_notification", title=title, message="-",
+            ))
+            db.flush()
+
+        add("descartada")
+        db.rollback()
+        add("confirmada")
+        db.commit()
+
+        assert [p["title"] for p in published] == ["confirmada"]
+
+
+def test_slow_subscriber_is_cut_off():
+    import asyncio
+
+    async def scenario():
+        sub = Subscriber(user_id=1, maxsize=2)
+        for i in range(3):
+            sub.offer(f"m{i}")
+        return [sub.queue.get_nowait() for _ in range(sub.queue.qsize())]
+
+    assert asyncio.run(scenario()) == [Subscriber.OVERFLOW]
+
+
+def test_redis_failure_backs_off():
+    r = redis_client.get_redis()
+    with pytest.raises(Exception) as exc:
+        r.ping()
+    redis_client.mark_redis_down(exc.value)
+
+    assert redis_client.get_redis() is None
+
+
+@pytest.mark.skipif(not REDIS_TEST_URL, reason="REDIS_TEST_URL not set")
+def test_cross_worker_fan_out_through_redis(client, db, admin_user, auth_headers, monkeypatch):
+    import redis
+
+    monkeypatch.setattr(settings, "REDIS_URL", REDIS_TEST_URL)
+    redis_client.reset_redis()
+    other_worker = redis.Redis.from_url(REDIS_TEST_URL)
+
+    with client.websocket_connect("/api/v1/notifications/ws") as ws:
+        _connect(ws, auth_headers)
+        # Wait for the hub's pattern subscription before publishing
+        for _ in range(50):
+            if other_worker.execute_command("PUBSUB", "NUMPAT"):
+                break
+            time.sleep(0.1)
+        other_worker.publish(notification_bus.channel_for(admin_user.id), json.dumps({"id": 1, "title": "remoto"}))
+
+        assert ws.receive_json()["title"] == "remoto"
+
+        created = _notify(db, admin_user)  # published through Redis, back via the hub
+        assert ws.receive_json()["id"] == created["id"]
+
+
+class TestBulkAndUnreadCounters:
+    def test_bulk_create_dedupes_and_publishes(self, db, admin_user, abogado_user, monkeypatch):
+        published = []
+        monkeypatch.setattr(notification_bus, "publish_notifications", lambda items: published.extend(items))
+
+        ids = service.create_notifications_bulk(
+            db, admin_user.organization_id, [admin_user.id, abogado_user.id, admin_user.id],
+            "daily_digest", "Resumen diario", "Sin pendientes",
+        )
+
+        assert len(ids) == 2
+        assert sorted(user_id for user_id, _ in published) == sorted([admin_user.id, abogado_user.id])
+
+    def test_unread_count_without_redis_reads_database(self, db, admin_user):
+        _notify(db, admin_user)
+        _notify(db, admin_user)
+
+        assert service.get_unread_count(db, admin_user.id, admin_user.organization_id) == {"unread_count": 2}
+
+    @pytest.mark.skipif(not REDIS_TEST_URL, reason="REDIS_TEST_URL not set")
+    def test_counter_tracks_create_read_and_read_all(self, db, admin_user, monkeypatch):
+        from app.core import unread_counters
+
+        monkeypatch.setattr(settings, "REDIS_URL", REDIS_TEST_URL)
+        redis_client.reset_redis()
+        r = redis_client.get_redis()
+        r.delete(f"{unread_counters.KEY_PREFIX}{admin_user.id}")
+
+        def count():
+            return service.get_unread_count(db, admin_user.id, admin_user.organization_id)["unread_count"]
+
+        first = _notify(db, admin_user)
+        assert count() == 1  # miss: loaded from the database and cached
+
+        _notify(db, admin_user)
+        assert r.get(f"{unread_counters.KEY_PREFIX}{admin_user.id}") == "2"  # bumped on commit
+
+        service.mark_read(db, admin_user.id, first["id"])
+        service.mark_read(db, admin_user.id, first["id"])  # already read: no double decrement
+        assert count() == 1
+
+        service.mark_all_read(db, admin_user.id, admin_user.organization_id)
+        assert count() == 0
+
+
+def test_daily_digest_stays_within_each_organization(db, org, admin_user, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from app.core.security import hash_password
+    from app.db.models import Notification, Organization, Task, User
+    from app.tasks import digest_tasks
+
+    other_org = Organization(name="Otro Estudio", timezone="America/Santiago")
+    db.add(other_org)
+    db.flush()
+    other_manager = User(
+        organization_id=other_org.id, email="gerente@otro.cl", hashed_password=hash_password("x"),
+        full_name="Otro Gerente", role="gerente_legal", active=True,
+    )
+    past = datetime.now(timezone.utc) - timedelta(days=2)
+    db.add_all([other_manager] + [
+        Task(organization_id=org.id, title=f"Vencida {i}", due_at=past) for i in range(3)
+    ])
+    db.commit()
+
+    monkeypatch.setattr("app.core.agent_dispatch.agent_draft", lambda db, org_id, role, prompt, fallback, **kw: fallback)
+    monkeypatch.setattr("app.core.email.send_email", lambda **kw: True)
+    monkeypatch.setattr(notification_bus, "publish_notifications", lambda items: None)
+
+    digest_tasks.daily_digest()
+
+    messages = {n.user_id: n.message for n in db.query(Notification).filter(Notification.type == "daily_digest")}
+    assert "Tareas vencidas: 3" in messages[admin_user.id]
+    assert "Tareas vencidas: 0" in messages[other_manager.id]
@@ -0,0 +1,64 @@
+"""
+Stdlib PDF fallback tests — multi-page output, exact xref, streaming writes.
+"""
+
+import io
+import re
+
+from pypdf import PdfReader
+
+from app.core.pdf_generator import _LINES_PER_PAGE, _generate_simple_pdf, write_simple_pdf
+
+
+def _long_report(n: int) -> list[dict]:
+    return [{"type": "paragraph", "text": f"Movimiento {i}: pago recibido (cuota)"} for i in range(n)]
+
+
+def test_long_content_spans_pages_without_truncation():
+    pdf = _generate_simple_pdf("Informe de cobranza", _long_report(400))
+
+    reader = PdfReader(io.BytesIO(pdf), strict=True)
+    assert len(reader.pages) > 400 * 2 // _LINES_PER_PAGE
+    text = "".join(page.extract_text() for page in reader.pages)
+    assert "Movimiento 399: pago recibido (cuota)" in text
+    assert "Generado por Logan Virtual" in text
+
+
+def test_xref_offsets_point_at_objects():
+    pdf = _generate_simple_pdf("Factura", [{"type": "table", "data": [["Campo", "Detalle"], ["Monto", "$1"]]}])
+
+    startxref = int(re.search(rb"startxref\n(\d+)", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n")
+    entries = re.findall(rb"(\d{10}) 00000 n ", pdf[startxref:])
+    for obj_id, offset in enumerate(entries, start=1):
+        assert pdf[int(offset):].startswith(f"{obj_id} 0 obj".encode())
+
+
+def test_page_break_and_wrapping():
+    blocks = [
+        {"type": "paragraph", "text": "palabra " * 60},
+        {"type": "page_break"},
+        {"type": "paragraph", "text": "Cláusula segunda"},
+    ]
+    reader = PdfReader(io.BytesIO(_generate_simple_pdf("Contrato", blocks)))
+
+    assert len(reader.pages) == 2
+    assert "Cláusula segunda" in reader.pages[1].extract_text()
+
+
+class _WriteOnly:
+    """Sink without seek/tell, like a socket or HTTP body."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+
+def test_writes_incrementally_to_unseekable_stream():
+    out = _WriteOnly()
+    write_simple_pdf(out, "Reporte", iter(_long_report(200)))
+
+    assert len(out.chunks) > 10
+    assert len(PdfReader(io.BytesIO(b"".join(out.chunks)), strict=True).pages) > 1
@@ -0,0 +1,181 @@
+"""
+Batch PDF generation tests — cached styles, process-pool rendering into
+storage, progress reporting and the batch endpoints.
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import blob_store, pdf_generator, pdf_service, redis_client
+from app.core.storage import LocalStorage
+from app.db.models import Client, Document, Invoice, Proposal
+
+pytestmark = pytest.mark.usefixtures("inline_pool")
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    storage = LocalStorage(base_path=str(tmp_path))
+    monkeypatch.setattr(blob_store, "get_storage", lambda: storage)
+    return storage
+
+
+class _FakeRedis(dict):
+    def set(self, key, value, ex=None):
+        self[key] = value
+
+
+@pytest.fixture
+def batch_redis(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: r)
+    return r
+
+
+@pytest.fixture
+def client_row(db, org):
+    client = Client(organization_id=org.id, full_name_or_company="Constructora Sur", rut="76.123.456-7")
+    db.add(client)
+    db.commit()
+    return client
+
+
+def test_styles_built_once():
+    if pdf_generator._get_reportlab() is None:
+        pytest.skip("reportlab not installed")
+    assert pdf_generator._get_styles() is pdf_generator._get_styles()
+    assert "DocTitle" in pdf_generator._get_styles()
+
+
+class TestGenerateBatch:
+    def test_stores_a_document_per_entity(self, db, org, client_row, storage):
+        proposals = [Proposal(organization_id=org.id, client_id=client_row.id, amount=100_000 * i) for i in (1, 2, 3)]
+        db.add_all(proposals)
+        db.commit()
+        ids = [p.id for p in proposals]
+        seen = []
+
+        result = pdf_service.generate_batch(
+            db, "proposal", ids + [9999], org.id, progress=lambda done, total: seen.append((done, total))
+        )
+
+        assert result["total"] == 3
+        assert sorted(d["entity_id"] for d in result["documents"]) == ids
+        assert result["errors"] == [{"entity_id": 9999, "error": "No encontrado"}]
+        assert seen == [(1, 3), (2, 3), (3, 3)]
+
+        docs = db.query(Document).filter(Document.entity_type == "proposal").all()
+        assert {d.file_name for d in docs} == {f"PROP-{i}.pdf" for i in ids}
+        assert all(storage.download(d.storage_path).startswith(b"%PDF") for d in docs)
+
+    def test_other_organizations_rows_are_skipped(self, db, org, client_row, storage):
+        invoice = Invoice(organization_id=org.id, client_id=client_row.id, amount=50_000, due_date=date(2026, 1, 31))
+        db.add(invoice)
+        db.commit()
+
+        result = pdf_service.generate_batch(db, "invoice", [invoice.id], org.id + 1)
+
+        assert result["documents"] == []
+        assert result["errors"][0]["error"] == "No encontrado"
+
+    def test_render_failure_recorded(self, db, org, client_row, storage, monkeypatch):
+        proposal = Proposal(organization_id=org.id, client_id=client_row.id)
+        db.add(proposal)
+        db.commit()
+        monkeypatch.setattr(pdf_service, "render_pdf", lambda kind, data: 1 / 0)
+
+        result = pdf_service.generate_batch(db, "proposal", [proposal.id], org.id)
+
+        assert result["documents"] == []
+        assert "division by zero" in result["errors"][0]["error"]
+
+
+@pytest.mark.usefixtures("batch_redis")
+class TestBatchEndpoints:
+    def test_start_returns_job(self, client, auth_headers, monkeypatch):
+        from app.tasks import document_tasks
+
+        calls = []
+        monkeypatch.setattr(
+            document_tasks.generate_pdf_batch, "delay",
+            lambda *args: calls.append(args) or SimpleNamespace(id="job-1"),
+        )
+
+        response = client.post(
+            "/api/v1/documents/generate-batch", headers=auth_headers, json={"kind": "contract", "ids": [1, 2]}
+        )
+
+        assert response.status_code == 202
+        assert response.json()["job_id"] == "job-1"
+        assert calls[0][:2] == ("contract", [1, 2])
+
+    def test_status_reports_progress(self, client, auth_headers, admin_user, monkeypatch):
+        from app.tasks.celery_app import celery_app
+
+        info = {"org_id": admin_user.organization_id, "done": 4, "total": 10}
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda job_id: SimpleNamespace(state="PROGRESS", info=info))
+
+        response = client.get("/api/v1/documents/generate-batch/job-1", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"job_id": "job-1", "state": "PROGRESS", "done": 4, "total": 10, "result": None}
+
+    def test_status_hidden_from_other_organizations(self, client, auth_headers, admin_user, monkeypatch):
+        from app.tasks.celery_app import celery_app
+
+        info = {"org_id": admin_user.organization_id + 1, "done": 1, "total": 2}
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda job_id: SimpleNamespace(state="PROGRESS", info=info))
+
+        assert client.get("/api/v1/documents/generate-batch/job-1", headers=auth_headers).status_code == 404
+
+    @pytest.mark.parametrize("state, info", [
+        ("PENDING", None),
+        ("SUCCESS", {"1": {"indexed": 3}}),  # e.g. sync_knowledge_index's per-org dict
+        ("SUCCESS", ["not", "a", "dict"]),
+        ("FAILURE", RuntimeError("connection to db-internal:5432 refused")),
+    ])
+    def test_status_hides_results_of_other_tasks(self, client, auth_headers, monkeypatch, state, info):
+        from app.tasks.celery_app import celery_app
+
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda job_id: SimpleNamespace(state=state, info=info))
+
+        assert client.get("/api/v1/documents/generate-batch/foreign-task", headers=auth_headers).status_code == 404
+
+    @pytest.mark.parametrize("state, info", [("PENDING", None), ("STARTED", {"pid": 42, "hostname": "worker@1"})])
+    def test_status_of_a_queued_job_before_the_worker_reports(self, client, auth_headers, monkeypatch, state, info):
+        from app.tasks import document_tasks
+        from app.tasks.celery_app import celery_app
+
+        monkeypatch.setattr(document_tasks.generate_pdf_batch, "delay", lambda *args: SimpleNamespace(id="job-1"))
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda job_id: SimpleNamespace(state=state, info=info))
+        job_id = client.post(
+            "/api/v1/documents/generate-batch", headers=auth_headers, json={"kind": "contract", "ids": [1, 2, 3]}
+        ).json()["job_id"]
+
+        response = client.get(f"/api/v1/documents/generate-batch/{job_id}", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert response.json() == {"job_id": "job-1", "state": state, "done": 0, "total": 3, "result": None}
+
+    def test_queued_job_hidden_from_other_organizations(self, client, auth_headers, admin_user, monkeypatch):
+        from app.modules.documents import service
+        from app.tasks.celery_app import celery_app
+
+        service._record_pdf_batch("job-1", admin_user.organization_id + 1, 2)
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda job_id: SimpleNamespace(state="PENDING", info=None))
+
+        assert client.get("/api/v1/documents/generate-batch/job-1", headers=auth_headers).status_code == 404
+
+    def test_task_failure_is_returned_with_org(self, org, monkeypatch):
+        from app.tasks import document_tasks
+
+        states = []
+        monkeypatch.setattr(document_tasks.generate_pdf_batch, "update_state", lambda **kw: states.append(kw["meta"]))
+        monkeypatch.setattr(pdf_service, "generate_batch", lambda *a, **kw: 1 / 0)
+
+        result = document_tasks.generate_pdf_batch.run("invoice", [1, 2], org.id)
+
+        assert states[0] == {"org_id": org.id, "done": 0, "total": 2}
+        assert result["org_id"] == org.id and "division by zero" in result["error"]
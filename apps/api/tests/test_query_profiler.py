@@ -0,0 +1,77 @@
+"""
+Query profiler tests — statement shapes, N+1 warnings and query budgets.
+"""
+
+import logging
+from unittest.mock import patch
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.query_profiler import QueryProfile, normalize_statement, profile_queries, record_query
+from app.db.models import Lead
+
+
+class TestNormalizeStatement:
+    def test_literals_and_params_collapse(self):
+        a = normalize_statement("SELECT * FROM leads WHERE id = 1 AND name = 'Ana'")
+        b = normalize_statement("SELECT *  FROM leads\nWHERE id = 42 AND name = 'Pedro'")
+        assert a == b
+
+    def test_in_lists_collapse(self):
+        a = normalize_statement("SELECT * FROM leads WHERE id IN (?, ?)")
+        b = normalize_statement("SELECT * FROM leads WHERE id IN (?, ?, ?, ?)")
+        assert a == b
+
+
+class TestQueryProfile:
+    def test_records_only_inside_profile(self):
+        record_query("SELECT 1", 1.0)  # no active profile — ignored
+
+        with profile_queries("unit") as profile:
+            for lead_id in range(3):
+                record_query(f"SELECT * FROM leads WHERE id = {lead_id}", 2.0)
+
+        assert profile.count == 3
+        assert profile.total_ms == 3 * 2.0
+        assert profile.repeated(3)[0][1] == 3
+
+    def test_repeated_statement_logs_n_plus_one(self, caplog):
+        profile = QueryProfile(label="GET /api/v1/matters/1")
+        for lead_id in range(4):
+            profile.record(f"SELECT * FROM users WHERE id = {lead_id}", 1.0)
+
+        with patch.object(settings, "QUERY_PROFILER_MAX_REPEATS", 3), \
+                caplog.at_level(logging.WARNING, logger="logan.queries"):
+            profile.report()
+
+        assert "Possible N+1 in GET /api/v1/matters/1" in caplog.text
+
+    def test_budget_exceeded_logs_warning(self, caplog):
+        profile = QueryProfile(label="task demo")
+        profile.record("SELECT 1", 5.0)
+        profile.record("SELECT 2", 5.0)
+
+        with patch.object(settings, "QUERY_PROFILER_MAX_QUERIES", 1), \
+                caplog.at_level(logging.WARNING, logger="logan.queries"):
+            profile.report()
+
+        assert "Query budget exceeded in task demo" in caplog.text
+
+
+class TestAssertMaxQueries:
+    def test_leads_list_is_bounded(self, client, auth_headers, db, org, assert_max_queries):
+        for i in range(5):
+            db.add(Lead(organization_id=org.id, full_name=f"Lead {i}", source="walk_in", status="new"))
+        db.commit()
+
+        with assert_max_queries(6, max_repeats=3) as profile:
+            response = client.get("/api/v1/leads/", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert profile.count > 0
+
+    def test_captures_direct_queries(self, db, assert_max_queries):
+        with assert_max_queries(2) as profile:
+            db.execute(text("SELECT 1"))
+        assert profile.count == 1
@@ -0,0 +1,77 @@
+"""
+Read-replica routing tests.
+
+A second SQLite database stands in for the replica; on PostgreSQL CI the
+same tests run against two local databases via DATABASE_REPLICA_URL.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+from app.core.config import settings
+
+
+@pytest.fixture
+def replica(monkeypatch, tmp_path):
+    replica_url = settings.DATABASE_REPLICA_URL or f"sqlite:///{tmp_path / 'replica.db'}"
+    replica_engine = create_engine(replica_url)
+    monkeypatch.setattr(database, "replica_engine", replica_engine)
+    monkeypatch.setattr(
+        database, "ReplicaSessionLocal", sessionmaker(autoflush=False, bind=replica_engine)
+    )
+    database.replica_health.reset()
+    yield replica_engine
+    database.replica_health.reset()
+    replica_engine.dispose()
+
+
+def _bound_engine(session):
+    try:
+        return session.get_bind()
+    finally:
+        session.close()
+
+
+class TestReadRouting:
+    def test_primary_without_replica(self, monkeypatch):
+        monkeypatch.setattr(database, "replica_engine", None)
+        monkeypatch.setattr(database, "ReplicaSessionLocal", None)
+        assert _bound_engine(database.get_read_session()) is database.engine
+
+    def test_healthy_replica_is_used(self, replica):
+        assert _bound_engine(database.get_read_session()) is replica
+
+    def test_stale_replica_falls_back(self, replica, monkeypatch):
+        monkeypatch.setattr(
+            database, "replica_lag_seconds", lambda: settings.DATABASE_REPLICA_MAX_LAG_SECONDS + 1
+        )
+        assert _bound_engine(database.get_read_session()) is database.engine
+
+    @pytest.mark.parametrize("status, usable", [
+        ((True, True, True, 3600.0), True),  # streaming, idle primary
+        ((True, True, False, 3600.0), False),  # receiver disconnected, nothing new replayed
+        ((True, None, False, None), False),  # never received WAL
+        ((False, None, False, None), True),  # not a standby
+    ])
+    def test_disconnected_replica_is_not_caught_up(self, replica, monkeypatch, status, usable):
+        monkeypatch.setattr(database, "replica_lag_seconds", lambda: database._lag_from_status(*status))
+
+        assert (_bound_engine(database.get_read_session()) is replica) is usable
+
+    def test_unreachable_replica_falls_back(self, replica, monkeypatch):
+        def _boom():
+            raise ConnectionError("replica down")
+
+        monkeypatch.setattr(database, "replica_lag_seconds", _boom)
+        assert _bound_engine(database.get_read_session()) is database.engine
+
+    def test_health_check_is_cached(self, replica, monkeypatch):
+        calls = []
+        monkeypatch.setattr(database, "replica_lag_seconds", lambda: calls.append(1) or 0.0)
+
+        for _ in range(3):
+            database.get_read_session().close()
+
+        assert len(calls) == 1
@@ -0,0 +1,57 @@
+"""
+Server-Timing instrumentation tests — per-request DB / serialization breakdown.
+"""
+
+import pytest
+
+from app.core.timing import RequestTimings, record_timing, start_request_timings, reset_request_timings, timed
+
+
+def _timing_entries(header: str) -> dict[str, str]:
+    return {entry.split(";")[0].strip(): entry for entry in header.split(",")}
+
+
+class TestServerTimingHeader:
+    def test_health_has_total(self, client):
+        response = client.get("/health")
+        entries = _timing_entries(response.headers["Server-Timing"])
+        assert "total" in entries
+
+    def test_db_and_serialization_reported(self, client, auth_headers):
+        response = client.get("/api/v1/leads/", headers=auth_headers)
+        assert response.status_code == 200
+        entries = _timing_entries(response.headers["Server-Timing"])
+        assert "db" in entries
+        assert "queries" in entries["db"]
+        assert "serialize" in entries
+        assert "total" in entries
+
+    def test_security_headers_still_applied(self, client, auth_headers):
+        response = client.get("/api/v1/leads/", headers=auth_headers)
+        assert response.headers.get("X-Frame-Options") == "DENY"
+        assert "Server-Timing" in response.headers
+
+
+class TestRequestTimings:
+    def test_records_only_inside_request(self):
+        record_timing("db", 5.0)  # no active collector — ignored
+
+        timings, token = start_request_timings()
+        try:
+            record_timing("db", 2.0)
+            record_timing("db", 3.0)
+            with timed("ai"):
+                pass
+        finally:
+            reset_request_timings(token)
+
+        assert timings.durations_ms["db"] == pytest.approx(5.0)
+        assert timings.counts["db"] == 2
+        assert "ai" in timings.durations_ms
+
+    def test_header_format(self):
+        timings = RequestTimings()
+        timings.add("db", 12.34)
+        header = timings.server_timing_header()
+        assert header.startswith('db;dur=12.3;desc="Database (1 queries)"')
+        assert header.split(", ")[-1].startswith("total;dur=")
@@ -0,0 +1,33 @@
+"""
+Startup tests — importing the app must not touch the database or load heavy SDKs.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_import_has_no_db_io_and_defers_heavy_sdks(tmp_path):
+    # Unreachable database: any import-time connection attempt would log
+    # retries and stall for ~20 s instead of returning immediately.
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path}/missing/dir/db.sqlite")
+    snippet = (
+        "import json, sys, app.main; "
+        "print(json.dumps([m for m in ('anthropic', 'boto3', 'reportlab', 'bs4') if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=API_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert "Database not ready" not in result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
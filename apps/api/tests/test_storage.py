@@ -0,0 +1,297 @@
+"""
+Storage tests — chunked writes, ranged reads, Range downloads, blob dedup
+and the shared S3 client.
+
+Set S3_TEST_ENDPOINT (e.g. a local MinIO at http://localhost:9000 with
+minioadmin/minioadmin and a "logan-test" bucket) to also run the S3
+round trip; presigning needs no server.
+"""
+
+import hashlib
+import io
+import os
+import uuid
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import blob_store
+from app.core.downloads import content_disposition, parse_range
+from app.core import storage as storage_module
+from app.core.storage import LocalStorage, S3Storage
+from app.db.models import Document, StorageBlob
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalStorage(base_path=str(tmp_path))
+
+
+class TestLocalStreaming:
+    def test_upload_stream_in_chunks(self, storage):
+        payload = bytes(range(256)) * 10_000  # ~2.5 MB, several chunks
+        path = storage.upload_stream("scan.pdf", io.BytesIO(payload), subfolder="matter/1")
+
+        assert path.startswith("matter/1/")
+        assert storage.size(path) == len(payload)
+        assert b"".join(storage.iter_chunks(path)) == payload
+
+    def test_iter_chunks_range(self, storage):
+        path = storage.upload("a.txt", b"0123456789")
+        assert b"".join(storage.iter_chunks(path, start=2, end=5)) == b"2345"
+        assert b"".join(storage.iter_chunks(path, start=7)) == b"789"
+        assert list(storage.iter_chunks(path, chunk_size=4)) == [b"0123", b"4567", b"89"]
+
+    def test_missing_file(self, storage):
+        with pytest.raises(FileNotFoundError):
+            storage.size("nope.pdf")
+
+    def test_local_path_rejects_traversal(self, storage, tmp_path):
+        (tmp_path.parent / "outside.txt").write_bytes(b"secret")
+        with pytest.raises(FileNotFoundError):
+            storage.local_path("../outside.txt")
+
+
+class TestParseRange:
+    @pytest.mark.parametrize("header,expected", [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=900-", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=500-5000", (500, 999)),
+        ("bytes=0-1,5-6", None),  # multi-range → full body
+        ("items=0-1", None),
+    ])
+    def test_parse(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    def test_unsatisfiable(self):
+        with pytest.raises(HTTPException) as exc:
+            parse_range("bytes=1000-", 1000)
+        assert exc.value.status_code == 416
+        assert exc.value.headers["Content-Range"] == "bytes */1000"
+
+    def test_content_disposition_non_ascii(self):
+        value = content_disposition("contrato_año.pdf")
+        assert 'filename="contrato_a?o.pdf"' in value
+        assert "filename*=UTF-8''contrato_a%C3%B1o.pdf" in value
+
+
+class TestDocumentDownload:
+    @pytest.fixture
+    def uploaded(self, client, auth_headers, storage, monkeypatch):
+        from app.modules.documents import service
+        monkeypatch.setattr(service, "get_storage", lambda: storage)
+        monkeypatch.setattr(blob_store, "get_storage", lambda: storage)
+
+        payload = b"%PDF-1.4 " + b"x" * 5000
+        response = client.post(
+            "/api/v1/documents/upload",
+            headers=auth_headers,
+            files={"file": ("contrato.pdf", payload, "application/pdf")},
+            data={"entity_type": "matter", "entity_id": "1", "doc_type": "other"},
+        )
+        assert response.status_code == 201, response.text
+        return response.json()["id"], payload
+
+    def test_full_download(self, client, auth_headers, uploaded):
+        doc_id, payload = uploaded
+        response = client.get(f"/api/v1/documents/{doc_id}/download", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.content == payload
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["content-length"] == str(len(payload))
+
+    def test_range_download(self, client, auth_headers, uploaded):
+        doc_id, payload = uploaded
+        response = client.get(
+            f"/api/v1/documents/{doc_id}/download",
+            headers={**auth_headers, "Range": "bytes=0-3"},
+        )
+        assert response.status_code == 206
+        assert response.content == b"%PDF"
+        assert response.headers["content-range"] == f"bytes 0-3/{len(payload)}"
+
+    def test_etag_revalidation(self, client, auth_headers, uploaded):
+        doc_id, payload = uploaded
+        url = f"/api/v1/documents/{doc_id}/download"
+        etag = client.get(url, headers=auth_headers).headers["etag"]
+        assert etag == f'"{hashlib.sha256(payload).hexdigest()}"'
+
+        response = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+        stale = client.get(url, headers={**auth_headers, "If-None-Match": '"other"'})
+        assert stale.status_code == 200
+
+    def test_if_range_mismatch_sends_full_body(self, client, auth_headers, uploaded):
+        doc_id, payload = uploaded
+        response = client.get(
+            f"/api/v1/documents/{doc_id}/download",
+            headers={**auth_headers, "Range": "bytes=0-3", "If-Range": '"stale"'},
+        )
+        assert response.status_code == 200
+        assert response.content == payload
+
+    def test_inline_preview(self, client, auth_headers, uploaded):
+        doc_id, _ = uploaded
+        response = client.get(f"/api/v1/documents/{doc_id}/download?inline=true", headers=auth_headers)
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.headers["content-disposition"].startswith("inline;")
+
+    def test_svg_is_never_served_inline(self, client, auth_headers, storage, monkeypatch):
+        from app.modules.documents import service
+        monkeypatch.setattr(service, "get_storage", lambda: storage)
+        monkeypatch.setattr(blob_store, "get_storage", lambda: storage)
+
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(document.cookie)</script></svg>'
+        doc_id = client.post(
+            "/api/v1/documents/upload",
+            headers=auth_headers,
+            files={"file": ("logo.svg", svg, "image/svg+xml")},
+            data={"entity_type": "matter", "entity_id": "1", "doc_type": "other"},
+        ).json()["id"]
+
+        response = client.get(f"/api/v1/documents/{doc_id}/download?inline=true", headers=auth_headers)
+
+        assert response.headers["content-type"] == "application/octet-stream"
+        assert response.headers["content-disposition"].startswith("attachment;")
+
+
+class TestStreamedBackendResponse:
+    """Backends without ``local_path`` (S3) use the chunked streaming path."""
+
+    class _RemoteOnly:
+        def __init__(self, inner):
+            self._inner = inner
+
+        def size(self, path):
+            return self._inner.size(path)
+
+        def iter_chunks(self, path, start=0, end=None):
+            return self._inner.iter_chunks(path, start=start, end=end)
+
+    def test_range_and_if_range(self, storage):
+        from starlette.testclient import TestClient
+        from fastapi import FastAPI, Request
+        from app.core.downloads import storage_file_response
+
+        path = storage.upload("a.txt", b"0123456789")
+        remote = self._RemoteOnly(storage)
+        api = FastAPI()
+
+        @api.get("/f")
+        def _serve(request: Request):
+            return storage_file_response(remote, path, "a.txt", request.headers, content_hash="abc")
+
+        client = TestClient(api)
+        assert client.get("/f", headers={"Range": "bytes=2-4"}).content == b"234"
+        assert client.get("/f", headers={"Range": "bytes=2-4", "If-Range": '"abc"'}).status_code == 206
+        assert client.get("/f", headers={"Range": "bytes=2-4", "If-Range": '"old"'}).status_code == 200
+        assert client.get("/f", headers={"If-None-Match": 'W/"abc"'}).status_code == 304
+
+
+class _NonSeekable(io.RawIOBase):
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        return self._buf.read(n)
+
+
+class TestBlobStore:
+    def test_identical_content_stored_once(self, db, storage):
+        first = blob_store.store_blob(db, io.BytesIO(b"resolucion"), storage=storage)
+        second = blob_store.store_blob(db, io.BytesIO(b"resolucion"), storage=storage)
+        db.commit()
+
+        assert first.id == second.id
+        assert first.storage_path == blob_store.blob_path(first.digest)
+        db.refresh(first)
+        assert first.ref_count == 2
+        assert db.query(StorageBlob).count() == 1
+        assert b"".join(storage.iter_chunks(first.storage_path)) == b"resolucion"
+
+    def test_non_seekable_stream_is_spooled(self, db, storage):
+        blob = blob_store.store_blob(db, _NonSeekable(b"x" * 3000), storage=storage)
+        db.commit()
+        assert blob.size_bytes == 3000
+        assert storage.size(blob.storage_path) == 3000
+
+    def test_release_and_purge(self, db, storage):
+        from datetime import timedelta
+
+        blob = blob_store.store_blob(db, io.BytesIO(b"escritura"), storage=storage)
+        db.commit()
+        blob_store.release_blob(db, blob.digest)
+        db.commit()
+
+        assert blob_store.purge_unreferenced_blobs(db, storage=storage, grace=timedelta(0)) == 1
+        assert db.query(StorageBlob).count() == 0
+        assert not storage.exists(blob.storage_path)
+
+    def test_reupload_reuses_blob(self, client, auth_headers, db, storage, monkeypatch):
+        monkeypatch.setattr(blob_store, "get_storage", lambda: storage)
+        payload = b"%PDF-1.4 notaria"
+        for entity_id in ("1", "2"):
+            response = client.post(
+                "/api/v1/documents/upload",
+                headers=auth_headers,
+                files={"file": ("escritura.pdf", payload, "application/pdf")},
+                data={"entity_type": "matter", "entity_id": entity_id, "doc_type": "notary_pdf"},
+            )
+            assert response.status_code == 201, response.text
+
+        docs = db.query(Document).all()
+        assert len(docs) == 2
+        assert docs[0].storage_path == docs[1].storage_path
+        assert docs[0].content_hash == docs[1].content_hash
+        assert db.query(StorageBlob).one().ref_count == 2
+
+
+@pytest.fixture
+def s3():
+    return S3Storage(
+        bucket_name="logan-test",
+        region="us-east-1",
+        access_key=os.getenv("S3_TEST_ACCESS_KEY", "minioadmin"),
+        secret_key=os.getenv("S3_TEST_SECRET_KEY", "minioadmin"),
+        endpoint_url=os.getenv("S3_TEST_ENDPOINT", "http://localhost:9000"),
+    )
+
+
+class TestS3Storage:
+    def test_get_storage_is_singleton(self, monkeypatch):
+        monkeypatch.setattr(storage_module, "_storage", None)
+        assert storage_module.get_storage() is storage_module.get_storage()
+        storage_module.reset_storage()
+
+    def test_presigned_url_cached_until_near_expiry(self, s3, monkeypatch):
+        clock = [1000.0]
+        monkeypatch.setattr(storage_module.time, "monotonic", lambda: clock[0])
+
+        url = s3.get_presigned_url("blobs/ab/cd/abcd", expires_in=600)
+        assert "X-Amz-Signature" in url
+
+        clock[0] += 600 - storage_module.PRESIGNED_URL_SAFETY_MARGIN - 1
+        assert s3.get_presigned_url("blobs/ab/cd/abcd", expires_in=600) == url
+
+        clock[0] += 2  # inside the safety margin → re-signed
+        monkeypatch.setattr(s3.client, "generate_presigned_url", lambda *a, **kw: "resigned")
+        assert s3.get_presigned_url("blobs/ab/cd/abcd", expires_in=600) == "resigned"
+
+    def test_pooled_client_config(self, s3):
+        assert s3.client.meta.config.max_pool_connections == storage_module.settings.S3_MAX_POOL_CONNECTIONS
+
+    @pytest.mark.skipif(not os.getenv("S3_TEST_ENDPOINT"), reason="S3_TEST_ENDPOINT not set")
+    def test_round_trip(self, s3):
+        path = s3.upload_stream(f"{uuid.uuid4().hex}.pdf", io.BytesIO(b"0123456789"), subfolder="tests")
+        try:
+            assert s3.size(path) == 10
+            assert b"".join(s3.iter_chunks(path, start=2, end=4)) == b"234"
+        finally:
+            s3.delete(path)
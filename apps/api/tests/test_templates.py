@@ -0,0 +1,143 @@
+"""
+Template rendering tests — compiled-template cache and bulk mail merge.
+"""
+
+import io
+import zipfile
+
+import pytest
+
+from app.core import template_engine
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    template_engine.clear_cache()
+    yield
+    template_engine.clear_cache()
+
+
+@pytest.fixture
+def template_id(client, auth_headers):
+    response = client.post(
+        "/api/v1/templates/",
+        headers=auth_headers,
+        json={
+            "template_type": "email",
+            "name": "Carta de cobranza",
+            "content_text": "Estimado {{ cliente }}: su deuda es de ${{ monto }}.",
+        },
+    )
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+@pytest.fixture
+def compile_calls(monkeypatch):
+    calls = []
+    original = template_engine.sandbox_env.from_string
+
+    def counting(source, *args, **kwargs):
+        calls.append(source)
+        return original(source, *args, **kwargs)
+
+    monkeypatch.setattr(template_engine.sandbox_env, "from_string", counting)
+    return calls
+
+
+class TestCompiledCache:
+    def test_repeated_renders_compile_once(self, client, auth_headers, template_id, compile_calls):
+        for monto in (100, 200):
+            response = client.post(
+                f"/api/v1/templates/{template_id}/render",
+                headers=auth_headers,
+                json={"variables": {"cliente": "Ana", "monto": monto}},
+            )
+            assert response.status_code == 200
+        assert response.json()["rendered_text"] == "Estimado Ana: su deuda es de $200."
+        assert len(compile_calls) == 1
+
+    def test_edit_invalidates(self, client, auth_headers, template_id, compile_calls):
+        url = f"/api/v1/templates/{template_id}"
+        client.post(f"{url}/render", headers=auth_headers, json={"variables": {"cliente": "Ana"}})
+        client.patch(url, headers=auth_headers, json={"content_text": "Hola {{ cliente }}"})
+
+        response = client.post(f"{url}/render", headers=auth_headers, json={"variables": {"cliente": "Ana"}})
+
+        assert response.json()["rendered_text"] == "Hola Ana"
+        assert len(compile_calls) == 2
+
+    def test_syntax_error_is_400(self, client, auth_headers, template_id):
+        url = f"/api/v1/templates/{template_id}"
+        client.patch(url, headers=auth_headers, json={"content_text": "Hola {{ cliente "})
+        response = client.post(f"{url}/render", headers=auth_headers, json={"variables": {}})
+        assert response.status_code == 400
+        assert "sintaxis" in response.json()["detail"]
+
+
+class TestBulkRender:
+    def test_zip_one_file_per_row(self, client, auth_headers, template_id, compile_calls):
+        rows = [{"cliente": f"Cliente {i}", "monto": i * 1000} for i in range(1, 301)]
+
+        response = client.post(
+            f"/api/v1/templates/{template_id}/render-bulk",
+            headers=auth_headers,
+            json={"variables_list": rows, "file_name_variable": "cliente"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/zip"
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        names = archive.namelist()
+        assert len(names) == 300
+        assert names[0] == "00001_Cliente_1.txt"
+        assert archive.read(names[-1]).decode() == "Estimado Cliente 300: su deuda es de $300000."
+        assert len(compile_calls) == 1
+
+    def test_zip_lists_failed_rows(self, client, auth_headers, template_id):
+        url = f"/api/v1/templates/{template_id}"
+        client.patch(url, headers=auth_headers, json={"content_text": "{{ cliente.nombre.upper() }}"})
+
+        response = client.post(
+            f"{url}/render-bulk",
+            headers=auth_headers,
+            json={"variables_list": [{"cliente": {"nombre": "ana"}}, {}]},
+        )
+
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.read("00001_Carta_de_cobranza.txt") == b"ANA"
+        assert archive.read("errores.txt").decode().startswith("Fila 2:")
+
+    def test_merged_pdf(self, client, auth_headers, template_id):
+        response = client.post(
+            f"/api/v1/templates/{template_id}/render-bulk",
+            headers=auth_headers,
+            json={"variables_list": [{"cliente": "Ana", "monto": 1}, {"cliente": "Luis", "monto": 2}], "format": "pdf"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/pdf"
+        assert response.content.startswith(b"%PDF")
+        assert b"/Count 2" in response.content  # one page per letter
+        assert response.headers["content-length"] == str(len(response.content))
+
+    def test_merged_pdf_rejects_a_row_that_fails_to_render(self, client, auth_headers, template_id):
+        url = f"/api/v1/templates/{template_id}"
+        client.patch(url, headers=auth_headers, json={"content_text": "{{ cliente.nombre.upper() }}"})
+
+        response = client.post(
+            f"{url}/render-bulk",
+            headers=auth_headers,
+            json={"variables_list": [{"cliente": {"nombre": "ana"}}, {}], "format": "pdf"},
+        )
+
+        assert response.status_code == 400
+        assert response.json()["detail"].startswith("Fila 2:")
+
+    def test_invalid_variable_name_rejected(self, client, auth_headers, template_id):
+        response = client.post(
+            f"/api/v1/templates/{template_id}/render-bulk",
+            headers=auth_headers,
+            json={"variables_list": [{"cliente": "Ana"}, {"nombre-cliente": "x"}]},
+        )
+        assert response.status_code == 400
@@ -0,0 +1,85 @@
+"""
+Token budget tests — estimator, calibration, truncation and history trimming.
+"""
+
+import pytest
+
+from app.core import token_budget
+from app.core.config import settings
+
+SONNET = "claude-sonnet-4-20250514"
+
+
+@pytest.fixture(autouse=True)
+def fresh_calibration():
+    token_budget.reset_calibration()
+    yield
+    token_budget.reset_calibration()
+
+
+def test_accents_digits_and_json_cost_more_than_chars_over_four():
+    legal = "La demandada señaló que el pagaré N° 12.345.678-9 venció el 15/03/2024."
+    payload = {"rut": "12.345.678-9", "monto": 1500000, "glosa": "Indemnización por daño moral"}
+
+    assert token_budget.estimate(legal) > len(legal) // 4
+    assert token_budget.estimate(payload) > len(str(payload)) // 4
+
+
+def test_calibration_tracks_reported_input_tokens():
+    raw = token_budget.estimate_raw("texto de prueba " * 100)
+    for _ in range(30):
+        token_budget.observe(SONNET, raw, int(raw * 1.5))
+
+    assert token_budget.calibration(SONNET) == pytest.approx(1.5, rel=0.01)
+    assert token_budget.estimate("texto de prueba " * 100, SONNET) == pytest.approx(raw * 1.5, rel=0.01)
+    assert token_budget.calibration("otro-modelo") == 1.0
+
+
+def test_truncate_to_tokens_fits_budget():
+    text = "Cláusula de confidencialidad y no competencia. " * 400
+
+    cut = token_budget.truncate_to_tokens(text, 200)
+
+    assert cut.endswith(token_budget.TRUNCATION_MARKER)
+    assert 190 <= token_budget.estimate(cut) <= 200
+    assert token_budget.truncate_to_tokens("corto", 200) == "corto"
+
+
+def test_history_budget_subtracts_fixed_parts(monkeypatch):
+    monkeypatch.setitem(token_budget.CONTEXT_WINDOWS, "claude-mini", 10_000)
+    monkeypatch.setattr(settings, "AGENT_HISTORY_TOKEN_BUDGET", 80_000)
+
+    budget = token_budget.history_budget("claude-mini-1", "Eres abogado " * 50, max_output_tokens=1000)
+
+    assert budget == int(10_000 * (1 - token_budget.SAFETY_MARGIN)) - 1000 - token_budget.estimate("Eres abogado " * 50)
+    assert token_budget.history_budget(SONNET) == 80_000  # capped by the cost budget
+
+
+def test_trim_keeps_first_message_and_tool_pairs():
+    filler = "antecedentes del caso " * 200
+    history = [{"role": "user", "content": "Consulta original"}]
+    for i in range(6):
+        history.append({"role": "assistant", "content": f"{filler} {i}"})
+        history.append({"role": "user", "content": f"{filler} {i}"})
+    history.append({"role": "assistant", "content": [{"type": "tool_use", "id": "t1", "name": "get_tasks", "input": {}}]})
+    history.append({"role": "user", "content": [{"type": "tool_result", "tool_use_id": "t1", "content": filler}]})
+    budget = token_budget.estimate(history[0]) + 4 * token_budget.estimate(history[1]) + 50
+
+    dropped = token_budget.trim_history(history, budget)
+
+    assert dropped > 0
+    assert history[0]["content"] == "Consulta original"
+    assert history[1]["role"] == "assistant"
+    assert history[-2]["content"][0]["type"] == "tool_use"
+    assert sum(token_budget.estimate(m) for m in history) <= budget
+
+
+def test_trim_never_drops_the_latest_exchange():
+    history = [
+        {"role": "user", "content": "x " * 5000},
+        {"role": "assistant", "content": "y " * 5000},
+        {"role": "user", "content": "z " * 5000},
+    ]
+
+    assert token_budget.trim_history(history, 10) == 0
+    assert len(history) == 3
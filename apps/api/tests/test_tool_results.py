@@ -0,0 +1,120 @@
+"""
+Tool result serializer tests — compact JSON, key elision, projection and
+cursor pagination through fetch_more_results.
+"""
+
+import json
+from unittest.mock import MagicMock
+
+from app.core import token_budget, tool_results
+from app.core.config import settings
+
+
+def _logs(n):
+    return {
+        "count": n,
+        "logs": [
+            {
+                "id": i,
+                "action": "update",
+                "entity_type": "matter",
+                "entity_id": i * 10,
+                "agent_id": None,
+                "user_id": 3,
+                "created_at": "2026-03-01 10:15:00.123456+00:00",
+            }
+            for i in range(n)
+        ],
+    }
+
+
+def test_compact_elides_empty_values_and_repeated_keys():
+    text = tool_results.serialize({"id": 1, "notes": None, "tags": [], "logs": _logs(3)["logs"]})
+    data = json.loads(text)
+
+    assert " " not in text.replace("2026-03-01 10:15:00", "")
+    assert "notes" not in data and "tags" not in data
+    assert data["logs"]["columns"] == ["id", "action", "entity_type", "entity_id", "user_id", "created_at"]
+    assert data["logs"]["rows"][1] == [1, "update", "matter", 10, 3, "2026-03-01 10:15:00+00:00"]
+
+
+def test_compact_is_much_smaller_than_repr():
+    result = _logs(20)
+
+    assert token_budget.estimate(tool_results.serialize(result)) < token_budget.estimate(str(result)) * 0.6
+
+
+def test_projection_keeps_only_listed_record_fields():
+    data = json.loads(tool_results.serialize(_logs(1), fields=("id", "action")))
+
+    assert data == {"count": 1, "logs": [{"id": 0, "action": "update"}]}
+
+
+def test_long_lists_are_paginated_through_a_cursor(monkeypatch):
+    monkeypatch.setattr(settings, "AGENT_TOOL_RESULT_PAGE_SIZE", 4)
+    pager = tool_results.ResultPager()
+
+    first = json.loads(tool_results.serialize(_logs(10), pager=pager))
+    cursor = first["logs_more"]["cursor"]
+    second = pager.fetch(cursor)
+    third = pager.fetch(cursor)
+
+    assert len(first["logs"]["rows"]) == 4 and first["logs_more"]["remaining"] == 6
+    assert [r["id"] for r in second["items"]] == [4, 5, 6, 7]
+    assert second["more"] == {"cursor": cursor, "remaining": 2}
+    assert [r["id"] for r in third["items"]] == [8, 9] and "more" not in third
+    assert "error" in pager.fetch(cursor)  # exhausted
+
+
+def test_pages_shrink_to_fit_the_token_budget():
+    pager = tool_results.ResultPager()
+    result = {"logs": [{"id": i, "text": "Resolución que recibe la causa a prueba " * 5} for i in range(20)]}
+
+    text = tool_results.serialize(result, pager=pager, max_tokens=300)
+
+    assert token_budget.estimate(text) <= 300
+    assert not text.endswith(token_budget.TRUNCATION_MARKER)
+    assert json.loads(text)["logs_more"]["remaining"] > 0
+
+
+def test_without_pager_lists_are_not_cut():
+    assert len(json.loads(tool_results.serialize(_logs(30)))["logs"]["rows"]) == 30
+
+
+def test_runtime_serves_fetch_more_results(monkeypatch):
+    from app.core.agent_runtime import AgentRuntime
+
+    monkeypatch.setattr(settings, "AGENT_TOOL_RESULT_PAGE_SIZE", 5)
+    runtime = AgentRuntime(MagicMock(), 1, client=MagicMock())
+    tools = [{"schema": {"name": "get_audit_trail"}, "handler": lambda db, params, org_id: _logs(8), "read_only": True}]
+    agent = MagicMock(skills=[])
+
+    raw = runtime._execute_tool(agent, "get_audit_trail", {}, tools)
+    first = json.loads(runtime._validate_tool_result(raw, fields=("id",)))
+    more = runtime._execute_tool(agent, tool_results.FETCH_MORE_TOOL, {"cursor": first["logs_more"]["cursor"]}, tools)
+    page = json.loads(runtime._validate_tool_result(more))
+
+    assert [r[0] for r in first["logs"]["rows"]] == [0, 1, 2, 3, 4]
+    assert page["items"] == {"columns": ["id"], "rows": [[5], [6], [7]]}
+    assert runtime._memo_stats(0, 0)["misses"] == 1  # paging does not touch the memo
+
+
+def test_tool_loop_sends_serialized_results_and_fetch_tool():
+    from app.core.agent_runtime import AgentRuntime
+    from app.core.anthropic_client import MessageResult
+
+    client = MagicMock()
+    client.send_message.side_effect = [
+        MessageResult(tool_calls=[{"id": "tu_1", "name": "get_audit_trail", "input": {}}]),
+        MessageResult(content="Listo."),
+    ]
+    runtime = AgentRuntime(MagicMock(), 1, client=client)
+    tools = [{"schema": {"name": "get_audit_trail"}, "handler": lambda db, params, org_id: _logs(2), "read_only": True}]
+    runtime._get_agent_tools = lambda agent: tools
+
+    result = runtime.execute(MagicMock(skills=[], max_tokens=1024, model_name="claude-sonnet-4"), {"message": "Auditoría"})
+
+    sent = client.send_message.call_args_list[1].kwargs
+    assert result["status"] == "completed"
+    assert sent["tools"][-1]["name"] == tool_results.FETCH_MORE_TOOL
+    assert json.loads(sent["messages"][-1]["content"][0]["content"])["logs"]["columns"][0] == "id"